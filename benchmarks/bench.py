@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+生成脚本的基准测试：用合成名单（默认 42、1k、10k、100k 人）分别驱动三类产物，
+输出到临时目录，报告各阶段耗时、每秒学生数和峰值内存，并与保存的基线比较。
+
+阶段：
+    render    渲染模板（Family.render）
+    validate  Java 源码检查（javacheck.check_outputs）
+    plan ... close
+              OutputWriter 内部的各阶段，取自 genkit.profile（与 generate_all.py --profile 相同）：
+              plan 编码/摘要、mkdir、write 写磁盘、link 硬链接、compress 压缩成员、
+              archive 追加到压缩包、close 收尾（中央目录、清单等）
+
+每个 (产物, 人数) 组合在单独的子进程中运行，峰值内存（ru_maxrss）互不影响。
+渲染与压缩都在单进程/单线程中进行，测的是各阶段本身的开销，而不是并行度。
+
+用法：
+    python3 benchmarks/bench.py                          # 全部产物、全部规模，与基线比较
+    python3 benchmarks/bench.py --sizes 42,1000 --only sorts
+    python3 benchmarks/bench.py --save-baseline          # 把本次结果写入 benchmarks/baseline.json
+    python3 benchmarks/bench.py --check --tolerance 25   # 任一阶段比基线慢 25% 以上时退出码为 1
+
+耗时只在同一台机器上可比。仓库中的 baseline.json 记录了测量它的机器和提交，只是一份参考；
+比较改动前后时，先在本机改动前的提交上用 --save-baseline --baseline 另存一份，再在改动后对它 --check。
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from genkit import engine, javacheck                        # noqa: E402
+from genkit.compression import parse_policy                 # noqa: E402
+from genkit.manifest import template_version                # noqa: E402
+from genkit.output import OutputWriter, archive_path        # noqa: E402
+from genkit.profile import Profile, pad                     # noqa: E402
+from genkit.roster import NAMES                             # noqa: E402
+
+DEFAULT_SIZES = (42, 1000, 10000, 100000)
+STAGES = ("render", "validate", "plan", "mkdir", "write", "link", "compress", "archive", "close")
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_TOLERANCE = 20.0    # 百分比
+
+
+def synthetic_names(n: int) -> List[str]:
+    """合成名单：前 42 个为内置名单，之后在拼音名后加序号，保证互不相同。"""
+    return [NAMES[i] if i < len(NAMES) else f"{NAMES[i % len(NAMES)]}{i // len(NAMES)}" for i in range(n)]
+
+
+def run_case(family: str, size: int, zip_only: bool) -> Dict:
+    """在当前进程中跑一个组合，返回各阶段耗时等结果。"""
+    engine.load_plugins()
+    fam = engine.families([family])[0]
+    names = synthetic_names(size)
+    total = size if fam.needs_total else None
+    times = dict.fromkeys(STAGES, 0.0)
+    rendered = 0
+    clock = time.perf_counter
+    profile = Profile()
+    with tempfile.TemporaryDirectory(prefix="genbench-") as tmp:
+        base = Path(tmp)
+        archive = archive_path(base, fam.output_zip, "zip")
+        writer = OutputWriter(base, archive, zip_only=zip_only, template=template_version(*fam.templates),
+                              policy=parse_policy(None), profile=profile, label=family)
+        start = clock()
+        for i, name in enumerate(names):
+            t0 = clock()
+            out = fam.render(i, name, total)
+            t1 = clock()
+            problems = javacheck.check_outputs(out.files)
+            t2 = clock()
+            if problems:
+                raise javacheck.JavaCheckError(problems)
+            writer.add(out)
+            times["render"] += t1 - t0
+            times["validate"] += t2 - t1
+            rendered += sum(len(c) for _, c in out.files)
+        stats = writer.close()
+        wall = clock() - start
+        for row in profile.rows():
+            times[row["stage"]] += row["seconds"]
+        archive_bytes = archive.stat().st_size
+    return {
+        "family": family,
+        "students": size,
+        "files": stats.files,
+        "stages": times,
+        "wall": wall,
+        "students_per_s": size / wall if wall else 0.0,
+        "rendered_chars": rendered,
+        "archive_bytes": archive_bytes,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def spawn_case(family: str, size: int, zip_only: bool) -> Dict:
+    cmd = [sys.executable, __file__, "--case", f"{family}:{size}"] + (["--zip-only"] if zip_only else [])
+    proc = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(proc.stdout)
+
+
+def case_key(r: Dict) -> str:
+    return f"{r['family']}:{r['students']}"
+
+
+def machine() -> Dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def revision() -> str:
+    """测量时代码所在的提交（benchmarks/ 以外有未提交的改动时加 +），不在 git 仓库中时为空串。"""
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "--", ".", ":!benchmarks"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return head + ("+" if dirty else "")
+
+
+def _delta(now: float, before: float) -> str:
+    if not before:
+        return ""
+    pct = (now - before) / before * 100
+    return f"{pct:+.0f}%"
+
+
+def report(results: List[Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """打印结果表，返回超出容差的退步项。"""
+    regressions: List[str] = []
+    print(pad("产物:人数", 20, left=True) + "".join(pad(s, 14) for s in STAGES)
+          + pad("总计", 14) + pad("学生/秒", 12) + pad("峰值内存", 17))
+    for r in results:
+        old = baseline.get(case_key(r))
+        cells = []
+        for stage in STAGES:
+            now = r["stages"][stage]
+            before = old["stages"].get(stage, 0.0) if old else 0.0
+            d = _delta(now, before)
+            cells.append(f"{now:>8.3f}s{d:>5}")
+            # 太短的阶段受计时抖动影响大，不参与退步判断
+            if old and now > 0.05 and d and float(d[:-1]) > tolerance:
+                regressions.append(f"{case_key(r)} {stage}: {before:.3f}s -> {now:.3f}s ({d})")
+        rss = r["peak_rss_kb"] / 1024
+        d_rss = _delta(r["peak_rss_kb"], old["peak_rss_kb"]) if old else ""
+        print(f"{case_key(r):<20}" + "".join(f"{c:>14}" for c in cells)
+              + f"{r['wall']:>13.2f}s{r['students_per_s']:>12.0f}{rss:>9.1f}MB{d_rss:>6}")
+    return regressions
+
+
+def main(argv=None) -> None:
+    engine.load_plugins()
+    all_families = [f.name for f in engine.families()]
+    parser = argparse.ArgumentParser(description="生成脚本各阶段的基准测试")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), metavar="N,N,...",
+                        help="名单规模，逗号分隔（默认 42,1000,10000,100000）")
+    parser.add_argument("--only", metavar="NAMES",
+                        help="只测指定产物，逗号分隔（可选：" + ",".join(all_families) + "）")
+    parser.add_argument("--zip-only", action="store_true", help="只写压缩包，不写文件夹")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="基线文件（默认 benchmarks/baseline.json）")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--check", action="store_true", help="任一阶段比基线慢超过容差时以退出码 1 结束")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, metavar="PCT",
+                        help=f"退步判定的容差百分比（默认 {DEFAULT_TOLERANCE:g}）")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="另把结果写成 JSON")
+    parser.add_argument("--case", help=argparse.SUPPRESS)     # 子进程内部使用：产物:人数
+    args = parser.parse_args(argv)
+
+    if args.case:
+        family, size = args.case.split(":")
+        json.dump(run_case(family, int(size), args.zip_only), sys.stdout)
+        return
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        fams = [f.name for f in engine.families(args.only.split(",") if args.only else None)]
+    except ValueError:
+        parser.error(f"无法解析 --sizes：{args.sizes!r}")
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    results = []
+    for family in fams:
+        for size in sizes:
+            print(f"运行 {family}:{size} ...", file=sys.stderr)
+            results.append(spawn_case(family, size, args.zip_only))
+
+    baseline: Dict[str, Dict] = {}
+    if args.baseline.exists() and not args.save_baseline:
+        data = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if data.get("zip_only", False) != args.zip_only:
+            print("基线与本次的 --zip-only 设置不同，不做比较", file=sys.stderr)
+        else:
+            baseline = {case_key(r): r for r in data["results"]}
+        print(f"基线：{args.baseline}（{data['machine']['platform']}, Python {data['machine']['python']}, "
+              f"{data['machine']['cpus']} CPU，提交 {data.get('revision') or '未知'}）")
+        if data["machine"] != machine():
+            print("基线不是在本机测得的，耗时比较仅供参考；请先在本机用 --save-baseline 另存基线", file=sys.stderr)
+    regressions = report(results, baseline, args.tolerance)
+
+    doc = {"machine": machine(), "revision": revision(), "zip_only": args.zip_only, "results": results}
+    if args.json:
+        args.json.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(doc, ensure_ascii=False, indent=2, sort_keys=True) + "\n",
+                                 encoding="utf-8")
+        print(f"已保存基线：{args.baseline}")
+    if regressions:
+        print("\n比基线慢超过 {:g}% 的阶段：".format(args.tolerance))
+        for line in regressions:
+            print("  " + line)
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,28 +6,29 @@
 
 用法:
     python3 generate_java_collections.py
+    python3 generate_java_collections.py --zip-only   # 只生成 zip，不写出文件夹
+    python3 generate_java_collections.py --perf all   # 另附 ListPerf/MapPerf/QueuePerf 性能对比程序
 """
 from __future__ import annotations
-import os
-import zipfile
-import textwrap
-from pathlib import Path
-
-NAMES = [
-    "liting","ganrourou","panjincheng","huhao","wangxinyu","tanziqiang","zhangxinghuo","tanjierong","fanli","laishuanggui",
-    "hehao","liujunli","zhongyupeng","menghangxu","xubo","yuzhuokun","shijiaxue","zouyuxiang","wuhan","zhangyixin",
-    "liuhongcheng","zhouziyi","renran","zhengjiezhong","chengyanping","luoyi","zhengronglei","hemeilin","yanghaoran",
-    "dengxiaoyan","wangjingsheng","liaojiayu","zhangjingxi","zhangjieyi","tangqiang","huangjiajun","hutao","yangxiling",
-    "xieyucan","luoyifeng","guwencai","caichunmei",
-]
+from functools import partial
+from typing import Optional
+
+from genkit import engine
+from genkit.engine import Family, register_family
+from genkit.manifest import template_version
+from genkit.output import StudentOutput
+from genkit.template import Template
+from genkit.verify import (RunCheck, java_array, java_hash_order, java_map, java_shuffle,
+                           java_string_key)
+
 
 OUTPUT_ZIP = "java_collections_42.zip"
 
-# 多个模板，使用简单的占位符 {STUDENT} 和 {SEED}
+# 多个模板，使用简单的占位符 {STUDENT} 和 {SEED}；Java 代码本身的花括号写作 {{ 和 }}
 TEMPLATES = []
 
 # 模板 1: 使用 ArrayList 模拟待办事项 (Todo list)
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.ArrayList;
 import java.util.List;
 import java.util.Scanner;
@@ -52,10 +53,10 @@ public class Main {{
         System.out.println(\"最终待办：\" + todo);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 2: 使用 HashMap 实现学生成绩登记
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.HashMap;
 import java.util.Map;
 public class Main {{
@@ -73,10 +74,10 @@ public class Main {{
         System.out.printf(\"平均分: %.2f\\n\", avg);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 3: 使用 HashSet 做唯一性检测
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.HashSet;
 import java.util.Set;
 public class Main {{
@@ -88,10 +89,10 @@ public class Main {{
         System.out.println(\"集合大小：\" + set.size());
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 4: 使用 PriorityQueue 做任务调度（优先级）
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.PriorityQueue;
 public class Main {{
     public static void main(String[] args) {{
@@ -105,10 +106,10 @@ public class Main {{
         }}
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 5: 使用 LinkedHashMap 做简单 LRU 风格缓存示例（非严格实现）
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.LinkedHashMap;
 import java.util.Map;
 public class Main {{
@@ -122,10 +123,10 @@ public class Main {{
         System.out.println(\"访问 2 并加入 4 后：\" + cache);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 6: 使用 TreeMap 做有序联系人
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.Map;
 import java.util.TreeMap;
 public class Main {{
@@ -138,10 +139,10 @@ public class Main {{
         System.out.println(\"首条联系人：\" + ((TreeMap<String,String>)contacts).firstEntry());
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 7: 使用 Deque 实现命令历史（栈/队列）
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.ArrayDeque;
 import java.util.Deque;
 public class Main {{
@@ -155,10 +156,10 @@ public class Main {{
         System.out.println(\"剩余历史：\" + history);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 8: 使用 Map<String, List<String>> 实现简单 MultiMap（分组）
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.ArrayList;
 import java.util.HashMap;
 import java.util.List;
@@ -175,10 +176,10 @@ public class Main {{
         m.computeIfAbsent(k, x -> new ArrayList<>()).add(v);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 9: 使用 Collections.frequency 做词频统计
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.Arrays;
 import java.util.Collections;
 import java.util.List;
@@ -191,10 +192,10 @@ public class Main {{
         }}
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 10: 使用 LinkedList 做双向队列演示
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.LinkedList;
 import java.util.List;
 public class Main {{
@@ -206,10 +207,10 @@ public class Main {{
         System.out.println(\"addFirst/addLast 后：\" + list);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 11: 使用 TreeSet 做排序并去重
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.Arrays;
 import java.util.Set;
 import java.util.TreeSet;
@@ -219,10 +220,10 @@ public class Main {{
         System.out.println(\"{STUDENT} 的 TreeSet（排序去重）：\" + s);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 12: 使用 Arrays.asList + Collections.shuffle 演示集合操作
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.Arrays;
 import java.util.Collections;
 import java.util.List;
@@ -234,10 +235,10 @@ public class Main {{
         System.out.println(\"shuffle({SEED}) 后：\" + items);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 13: 使用 Map + Stream 做查找过滤演示
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.HashMap;
 import java.util.Map;
 public class Main {{
@@ -249,10 +250,10 @@ public class Main {{
         map.entrySet().stream().filter(e->e.getKey().length()>1).forEach(System.out::println);
     }}
 }}
-"""))
+""", dedent=True))
 
 # 模板 14: 使用 java.util.concurrent 的 ConcurrentLinkedQueue（只是演示，不真正并发）
-TEMPLATES.append(textwrap.dedent("""\
+TEMPLATES.append(Template("""\
 import java.util.Queue;
 import java.util.concurrent.ConcurrentLinkedQueue;
 public class Main {{
@@ -264,17 +265,89 @@ public class Main {{
         System.out.println(\"剩余: \" + q);
     }}
 }}
-"""))
+""", dedent=True))
 
 NUM_TEMPLATES = len(TEMPLATES)
+TEMPLATE_VERSIONS = [template_version(t) for t in TEMPLATES]
+
+# 各模板的期望输出（genkit.verify 用），由学生名和种子按 Java 的语义算出；与 TEMPLATES 一一对应，
+# 改动模板的输出时须同时改这里。模板 1 是交互式的，verify 输入一个空行：提示语后面直接接最终结果。
+def _expect_todo(name, seed):
+    todo = java_array(["写作业", "阅读", "复习"])
+    return (f"欢迎，{name} 的简单 Todo 列表演示\n当前待办：{todo}\n"
+            f"输入一条新任务并回车（空输入结束）：最终待办：{todo}\n")
+
+def _expect_grades(name, seed):
+    grades = {"Alice": 85, "Bob": 92, "Carol": 78}
+    order = java_hash_order(grades)
+    before = java_map((k, grades[k]) for k in order)
+    grades["Bob"] += 1
+    after = java_map((k, grades[k]) for k in order)
+    avg = sum(grades.values()) / len(grades)
+    return f"{name} 的成绩登记演示：{before}\n更新 Bob 成绩后：{after}\n平均分: {avg:.2f}\n"
+
+def _expect_set(name, seed):
+    unique = java_hash_order(["Anna", "Bob", "Anna", "Dave", name])
+    return f"{name} 的唯一名字集合：{java_array(unique)}\n集合大小：{len(unique)}\n"
+
+def _expect_pq(name, seed):
+    tasks = sorted(["低优先级任务", "中优先级任务", "高优先级任务"], key=java_string_key)
+    return f"{name} 的任务（按字典序）出队演示：\n" + "".join(t + "\n" for t in tasks)
+
+def _expect_lru(name, seed):
+    return (f"{name} 的伪 LRU 缓存初始：{{1=one, 2=two, 3=three}}\n"
+            f"访问 2 并加入 4 后：{{1=one, 3=three, 2=two, 4=four}}\n")
+
+def _expect_contacts(name, seed):
+    contacts = sorted({"Zhang": "1001", "Li": "1002", "Wang": "1003"}.items(), key=lambda kv: java_string_key(kv[0]))
+    first = "=".join(contacts[0])
+    return f"{name} 的有序联系人：{java_map(contacts)}\n首条联系人：{first}\n"
+
+def _expect_history(name, seed):
+    return (f"{name} 的命令历史（最近在上）：[保存, 编辑, 打开]\n撤销：保存\n剩余历史：[编辑, 打开]\n")
+
+def _expect_multimap(name, seed):
+    groups = {"fruit": ["apple", "banana"], "veg": ["carrot"]}
+    multi = java_map((k, java_array(groups[k])) for k in java_hash_order(groups))
+    return f"{name} 的 MultiMap 示例：{multi}\n"
+
+def _expect_frequency(name, seed):
+    return f"{name} 的词频示例：\napple: 3\nbanana: 2\norange: 1\n"
+
+def _expect_linked(name, seed):
+    return f"{name} 的 LinkedList 初始：[1, 2, 3, 4, 5]\naddFirst/addLast 后：[0, 1, 2, 3, 4, 5, 6]\n"
+
+def _expect_treeset(name, seed):
+    return f"{name} 的 TreeSet（排序去重）：{java_array(sorted({5, 3, 9, 1}))}\n"
+
+def _expect_shuffle(name, seed):
+    items = ["a", "b", "c", "d", "e"]
+    return f"{name} 原序：{java_array(items)}\nshuffle({seed}) 后：{java_array(java_shuffle(items, seed))}\n"
+
+def _expect_filter(name, seed):
+    values = {"a": 1, "bb": 2, "ccc": 3}
+    order = java_hash_order(values)
+    return (f"{name} 的 map: {java_map((k, values[k]) for k in order)}\n键长度大于1的项：\n"
+            + "".join(f"{k}={values[k]}\n" for k in order if len(k) > 1))
+
+def _expect_queue(name, seed):
+    return f"{name} 的 ConcurrentLinkedQueue（演示）：[task1, task2, task3]\npoll: task1\n剩余: [task2, task3]\n"
+
+EXPECTED = [_expect_todo, _expect_grades, _expect_set, _expect_pq, _expect_lru, _expect_contacts,
+            _expect_history, _expect_multimap, _expect_frequency, _expect_linked, _expect_treeset,
+            _expect_shuffle, _expect_filter, _expect_queue]
+assert len(EXPECTED) == NUM_TEMPLATES
+
+def expected_main_output(idx: int, name: str, seed: int) -> str:
+    """第 idx 个模板为 name（种子 seed）生成的 Main 的标准输出。"""
+    return EXPECTED[idx](name, seed)
 
 def stable_index(name: str) -> int:
     # 稳定的整数映射，不依赖 Python 的 hash 随机化
     s = sum(ord(c) for c in name)
     return s % NUM_TEMPLATES
 
-def make_readme(name: str, idx: int) -> str:
-    return textwrap.dedent(f"""\
+README_TEMPLATE = Template("""\
     # {name}
 
     这是为 {name} 生成的集合框架控制台小程序（模板 #{idx}）。
@@ -284,39 +357,342 @@ def make_readme(name: str, idx: int) -> str:
         java -cp bin Main
 
     程序说明在 Main.java 的注释中。
-    """)
-
-def ensure_dir(p: Path):
-    p.mkdir(parents=True, exist_ok=True)
-
-def write_text(p: Path, content: str):
-    p.write_text(content, encoding="utf-8")
-
-def main():
-    base = Path.cwd()
-    created = []
-    for name in NAMES:
-        idx = stable_index(name)
-        seed = sum(ord(c) for c in name) % 97  # 用于 shuffle 等确定性变化
-        src_dir = base / name / "src"
-        ensure_dir(src_dir)
-        tmpl = TEMPLATES[idx]
-        java_src = tmpl.replace("{STUDENT}", name).replace("{SEED}", str(seed))
-        # 写入 Main.java
-        write_text(src_dir / "Main.java", java_src)
-        # 写 README
-        write_text(base / name / "README.md", make_readme(name, idx))
-        created.append(base / name)
-
-    # 打包 zip
-    zip_path = base / OUTPUT_ZIP
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for folder in created:
-            for root, _, files in os.walk(folder):
-                for f in files:
-                    full = Path(root) / f
-                    zf.write(full, arcname=str(full.relative_to(base)))
-    print(f"已生成 {len(created)} 个文件夹，输出：{zip_path}")
+    """, dedent=True)
+
+def make_readme(name: str, idx: int) -> str:
+    return README_TEMPLATE.render(name=name, idx=idx)
+
+# 性能对比程序（--perf）：与上面的演示模板分开编号，不影响 stable_index 的模板分配。
+# 输出与排序计时程序（generate_java_sorts.py --bench）相同的制表符分隔格式：
+#     time  实现  场景  规模  第几次  纳秒
+# 可以同样用 python3 -m genkit.sortbench 汇总。规模和线程数由学生的种子决定（见 perf_params）。
+PERF_TEMPLATES = {}
+
+# ArrayList 与 LinkedList：随机下标读取、表头插入、顺序遍历
+PERF_TEMPLATES["ListPerf"] = Template("""\
+import java.util.ArrayList;
+import java.util.LinkedList;
+import java.util.List;
+import java.util.Random;
+import java.util.function.Supplier;
+
+// {STUDENT} 的集合性能对比（种子 {SEED}）：ArrayList 与 LinkedList
+// get 随机下标读取 OPS 次，add-front 在表头插入 OPS 次，iterate 顺序遍历求和。
+// 每个组合先预热 WARMUP 次再计时 RUNS 次；填充数据不计入时间。
+public class ListPerf {{
+    static final int N = {N};
+    static final int OPS = {OPS};
+    static final int WARMUP = 2;
+    static final int RUNS = 5;
+    static long sink;   // 累加结果，防止 JIT 把被测代码当作无用代码删掉
+
+    public static void main(String[] args) {{
+        System.out.println(\"# format\\tgenkit-sortbench/1\");
+        System.out.println(\"# student\\t{STUDENT}\");
+        System.out.println(\"# seed\\t{SEED}\");
+        System.out.println(\"# java\\t\" + System.getProperty(\"java.version\"));
+        bench(\"ArrayList\", ArrayList::new);
+        bench(\"LinkedList\", LinkedList::new);
+        System.out.println(\"# sink\\t\" + sink);
+    }}
+
+    static void bench(String impl, Supplier<List<Integer>> factory) {{
+        String[] workloads = {{\"get\", \"add-front\", \"iterate\"}};
+        for (String w : workloads) {{
+            for (int r = -WARMUP; r < RUNS; r++) {{
+                List<Integer> list = factory.get();
+                for (int i = 0; i < N; i++) list.add(i);
+                Random rnd = new Random({SEED});
+                long s = 0;
+                long t0 = System.nanoTime();
+                switch (w) {{
+                    case \"get\":
+                        for (int k = 0; k < OPS; k++) s += list.get(rnd.nextInt(N));
+                        break;
+                    case \"add-front\":
+                        for (int k = 0; k < OPS; k++) list.add(0, k);
+                        break;
+                    default:
+                        for (int v : list) s += v;
+                }}
+                long elapsed = System.nanoTime() - t0;
+                sink += s + list.size();
+                if (r >= 0) {{
+                    System.out.println(\"time\\t\" + impl + \"\\t\" + w + \"\\t\" + N + \"\\t\" + (r + 1) + \"\\t\" + elapsed);
+                }}
+            }}
+        }}
+    }}
+}}
+""", dedent=True)
+
+# HashMap 与 TreeMap：插入、命中查找、未命中查找、遍历
+PERF_TEMPLATES["MapPerf"] = Template("""\
+import java.util.HashMap;
+import java.util.Map;
+import java.util.Random;
+import java.util.TreeMap;
+import java.util.function.Supplier;
+
+// {STUDENT} 的集合性能对比（种子 {SEED}）：HashMap 与 TreeMap
+// put 插入 N 个随机键，get-hit 查找全部已有的键，get-miss 查找 N 个（几乎都）不存在的键，
+// iterate 遍历全部条目。每个组合先预热 WARMUP 次再计时 RUNS 次。
+public class MapPerf {{
+    static final int N = {N};
+    static final int WARMUP = 2;
+    static final int RUNS = 5;
+    static long sink;   // 累加结果，防止 JIT 把被测代码当作无用代码删掉
+
+    public static void main(String[] args) {{
+        System.out.println(\"# format\\tgenkit-sortbench/1\");
+        System.out.println(\"# student\\t{STUDENT}\");
+        System.out.println(\"# seed\\t{SEED}\");
+        System.out.println(\"# java\\t\" + System.getProperty(\"java.version\"));
+        Random rnd = new Random({SEED});
+        int[] keys = new int[N];
+        int[] misses = new int[N];
+        for (int i = 0; i < N; i++) keys[i] = rnd.nextInt();
+        for (int i = 0; i < N; i++) misses[i] = rnd.nextInt();
+        bench(\"HashMap\", HashMap::new, keys, misses);
+        bench(\"TreeMap\", TreeMap::new, keys, misses);
+        System.out.println(\"# sink\\t\" + sink);
+    }}
+
+    static void bench(String impl, Supplier<Map<Integer, Integer>> factory, int[] keys, int[] misses) {{
+        String[] workloads = {{\"put\", \"get-hit\", \"get-miss\", \"iterate\"}};
+        for (String w : workloads) {{
+            for (int r = -WARMUP; r < RUNS; r++) {{
+                Map<Integer, Integer> map = factory.get();
+                if (!w.equals(\"put\")) fill(map, keys);
+                long s = 0;
+                long t0 = System.nanoTime();
+                switch (w) {{
+                    case \"put\":
+                        fill(map, keys);
+                        s = map.size();
+                        break;
+                    case \"get-hit\":
+                        for (int k : keys) s += map.get(k);
+                        break;
+                    case \"get-miss\":
+                        for (int k : misses) if (map.get(k) != null) s++;
+                        break;
+                    default:
+                        for (Map.Entry<Integer, Integer> e : map.entrySet()) s += e.getValue();
+                }}
+                long elapsed = System.nanoTime() - t0;
+                sink += s;
+                if (r >= 0) {{
+                    System.out.println(\"time\\t\" + impl + \"\\t\" + w + \"\\t\" + N + \"\\t\" + (r + 1) + \"\\t\" + elapsed);
+                }}
+            }}
+        }}
+    }}
+
+    static void fill(Map<Integer, Integer> map, int[] keys) {{
+        for (int i = 0; i < keys.length; i++) map.put(keys[i], i);
+    }}
+}}
+""", dedent=True)
+
+# ConcurrentLinkedQueue 与 ArrayBlockingQueue：真正多线程的生产者/消费者
+PERF_TEMPLATES["QueuePerf"] = Template("""\
+import java.util.Queue;
+import java.util.concurrent.ArrayBlockingQueue;
+import java.util.concurrent.BlockingQueue;
+import java.util.concurrent.ConcurrentLinkedQueue;
+import java.util.concurrent.atomic.AtomicLong;
+
+// {STUDENT} 的集合性能对比（种子 {SEED}）：ConcurrentLinkedQueue 与 ArrayBlockingQueue
+// PRODUCERS 个生产者线程各放入 ITEMS 个整数，CONSUMERS 个消费者线程取出并求和；
+// 生产者全部结束后给每个消费者放一个结束标记（负数）。计时从启动线程到全部线程结束，
+// 结束后核对总和。无锁队列取不到元素时 Thread.yield() 后重试，阻塞队列用 put/take。
+public class QueuePerf {{
+    static final int PRODUCERS = {PRODUCERS};
+    static final int CONSUMERS = {CONSUMERS};
+    static final int ITEMS = {ITEMS};
+    static final int CAPACITY = 1024;
+    static final int WARMUP = 2;
+    static final int RUNS = 5;
+
+    interface Task {{
+        void run() throws InterruptedException;
+    }}
+
+    public static void main(String[] args) throws InterruptedException {{
+        System.out.println(\"# format\\tgenkit-sortbench/1\");
+        System.out.println(\"# student\\t{STUDENT}\");
+        System.out.println(\"# seed\\t{SEED}\");
+        System.out.println(\"# java\\t\" + System.getProperty(\"java.version\"));
+        System.out.println(\"# cpus\\t\" + Runtime.getRuntime().availableProcessors());
+        String workload = PRODUCERS + \"p\" + CONSUMERS + \"c\";
+        for (int r = -WARMUP; r < RUNS; r++) {{
+            report(\"ConcurrentLinkedQueue\", workload, r, run(new ConcurrentLinkedQueue<>()));
+        }}
+        for (int r = -WARMUP; r < RUNS; r++) {{
+            report(\"ArrayBlockingQueue\", workload, r, run(new ArrayBlockingQueue<>(CAPACITY)));
+        }}
+    }}
+
+    static void report(String impl, String workload, int r, long elapsed) {{
+        if (r >= 0) {{
+            System.out.println(\"time\\t\" + impl + \"\\t\" + workload + \"\\t\" + (long) PRODUCERS * ITEMS
+                    + \"\\t\" + (r + 1) + \"\\t\" + elapsed);
+        }}
+    }}
+
+    static long run(Queue<Integer> q) throws InterruptedException {{
+        AtomicLong sum = new AtomicLong();
+        Thread[] consumers = new Thread[CONSUMERS];
+        Thread[] producers = new Thread[PRODUCERS];
+        long t0 = System.nanoTime();
+        for (int c = 0; c < CONSUMERS; c++) {{
+            consumers[c] = start(() -> {{
+                long local = 0;
+                for (int v = take(q); v >= 0; v = take(q)) local += v;
+                sum.addAndGet(local);
+            }});
+        }}
+        for (int p = 0; p < PRODUCERS; p++) {{
+            producers[p] = start(() -> {{
+                for (int i = 0; i < ITEMS; i++) put(q, i);
+            }});
+        }}
+        for (Thread t : producers) t.join();
+        for (int c = 0; c < CONSUMERS; c++) put(q, -1);
+        for (Thread t : consumers) t.join();
+        long elapsed = System.nanoTime() - t0;
+        long expected = (long) PRODUCERS * ITEMS * (ITEMS - 1) / 2;
+        if (sum.get() != expected) {{
+            throw new IllegalStateException(\"总和不符：\" + sum.get() + \" != \" + expected);
+        }}
+        return elapsed;
+    }}
+
+    static void put(Queue<Integer> q, int v) throws InterruptedException {{
+        if (q instanceof BlockingQueue) {{
+            ((BlockingQueue<Integer>) q).put(v);
+        }} else {{
+            q.offer(v);
+        }}
+    }}
+
+    static int take(Queue<Integer> q) throws InterruptedException {{
+        if (q instanceof BlockingQueue) {{
+            return ((BlockingQueue<Integer>) q).take();
+        }}
+        Integer v;
+        while ((v = q.poll()) == null) Thread.yield();
+        return v;
+    }}
+
+    static Thread start(Task task) {{
+        Thread t = new Thread(() -> {{
+            try {{
+                task.run();
+            }} catch (InterruptedException e) {{
+                Thread.currentThread().interrupt();
+            }}
+        }});
+        t.start();
+        return t;
+    }}
+}}
+""", dedent=True)
+
+PERF_NAMES = tuple(PERF_TEMPLATES)
+PERF_MODES = ("assign", "all")
+
+README_PERF_TEMPLATE = Template("""\
+
+    性能对比（{programs}）：
+
+        javac -d bin src/*.java
+    {commands}
+
+    输出为制表符分隔的计时结果；把各文件夹放在一起后，可在上一级目录运行
+    `python3 -m genkit.sortbench` 汇总所有人的 bench.tsv。
+    """, dedent=True)
+README_PERF_COMMAND = Template("    java -cp bin {program} {redirect} bench.tsv")
+
+def perf_params(seed: int) -> dict:
+    """由种子（0..96）决定的规模和线程数，让不同学生测到不同的规模与并发度。"""
+    return {
+        "N": 5000 + 100 * seed,             # ListPerf 表长；MapPerf 再乘 10
+        "OPS": 2000 + 20 * seed,
+        "PRODUCERS": 1 + seed % 4,
+        "CONSUMERS": 1 + seed // 4 % 4,
+        "ITEMS": 100000 + 1000 * seed,
+    }
+
+def perf_programs(name: str, mode: str) -> tuple:
+    """学生得到的性能对比程序：assign 时按名字稳定分到一个，all 时全部。"""
+    if mode == "all":
+        return PERF_NAMES
+    return (PERF_NAMES[sum(ord(c) for c in name) % len(PERF_NAMES)],)
+
+def render_perf(program: str, name: str, seed: int) -> str:
+    values = perf_params(seed)
+    if program == "MapPerf":
+        values["N"] *= 10
+    tmpl = PERF_TEMPLATES[program]
+    return tmpl.render(STUDENT=name, SEED=seed, **{k: v for k, v in values.items() if k in tmpl.placeholders})
+
+def make_perf_readme(programs: tuple) -> str:
+    commands = "\n".join(README_PERF_COMMAND.render(program=p, redirect=">" if k == 0 else ">>")
+                         for k, p in enumerate(programs))
+    return README_PERF_TEMPLATE.render(programs="、".join(f"src/{p}.java" for p in programs), commands=commands)
+
+def render_student(i: int, name: str, total: Optional[int] = None, perf: Optional[str] = None) -> StudentOutput:
+    """渲染一个学生的全部文件（与 i、total 无关，签名与其他产物一致）。
+
+    perf 为 PERF_MODES 之一时另外附带性能对比程序。
+    """
+    idx = stable_index(name)
+    seed = sum(ord(c) for c in name) % 97  # 用于 shuffle 等确定性变化
+    tmpl = TEMPLATES[idx]
+    java_src = tmpl.render(STUDENT=name, SEED=seed)
+    readme = make_readme(name, idx)
+    files = [(f"{name}/src/Main.java", java_src)]
+    params = {"stable_index": idx, "seed": seed, "template": TEMPLATE_VERSIONS[idx]}
+    if perf is not None:
+        programs = perf_programs(name, perf)
+        files.extend((f"{name}/src/{p}.java", render_perf(p, name, seed)) for p in programs)
+        readme += make_perf_readme(programs)
+        params["perf"] = list(programs)
+    files.append((f"{name}/README.md", readme))
+    return StudentOutput(name, params, files)
+
+def checks(student: StudentOutput) -> list:
+    """genkit.verify：运行 Main 并与按模板编号和种子算出的输出比较。性能对比程序只计时，不运行。"""
+    idx, seed = student.params["stable_index"], student.params["seed"]
+    key = f"t{idx + 1:02d}" + (f"-s{seed:02d}" if "SEED" in TEMPLATES[idx].placeholders else "")
+    return [RunCheck("Main", key, expected_main_output(idx, student.name, seed))]
+
+def add_arguments(parser):
+    parser.add_argument("--perf", choices=PERF_MODES,
+                        help="另外生成集合性能对比程序（" + "、".join(PERF_NAMES) + "）：assign 每人按名字分到一个，"
+                             "all 每人全部；规模和线程数由各自的种子决定")
+
+def configure(args) -> Family:
+    if args.perf is None:
+        return FAMILY
+    return FAMILY._replace(render=partial(render_student, perf=args.perf))
+
+FAMILY = register_family(Family(
+    name="collections",
+    output_zip=OUTPUT_ZIP,
+    render=render_student,
+    templates=(*TEMPLATES, README_TEMPLATE, *PERF_TEMPLATES.values(), README_PERF_TEMPLATE, README_PERF_COMMAND),
+    description="生成 Java 集合框架小程序文件夹并打包为 zip",
+    done_message="已生成 {count} 个文件夹，输出：{path}",
+    add_arguments=add_arguments,
+    configure=configure,
+    checks=checks,
+))
+
+def main(argv=None):
+    engine.main([FAMILY], argv)
 
 if __name__ == "__main__":
     main()
@@ -4,24 +4,33 @@
 - src/BubbleSort.java
 - src/QuickSort.java
 - src/Main.java  （用于演示排序）
+- src/Bench.java （加 --bench 时：排序计时程序）
 - README.md
 
+--algorithms 换成其他算法组合（另有 intro 内省排序、merge 自底向上归并、heap 堆排序、
+radix LSD 基数排序，都不递归或递归深度有界，可以处理百万级输入）；--assign-sort 时每个学生
+另外按名字稳定地分到其中一种。
+
 脚本会在当前目录创建所有文件夹，并在完成后生成 java_sorts_42.zip。
 运行： python3 generate_java_sorts.py
+      python3 generate_java_sorts.py --zip-only   # 只生成 zip，不写出文件夹
+      python3 generate_java_sorts.py --bench --bench-sizes 1000,100000 --bench-runs 10
+      python3 generate_java_sorts.py --algorithms quick,intro,merge,heap,radix --bench --bench-sizes 1000000
+
+各文件夹运行 Bench 得到的 bench.tsv 可用 python3 -m genkit.sortbench 汇总成一张对比表。
 """
 from __future__ import annotations
-import os
-import zipfile
+import argparse
 import textwrap
-from pathlib import Path
+from functools import partial
+from typing import NamedTuple, Optional, Tuple
+
+from genkit import engine
+from genkit.engine import Family, register_family
+from genkit.output import StudentOutput
+from genkit.template import Template
+from genkit.verify import RunCheck, java_array, java_random_ints
 
-NAMES = [
-    "liting","ganrourou","panjincheng","huhao","wangxinyu","tanziqiang","zhangxinghuo","tanjierong","fanli","laishuanggui",
-    "hehao","liujunli","zhongyupeng","menghangxu","xubo","yuzhuokun","shijiaxue","zouyuxiang","wuhan","zhangyixin",
-    "liuhongcheng","zhouziyi","renran","zhengjiezhong","chengyanping","luoyi","zhengronglei","hemeilin","yanghaoran",
-    "dengxiaoyan","wangjingsheng","liaojiayu","zhangjingxi","zhangjieyi","tangqiang","huangjiajun","hutao","yangxiling",
-    "xieyucan","luoyifeng","guwencai","caichunmei",
-]
 
 OUTPUT_ZIP = "java_sorts_42.zip"
 
@@ -78,21 +87,249 @@ public class QuickSort {
 }
 """)
 
-MAIN_TEMPLATE = textwrap.dedent("""\
+INTRO_SRC = textwrap.dedent("""\
+public class IntroSort {
+    // 内省排序（升序）：三数取中的快速排序；区间不超过 16 个元素时改用插入排序，
+    // 递归深度超过 2*log2(n) 时该区间改用堆排序，最坏情况也是 O(n log n)。
+    // 每次只递归较短的一边，较长的一边在循环里继续处理，栈深度不超过 log2(n)。
+    private static final int INSERTION_CUTOFF = 16;
+
+    public static void sort(int[] a) {
+        if (a.length < 2) return;
+        int depth = 2 * (31 - Integer.numberOfLeadingZeros(a.length));
+        sort(a, 0, a.length - 1, depth);
+    }
+
+    private static void sort(int[] a, int lo, int hi, int depth) {
+        while (hi - lo >= INSERTION_CUTOFF) {
+            if (depth == 0) {
+                heapSort(a, lo, hi);
+                return;
+            }
+            depth--;
+            int p = partition(a, lo, hi);
+            if (p - lo < hi - p) {
+                sort(a, lo, p, depth);
+                lo = p + 1;
+            } else {
+                sort(a, p + 1, hi, depth);
+                hi = p;
+            }
+        }
+        insertionSort(a, lo, hi);
+    }
+
+    // Hoare 划分：返回 j，使 a[lo..j] <= 枢轴 <= a[j+1..hi]；与枢轴相等的元素分到两边，全部相等时也能对半分
+    private static int partition(int[] a, int lo, int hi) {
+        int mid = lo + (hi - lo) / 2;
+        if (a[mid] < a[lo]) swap(a, lo, mid);
+        if (a[hi] < a[lo]) swap(a, lo, hi);
+        if (a[hi] < a[mid]) swap(a, mid, hi);
+        int pivot = a[mid];
+        int i = lo - 1;
+        int j = hi + 1;
+        while (true) {
+            do { i++; } while (a[i] < pivot);
+            do { j--; } while (a[j] > pivot);
+            if (i >= j) return j;
+            swap(a, i, j);
+        }
+    }
+
+    private static void insertionSort(int[] a, int lo, int hi) {
+        for (int i = lo + 1; i <= hi; i++) {
+            int v = a[i];
+            int j = i - 1;
+            while (j >= lo && a[j] > v) {
+                a[j + 1] = a[j];
+                j--;
+            }
+            a[j + 1] = v;
+        }
+    }
+
+    // 对 a[lo..hi] 堆排序（与 HeapSort.java 相同的算法，放在这里使本文件可以单独使用）
+    private static void heapSort(int[] a, int lo, int hi) {
+        int n = hi - lo + 1;
+        for (int i = n / 2 - 1; i >= 0; i--) {
+            siftDown(a, lo, i, n);
+        }
+        for (int end = n - 1; end > 0; end--) {
+            swap(a, lo, lo + end);
+            siftDown(a, lo, 0, end);
+        }
+    }
+
+    private static void siftDown(int[] a, int base, int i, int n) {
+        int v = a[base + i];
+        while (true) {
+            int child = 2 * i + 1;
+            if (child >= n) break;
+            if (child + 1 < n && a[base + child + 1] > a[base + child]) child++;
+            if (a[base + child] <= v) break;
+            a[base + i] = a[base + child];
+            i = child;
+        }
+        a[base + i] = v;
+    }
+
+    private static void swap(int[] a, int i, int j) {
+        int t = a[i];
+        a[i] = a[j];
+        a[j] = t;
+    }
+}
+""")
+
+MERGE_SRC = textwrap.dedent("""\
+public class MergeSort {
+    // 自底向上的归并排序（升序，稳定）：不递归，按宽度 1、2、4……逐轮归并。
+    // 原数组和一个同样大小的辅助数组交替作为源和目标，每轮不必复制回去；O(n log n)。
+    public static void sort(int[] a) {
+        int n = a.length;
+        if (n < 2) return;
+        int[] src = a;
+        int[] dst = new int[n];
+        for (int width = 1; width < n; width = width < n - width ? 2 * width : n) {
+            for (int lo = 0, mid, hi; lo < n; lo = hi) {
+                mid = lo + Math.min(width, n - lo);
+                hi = mid + Math.min(width, n - mid);
+                merge(src, dst, lo, mid, hi);
+            }
+            int[] t = src;
+            src = dst;
+            dst = t;
+        }
+        if (src != a) System.arraycopy(src, 0, a, 0, n);
+    }
+
+    // 把有序的 src[lo..mid) 与 src[mid..hi) 合并到 dst[lo..hi)
+    private static void merge(int[] src, int[] dst, int lo, int mid, int hi) {
+        int i = lo;
+        int j = mid;
+        int k = lo;
+        while (i < mid && j < hi) {
+            dst[k++] = src[j] < src[i] ? src[j++] : src[i++];
+        }
+        System.arraycopy(src, i, dst, k, mid - i);
+        System.arraycopy(src, j, dst, k + mid - i, hi - j);
+    }
+}
+""")
+
+HEAP_SRC = textwrap.dedent("""\
+public class HeapSort {
+    // 堆排序（升序，原地）：先建大顶堆，再依次把堆顶换到末尾；O(n log n)，不需要额外空间
+    public static void sort(int[] a) {
+        int n = a.length;
+        for (int i = n / 2 - 1; i >= 0; i--) {
+            siftDown(a, i, n);
+        }
+        for (int end = n - 1; end > 0; end--) {
+            int t = a[0];
+            a[0] = a[end];
+            a[end] = t;
+            siftDown(a, 0, end);
+        }
+    }
+
+    // 把 a[i] 下沉到以 i 为根、大小为 n 的堆中的正确位置
+    private static void siftDown(int[] a, int i, int n) {
+        int v = a[i];
+        while (true) {
+            int child = 2 * i + 1;
+            if (child >= n) break;
+            if (child + 1 < n && a[child + 1] > a[child]) child++;
+            if (a[child] <= v) break;
+            a[i] = a[child];
+            i = child;
+        }
+        a[i] = v;
+    }
+}
+""")
+
+RADIX_SRC = textwrap.dedent("""\
+public class RadixSort {
+    // LSD 基数排序（升序，int[]）：每轮按 8 位分桶，共 4 轮，O(n)。
+    // 最高字节与 0x80 异或，负数排在正数之前；所有元素同一字节都相同的那一轮直接跳过。
+    public static void sort(int[] a) {
+        int n = a.length;
+        if (n < 2) return;
+        int[] src = a;
+        int[] dst = new int[n];
+        int[] count = new int[257];
+        for (int shift = 0; shift < 32; shift += 8) {
+            int flip = shift == 24 ? 0x80 : 0;
+            java.util.Arrays.fill(count, 0);
+            for (int v : src) {
+                count[(((v >>> shift) & 0xFF) ^ flip) + 1]++;
+            }
+            if (count[(((src[0] >>> shift) & 0xFF) ^ flip) + 1] == n) continue;
+            for (int d = 0; d < 256; d++) {
+                count[d + 1] += count[d];
+            }
+            for (int v : src) {
+                dst[count[((v >>> shift) & 0xFF) ^ flip]++] = v;
+            }
+            int[] t = src;
+            src = dst;
+            dst = t;
+        }
+        if (src != a) System.arraycopy(src, 0, a, 0, n);
+    }
+}
+""")
+
+
+class SortAlgorithm(NamedTuple):
+    cls: str            # Java 类名（也是文件名）
+    label: str          # 中文名，用于 Main 的输出和 README
+    english: str
+    source: str
+    bench_limit: int    # Bench 中的最大规模，超过时输出 skip 行；0 表示不限
+
+
+# --algorithms 中使用的名字 -> 算法；按此顺序写出文件和调用
+ALGORITHMS = {
+    "bubble": SortAlgorithm("BubbleSort", "冒泡排序", "Bubble Sort", BUBBLE_SRC, 20000),      # O(n^2)
+    "quick": SortAlgorithm("QuickSort", "快速排序", "Quick Sort", QUICK_SRC, 100000),         # 末元素为枢轴，有序输入退化
+    "intro": SortAlgorithm("IntroSort", "内省排序", "Introsort", INTRO_SRC, 0),
+    "merge": SortAlgorithm("MergeSort", "归并排序", "Bottom-up Merge Sort", MERGE_SRC, 0),
+    "heap": SortAlgorithm("HeapSort", "堆排序", "Heap Sort", HEAP_SRC, 0),
+    "radix": SortAlgorithm("RadixSort", "基数排序", "LSD Radix Sort", RADIX_SRC, 0),
+}
+DEFAULT_ALGORITHMS = ("bubble", "quick")
+# --assign-sort 时按名字稳定分给每个学生的一种可扩展到百万级输入的算法
+ASSIGNABLE = ("intro", "merge", "heap", "radix")
+_COUNTS = {1: "一", 2: "两", 3: "三", 4: "四", 5: "五", 6: "六"}
+
+
+def assigned_algorithm(name: str) -> str:
+    """按名字稳定地挑一个 ASSIGNABLE 中的算法（与集合示例的 stable_index 同样不依赖 hash 随机化）。"""
+    return ASSIGNABLE[sum(ord(c) for c in name) % len(ASSIGNABLE)]
+
+
+def student_algorithms(name: str, algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS,
+                       assign: bool = False) -> Tuple[str, ...]:
+    """一个学生得到的算法：选中的加上分到的，按 ALGORITHMS 的顺序排列。"""
+    chosen = set(algorithms)
+    if assign:
+        chosen.add(assigned_algorithm(name))
+    return tuple(k for k in ALGORITHMS if k in chosen)
+
+
+MAIN_TEMPLATE = Template("""\
 import java.util.Arrays;
 import java.util.Random;
 
 public class Main {{
-    // 简单演示：生成随机数组，复制一份分别用冒泡排序和快速排序排序，并打印前后对比
+    // 简单演示：生成随机数组，复制一份分别用{labels}排序，并打印前后对比
     public static void main(String[] args) {{
         int[] demo = sampleArray();
-        int[] a = Arrays.copyOf(demo, demo.length);
-        int[] b = Arrays.copyOf(demo, demo.length);
+{copies}
         System.out.println("原数组: " + Arrays.toString(demo));
-        BubbleSort.sort(a);
-        System.out.println("冒泡排序结果: " + Arrays.toString(a));
-        QuickSort.sort(b);
-        System.out.println("快速排序结果: " + Arrays.toString(b));
+{calls}
     }}
 
     private static int[] sampleArray() {{
@@ -104,16 +341,20 @@ public class Main {{
         return arr;
     }}
 }}
-""")
+""", dedent=True)
+
+MAIN_COPY_LINE = Template("        int[] {var} = Arrays.copyOf(demo, demo.length);")
+MAIN_CALL_LINES = Template("""\
+        {cls}.sort({var});
+        System.out.println("{label}结果: " + Arrays.toString({var}));""")
 
-README_FOLDER = textwrap.dedent("""\
+README_FOLDER = Template("""\
 # {name}
 
 此文件夹包含 Java 排序示例代码：
 
-- src/BubbleSort.java — 冒泡排序（Bubble Sort）
-- src/QuickSort.java — 快速排序（Quick Sort）
-- src/Main.java — 演示如何��用上述两个排序方法
+{sort_lines}
+- src/Main.java — 演示如何��用上述{count}个排序方法
 
 编译与运行（在包含该文件夹的目录中）：
 
@@ -121,38 +362,303 @@ README_FOLDER = textwrap.dedent("""\
     java -cp bin Main
 
 或在 CI 中使用 `javac` 批量编译所有子文件夹后可打包为 zip。
-""")
+""", dedent=True)
+
+README_SORT_LINE = Template("- src/{cls}.java — {label}（{english}）")
+
+# 计时程序：SIZES 等由 --bench-* 参数决定；输出格式见 genkit/sortbench.py
+BENCH_DISTRIBUTIONS = ("random", "sorted", "reversed", "duplicates")
+DEFAULT_BENCH_SIZES = (1000, 10000, 100000)
+
+BENCH_TEMPLATE = Template("""\
+    import java.util.Arrays;
+    import java.util.Random;
+    import java.util.function.Consumer;
+
+    /**
+     * 排序计时：对每个规模和输入分布，每种排序先预热 WARMUP 次，再计时 RUNS 次。
+     * 每次都排序同一输入的新副本，并与 Arrays.sort 的结果核对。
+     *
+     * 输出为制表符分隔的文本，# 开头的行是说明：
+     *     time  算法  分布  规模  第几次  纳秒
+     *     skip  算法  分布  规模  原因        （规模超过该算法的上限）
+     *     fail  算法  分布  规模  原因        （结果不正确 wrong-result、StackOverflowError 等）
+     *
+     * 某个组合失败只记一行 fail，继续计时其余的算法和分布。
+     *
+     *     java -cp bin Bench > bench.tsv
+     *     java -cp bin Bench 1000,50000 > bench.tsv     # 临时改用其他规模
+     */
+    public class Bench {
+        static final String STUDENT = "{STUDENT}";
+        static final int[] SIZES = {{SIZES}};
+        static final String[] DISTRIBUTIONS = {{DISTRIBUTIONS}};
+        static final int WARMUP = {WARMUP};
+        static final int RUNS = {RUNS};
+        static final long SEED = 42L;
+
+        static final class Algorithm {
+            final String name;
+            final Consumer<int[]> sort;
+            final int maxSize;
+
+            Algorithm(String name, Consumer<int[]> sort, int maxSize) {
+                this.name = name;
+                this.sort = sort;
+                this.maxSize = maxSize;
+            }
+        }
+
+        static final Algorithm[] ALGORITHMS = {
+    {ALGORITHMS}
+        };
+
+        /** 排序结果与 Arrays.sort 不一致。 */
+        static final class WrongResult extends RuntimeException {
+            WrongResult(String message) {
+                super(message);
+            }
+        }
+
+        public static void main(String[] args) {
+            int[] sizes = args.length > 0 ? parseSizes(args[0]) : SIZES;
+            System.out.println("# format\\tgenkit-sortbench/1");
+            System.out.println("# student\\t" + STUDENT);
+            System.out.println("# java\\t" + System.getProperty("java.version"));
+            System.out.println("# warmup\\t" + WARMUP);
+            for (int n : sizes) {
+                for (String dist : DISTRIBUTIONS) {
+                    int[] input = generate(dist, n);
+                    int[] expected = Arrays.copyOf(input, n);
+                    Arrays.sort(expected);
+                    for (Algorithm alg : ALGORITHMS) {
+                        String key = alg.name + "\\t" + dist + "\\t" + n;
+                        if (alg.maxSize > 0 && n > alg.maxSize) {
+                            System.out.println("skip\\t" + key + "\\tsize>" + alg.maxSize);
+                            continue;
+                        }
+                        try {
+                            for (int w = 0; w < WARMUP; w++) {
+                                run(alg, input, expected);
+                            }
+                            for (int r = 1; r <= RUNS; r++) {
+                                System.out.println("time\\t" + key + "\\t" + r + "\\t" + run(alg, input, expected));
+                            }
+                        } catch (WrongResult e) {
+                            System.out.println("fail\\t" + key + "\\twrong-result");
+                        } catch (StackOverflowError | RuntimeException e) {
+                            System.out.println("fail\\t" + key + "\\t" + e.getClass().getSimpleName());
+                        }
+                    }
+                }
+            }
+        }
+
+        static long run(Algorithm alg, int[] input, int[] expected) {
+            int[] a = Arrays.copyOf(input, input.length);
+            long t0 = System.nanoTime();
+            alg.sort.accept(a);
+            long elapsed = System.nanoTime() - t0;
+            if (!Arrays.equals(a, expected)) {
+                throw new WrongResult(alg.name + " 的排序结果不正确");
+            }
+            return elapsed;
+        }
+
+        static int[] generate(String dist, int n) {
+            Random r = new Random(SEED + n);
+            int[] a = new int[n];
+            for (int i = 0; i < n; i++) {
+                switch (dist) {
+                    case "sorted": a[i] = i; break;
+                    case "reversed": a[i] = n - i; break;
+                    case "duplicates": a[i] = r.nextInt(16); break;
+                    default: a[i] = r.nextInt();
+                }
+            }
+            return a;
+        }
+
+        static int[] parseSizes(String text) {
+            String[] parts = text.split(",");
+            int[] sizes = new int[parts.length];
+            for (int i = 0; i < parts.length; i++) {
+                sizes[i] = Integer.parseInt(parts[i].trim());
+            }
+            return sizes;
+        }
+    }
+    """, dedent=True, raw=True, names=("STUDENT", "SIZES", "DISTRIBUTIONS", "WARMUP", "RUNS", "ALGORITHMS"))
+
+BENCH_ALGORITHM_LINE = Template("""\
+        new Algorithm("{NAME}", {NAME}::sort, {MAX}),""", raw=True, names=("NAME", "MAX"))
+
+README_BENCH = Template("""\
+
+计时（src/Bench.java）：
+
+    java -cp bin Bench > bench.tsv
+
+规模 {sizes} 与输入分布 {distributions} 的每个组合，各排序先预热 {warmup} 次、
+再计时 {runs} 次，结果为制表符分隔的文本。把各文件夹放在一起后，可在上一级目录运行
+`python3 -m genkit.sortbench` 汇总所有人的 bench.tsv。
+""", dedent=True)
+
+
+class BenchSettings(NamedTuple):
+    """--bench 的设置；作为 render_student 的参数随渲染任务传给进程池。"""
+    sizes: Tuple[int, ...] = DEFAULT_BENCH_SIZES
+    distributions: Tuple[str, ...] = BENCH_DISTRIBUTIONS
+    warmup: int = 3
+    runs: int = 5
+
+
+def make_bench(name: str, bench: BenchSettings, algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS) -> str:
+    algorithms = "\n".join(BENCH_ALGORITHM_LINE.render(NAME=ALGORITHMS[k].cls, MAX=ALGORITHMS[k].bench_limit)
+                           for k in algorithms)
+    return BENCH_TEMPLATE.render(
+        STUDENT=name,
+        SIZES=", ".join(map(str, bench.sizes)),
+        DISTRIBUTIONS=", ".join(f'"{d}"' for d in bench.distributions),
+        WARMUP=bench.warmup,
+        RUNS=bench.runs,
+        ALGORITHMS=algorithms,
+    )
+
+
+def make_main(algorithms: Tuple[str, ...]) -> str:
+    algs = [ALGORITHMS[k] for k in algorithms]
+    labels = [a.label for a in algs]
+    variables = "abcdefghijklmnopqrstuvwxyz"
+    return MAIN_TEMPLATE.render(
+        labels=labels[0] if len(labels) == 1 else "、".join(labels[:-1]) + "和" + labels[-1],
+        copies="\n".join(MAIN_COPY_LINE.render(var=v) for v, _ in zip(variables, algs)),
+        calls="\n".join(MAIN_CALL_LINES.render(cls=a.cls, label=a.label, var=v) for v, a in zip(variables, algs)),
+    )
+
+
+def make_folder_readme(name: str, algorithms: Tuple[str, ...]) -> str:
+    algs = [ALGORITHMS[k] for k in algorithms]
+    return README_FOLDER.render(
+        name=name,
+        sort_lines="\n".join(README_SORT_LINE.render(cls=a.cls, label=a.label, english=a.english) for a in algs),
+        count=_COUNTS.get(len(algs), len(algs)),
+    )
+
+
+def render_student(i: int, name: str, total: Optional[int] = None, bench: Optional[BenchSettings] = None,
+                   algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS, assign: bool = False) -> StudentOutput:
+    """渲染一个学生的全部文件（与 i、total 无关，签名与其他产物一致）。
+
+    algorithms 为所有人都有的算法，assign 为真时每人另外分到 ASSIGNABLE 中的一个；
+    bench 不为 None 时附带计时程序。
+    """
+    chosen = student_algorithms(name, algorithms, assign)
+    readme = make_folder_readme(name, chosen)
+    # Java 源码
+    files = [(f"{name}/src/{ALGORITHMS[k].cls}.java", ALGORITHMS[k].source) for k in chosen]
+    files.append((f"{name}/src/Main.java", make_main(chosen)))
+    if bench is not None:
+        files.append((f"{name}/src/Bench.java", make_bench(name, bench, chosen)))
+        readme += README_BENCH.render(
+            sizes="、".join(map(str, bench.sizes)), distributions="、".join(bench.distributions),
+            warmup=bench.warmup, runs=bench.runs)
+    # README
+    files.append((f"{name}/README.md", readme))
+    params = {"algorithms": list(chosen)} if chosen != DEFAULT_ALGORITHMS else {}
+    return StudentOutput(name, params, files)
+
+
+def expected_main_output(algorithms: Tuple[str, ...] = DEFAULT_ALGORITHMS) -> str:
+    """Main.java 的输出：new Random(42) 的 12 个 nextInt(100)，以及每种算法排序后的结果。"""
+    demo = java_random_ints(42, 12, 100)
+    lines = [f"原数组: {java_array(demo)}"]
+    lines.extend(f"{ALGORITHMS[k].label}结果: {java_array(sorted(demo))}" for k in algorithms)
+    return "\n".join(lines) + "\n"
+
+
+def checks(student: StudentOutput) -> list:
+    """genkit.verify：运行 Main 并与由参数算出的输出比较（Bench 只计时，不运行）。"""
+    algorithms = tuple(student.params.get("algorithms", DEFAULT_ALGORITHMS))
+    return [RunCheck("Main", "main", expected_main_output(algorithms))]
+
+
+def _positive_int(text: str) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"应为正整数：{text!r}")
+    return value
+
+
+def _positive_ints(text: str) -> Tuple[int, ...]:
+    values = tuple(_positive_int(v) for v in text.split(",") if v.strip())
+    if not values:
+        raise argparse.ArgumentTypeError(f"应为逗号分隔的正整数：{text!r}")
+    return values
+
+
+def _distributions(text: str) -> Tuple[str, ...]:
+    values = tuple(v.strip() for v in text.split(",") if v.strip())
+    unknown = [v for v in values if v not in BENCH_DISTRIBUTIONS]
+    if not values or unknown:
+        raise argparse.ArgumentTypeError(f"未知的输入分布：{', '.join(unknown) or text!r}"
+                                         f"（可选：{','.join(BENCH_DISTRIBUTIONS)}）")
+    return values
+
+
+def _algorithms(text: str) -> Tuple[str, ...]:
+    values = tuple(dict.fromkeys(v.strip() for v in text.split(",") if v.strip()))
+    unknown = [v for v in values if v not in ALGORITHMS]
+    if not values or unknown:
+        raise argparse.ArgumentTypeError(f"未知的排序算法：{', '.join(unknown) or text!r}"
+                                         f"（可选：{','.join(ALGORITHMS)}）")
+    return values
+
+
+def add_arguments(parser):
+    parser.add_argument("--algorithms", type=_algorithms, default=DEFAULT_ALGORITHMS, metavar="NAMES",
+                        help="每个文件夹都生成的排序算法，逗号分隔（默认 " + ",".join(DEFAULT_ALGORITHMS)
+                             + "；可选：" + ",".join(ALGORITHMS) + "）")
+    parser.add_argument("--assign-sort", action="store_true",
+                        help="每个学生另外按名字稳定分到 " + ",".join(ASSIGNABLE) + " 中的一种")
+    parser.add_argument("--bench", action="store_true",
+                        help="另生成 src/Bench.java：按规模和输入分布为各排序计时，输出可汇总的结果")
+    parser.add_argument("--bench-sizes", type=_positive_ints, default=DEFAULT_BENCH_SIZES, metavar="N,N,...",
+                        help="计时的数组规模（默认 " + ",".join(map(str, DEFAULT_BENCH_SIZES)) + "）")
+    parser.add_argument("--bench-dists", type=_distributions, default=BENCH_DISTRIBUTIONS, metavar="NAMES",
+                        help="输入分布，逗号分隔（默认全部：" + ",".join(BENCH_DISTRIBUTIONS) + "）")
+    parser.add_argument("--bench-warmup", type=int, default=3, metavar="N",
+                        help="每个组合计时前的预热次数（默认 3）")
+    parser.add_argument("--bench-runs", type=_positive_int, default=5, metavar="N",
+                        help="每个组合计时的次数（默认 5）")
+
+
+def configure(args) -> Family:
+    if not args.bench and not args.assign_sort and args.algorithms == DEFAULT_ALGORITHMS:
+        return FAMILY
+    bench = BenchSettings(args.bench_sizes, args.bench_dists, max(0, args.bench_warmup), args.bench_runs) \
+        if args.bench else None
+    return FAMILY._replace(render=partial(render_student, bench=bench, algorithms=args.algorithms,
+                                          assign=args.assign_sort))
+
+FAMILY = register_family(Family(
+    name="sorts",
+    output_zip=OUTPUT_ZIP,
+    render=render_student,
+    templates=(*(a.source for a in ALGORITHMS.values()), MAIN_TEMPLATE, MAIN_COPY_LINE, MAIN_CALL_LINES,
+               README_FOLDER, README_SORT_LINE, BENCH_TEMPLATE, BENCH_ALGORITHM_LINE, README_BENCH),
+    description="生成 Java 排序示例文件夹并打包为 zip",
+    done_message="已为 {count} 个文件夹生成 Java 示例，导出为 {path}",
+    add_arguments=add_arguments,
+    configure=configure,
+    checks=checks,
+))
 
-def ensure_dir(p: Path):
-    p.mkdir(parents=True, exist_ok=True)
-
-def write_text(p: Path, s: str):
-    p.write_text(s, encoding="utf-8")
-
-def main():
-    base = Path.cwd()
-    created = []
-    for name in NAMES:
-        folder = base / name
-        src = folder / "src"
-        ensure_dir(src)
-        # 写入 Java 源码
-        write_text(src / "BubbleSort.java", BUBBLE_SRC)
-        write_text(src / "QuickSort.java", QUICK_SRC)
-        write_text(src / "Main.java", MAIN_TEMPLATE.format(name=name))
-        # README
-        write_text(folder / "README.md", README_FOLDER.format(name=name))
-        created.append(folder)
-
-    # 打包为 zip
-    zip_path = base / OUTPUT_ZIP
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-        for folder in created:
-            for root, _, files in os.walk(folder):
-                for f in files:
-                    full = Path(root) / f
-                    zf.write(full, arcname=str(full.relative_to(base)))
-    print(f"已为 {len(created)} 个文件夹生成 Java 示例，导出为 {zip_path}")
+def main(argv=None):
+    engine.main([FAMILY], argv)
 
 if __name__ == "__main__":
     main()
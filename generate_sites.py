@@ -3,72 +3,45 @@
 
 用法 (Python 3):
     python3 generate_sites.py
+    python3 generate_sites.py --zip-only   # 只生成 zip，不写出文件夹
 
 脚本行为：
 - 在脚本运行目录下，为每个拼音名称创建一个文件夹
 - 每个文件夹包含：index.html, styles.css, app.js, assets/avatar.svg, README.md
 - 每个站点使用不同的视觉风格（基于 HSL 色相分配）
+- 可用 --roster 指定外部名单文件（txt/csv/jsonl，- 表示标准输入）代替内置名单
+- 加 --shared-assets 时公共的样式表和脚本只在 _shared/ 下以带内容哈希的文件名写一次，
+  各站点只在 <html style="--h:…"> 上保留自己的色相
+- --avatars sprite 时所有头像作为 <symbol> 写进一个 avatars.svg，页面用 <use> 引用；
+  --avatars inline 时头像内联在各自的 index.html 中（适合单站部署）；默认每站一个 assets/avatar.svg
+- 名单（csv/jsonl）为学生指定了 photo 时用照片代替占位头像（assets/photo.<扩展名>），
+  assets 中的附件复制到 assets/files/ 并在页面上列出；素材由内核直接复制，不读进 Python
 - 最后生成 pinyin_folders_42.zip，包含所有 42 个文件夹
 
 注意：脚本仅使用 Python 标准库，无需额外依赖。
 """
 
 from __future__ import annotations
+import hashlib
 import os
-import zipfile
-import textwrap
-from pathlib import Path
-from html import escape
-
-NAMES = [
-    "liting",
-    "ganrourou",
-    "panjincheng",
-    "huhao",
-    "wangxinyu",
-    "tanziqiang",
-    "zhangxinghuo",
-    "tanjierong",
-    "fanli",
-    "laishuanggui",
-    "hehao",
-    "liujunli",
-    "zhongyupeng",
-    "menghangxu",
-    "xubo",
-    "yuzhuokun",
-    "shijiaxue",
-    "zouyuxiang",
-    "wuhan",
-    "zhangyixin",
-    "liuhongcheng",
-    "zhouziyi",
-    "renran",
-    "zhengjiezhong",
-    "chengyanping",
-    "luoyi",
-    "zhengronglei",
-    "hemeilin",
-    "yanghaoran",
-    "dengxiaoyan",
-    "wangjingsheng",
-    "liaojiayu",
-    "zhangjingxi",
-    "zhangjieyi",
-    "tangqiang",
-    "huangjiajun",
-    "hutao",
-    "yangxiling",
-    "xieyucan",
-    "luoyifeng",
-    "guwencai",
-    "caichunmei",
-]
+from functools import partial
+from typing import List, Optional
+from urllib.parse import quote
+
+from genkit import engine
+from genkit.engine import Family, register_family
+from genkit.filecopy import file_ref
+from genkit.output import Entry, StudentOutput, to_bytes
+from genkit.roster import NO_ASSETS, StudentAssets
+from genkit.template import Template
+
 
 OUTPUT_ZIP = "pinyin_folders_42.zip"
+GOLDEN_ANGLE = 137.508
+SHARED_DIR = "_shared"
+DEFAULT_HUE = 210   # 共享样式表里的默认色相，各站点用内联的 --h 覆盖
 
-def make_css(hue: int) -> str:
-    css = f"""
+CSS_TEMPLATE = Template("""
 :root{{
   --h:{hue};
   --primary: hsl(var(--h) 80% 50%);
@@ -89,8 +62,10 @@ body{{font-family: -apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,'Helvetica
 .footer{{text-align:center;padding:1rem;color:#666;font-size:0.9rem;}}
 .button{{background:var(--primary);color:white;padding:0.5rem 0.8rem;border:none;border-radius:6px;cursor:pointer}}
 @media (max-width:600px){{.container{{padding:.5rem}}.flex{{flex-direction:column;align-items:flex-start}}}}
-"""
-    return textwrap.dedent(css)
+""", dedent=True)
+
+def make_css(hue: int) -> str:
+    return CSS_TEMPLATE.render(hue=hue)
 
 def make_js() -> str:
     js = """
@@ -112,7 +87,7 @@ document.addEventListener('DOMContentLoaded', function(){
         alert('请填写姓名和留言。');
         return;
       }
-      alert('已提交（本地演示）：\n姓名：'+name+'\n留言：'+msg);
+      alert('已提交（本地演示）：\\n姓名：'+name+'\\n留言：'+msg);
       form.reset();
     });
   }
@@ -120,31 +95,100 @@ document.addEventListener('DOMContentLoaded', function(){
 """
     return js
 
+AVATAR_MODES = ('file', 'sprite', 'inline')
+SPRITE_FILE = 'avatars.svg'
+
+AVATAR_BODY_TEMPLATE = Template('''  <rect width="200" height="200" rx="20" fill="hsl({hue} 70% 55%)" />
+  <text x="50%" y="54%" dominant-baseline="middle" text-anchor="middle" font-family="sans-serif" font-size="56" fill="white">{initial}</text>''', html={'initial'})
+
+AVATAR_TEMPLATE = Template('''<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200" viewBox="0 0 200 200">
+{body}
+</svg>''')
+
+AVATAR_SYMBOL_TEMPLATE = Template('''<symbol id="{id}" viewBox="0 0 200 200">
+{body}
+</symbol>''')
+
+# 页面中引用头像的两处：file 模式用 <img>，sprite/inline 模式用 <svg><use>
+AVATAR_IMG_TEMPLATE = Template('''<img src="assets/avatar.svg" alt="{label}"{attrs}>''')
+AVATAR_USE_TEMPLATE = Template('''<svg viewBox="0 0 200 200" role="img" aria-label="{label}"{attrs}><use href="{href}"/></svg>''',
+                               html={'href'})
+INLINE_DEFS_TEMPLATE = Template('''
+  <svg width="0" height="0" style="position:absolute" aria-hidden="true">{symbol}</svg>''')
+# 名单中指定了照片时，三种头像方式都改用照片
+PHOTO_IMG_TEMPLATE = Template('''<img src="{src}" alt="{label}"{attrs}>''', html={'src'})
+PHOTO_DIR = 'assets'
+FILES_DIR = 'assets/files'
+
+def avatar_initial(name: str) -> str:
+    return (name[:2] if len(name)>=2 else name).upper()
+
 def make_avatar_svg(name: str, hue: int) -> str:
-    initial = (name[:2] if len(name)>=2 else name).upper()
-    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200" viewBox="0 0 200 200">
-  <rect width="200" height="200" rx="20" fill="hsl({hue} 70% 55%)" />
-  <text x="50%" y="54%" dominant-baseline="middle" text-anchor="middle" font-family="sans-serif" font-size="56" fill="white">{escape(initial)}</text>
-</svg>'''
-    return svg
-
-def make_index_html(title: str, name: str) -> str:
-    html = f"""
+    body = AVATAR_BODY_TEMPLATE.render(hue=hue, initial=avatar_initial(name))
+    return AVATAR_TEMPLATE.render(body=body)
+
+def symbol_id(name: str) -> str:
+    """名字转成可用作 id 和 URL 片段的 symbol id。"""
+    return 'av-' + ''.join(c if c.isascii() and (c.isalnum() or c in '-_') else f'_{ord(c):x}_' for c in name)
+
+def make_avatar_symbol(name: str, hue: int, sid: Optional[str] = None) -> str:
+    body = AVATAR_BODY_TEMPLATE.render(hue=hue, initial=avatar_initial(name))
+    return AVATAR_SYMBOL_TEMPLATE.render(id=sid or symbol_id(name), body=body)
+
+def photo_name(photo: str) -> str:
+    return 'photo' + os.path.splitext(photo)[1].lower()
+
+def avatar_markup(name: str, hue: int, mode: str, photo: Optional[str] = None) -> dict:
+    """index.html 中头像相关的三个片段：header_avatar、carousel_avatar 和 body 开头的 sprite_defs。"""
+    header_attrs = ' class="avatar"'
+    carousel_attrs = ' style="width:100%;border-radius:8px"'
+    if photo is not None:
+        src = f'{PHOTO_DIR}/{photo_name(photo)}'
+        return dict(header_avatar=PHOTO_IMG_TEMPLATE.render(src=src, label='照片', attrs=' class="avatar" style="object-fit:cover"'),
+                    carousel_avatar=PHOTO_IMG_TEMPLATE.render(src=src, label='照片', attrs=carousel_attrs),
+                    sprite_defs='')
+    if mode == 'file':
+        return dict(header_avatar=AVATAR_IMG_TEMPLATE.render(label='头像', attrs=header_attrs),
+                    carousel_avatar=AVATAR_IMG_TEMPLATE.render(label='示例1', attrs=carousel_attrs),
+                    sprite_defs='')
+    if mode == 'sprite':
+        href, defs = f'../{SPRITE_FILE}#{symbol_id(name)}', ''
+    else:
+        href = '#avatar'
+        defs = INLINE_DEFS_TEMPLATE.render(symbol=make_avatar_symbol(name, hue, 'avatar'))
+    return dict(header_avatar=AVATAR_USE_TEMPLATE.render(label='头像', attrs=header_attrs, href=href),
+                carousel_avatar=AVATAR_USE_TEMPLATE.render(label='示例1', attrs=carousel_attrs, href=href),
+                sprite_defs=defs)
+
+class AvatarSprite:
+    """--avatars sprite：在主进程中逐个收集各站的 <symbol>，最后写成一个 avatars.svg。"""
+
+    def __init__(self) -> None:
+        self._symbols: List[str] = []
+
+    def add(self, student: StudentOutput) -> None:
+        self._symbols.append(make_avatar_symbol(student.name, student.params['hue']))
+
+    def files(self) -> List[Entry]:
+        body = '\n'.join(self._symbols)
+        return [(SPRITE_FILE, f'<svg xmlns="http://www.w3.org/2000/svg">\n{body}\n</svg>\n')]
+
+INDEX_TEMPLATE = Template("""
 <!doctype html>
-<html lang="zh-CN">
+<html lang="zh-CN"{html_attrs}>
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width,initial-scale=1">
-  <title>{escape(title)} - 个人静态站</title>
-  <link rel="stylesheet" href="styles.css">
+  <title>{title} - 个人静态站</title>
+  <link rel="stylesheet" href="{css_href}">
 </head>
-<body>
+<body>{sprite_defs}
   <header class="header">
     <div class="container">
       <div class="flex">
-        <img src="assets/avatar.svg" alt="头像" class="avatar">
+        {header_avatar}
         <div>
-          <h1 style="margin:0">{escape(title)}</h1>
+          <h1 style="margin:0">{title}</h1>
           <p style="margin:0.25rem 0 0 0">一个用 HTML5 + CSS3 + JS 实现的静态演示站</p>
         </div>
       </div>
@@ -159,16 +203,16 @@ def make_index_html(title: str, name: str) -> str:
   <main class="container">
     <section id="about" class="card">
       <h2>关于</h2>
-      <p>这是为 <strong>{escape(title)}</strong> 生成的示例静态站，展示响应式布局、CSS 动画与基础交互。</p>
+      <p>这是为 <strong>{title}</strong> 生成的示例静态站，展示响应式布局、CSS 动画与基础交互。</p>
     </section>
 
     <section id="demo" class="card">
       <h2>演示：图片轮播（本地静态版）</h2>
       <p>下面是一个简单的图像占位轮播（无依赖）。</p>
       <div id="carousel" style="display:grid;grid-template-columns:1fr;gap:8px">
-        <img src="assets/avatar.svg" alt="示例1" style="width:100%;border-radius:8px">
+        {carousel_avatar}
       </div>
-    </section>
+    </section>{attachments}
 
     <section id="contact" class="card">
       <h2>联系</h2>
@@ -180,61 +224,165 @@ def make_index_html(title: str, name: str) -> str:
     </section>
   </main>
 
-  <footer class="footer">&copy; 本示例站 - {escape(title)}</footer>
-  <script src="app.js"></script>
+  <footer class="footer">&copy; 本示例站 - {title}</footer>
+  <script src="{js_src}"></script>
 </body>
 </html>
-"""
-    return textwrap.dedent(html)
+""", dedent=True, html={'title'})
+
+ATTACHMENTS_TEMPLATE = Template("""
+
+    <section id="files" class="card">
+      <h2>附件</h2>
+      <ul>
+{items}
+      </ul>
+    </section>""")
+ATTACHMENT_ITEM_TEMPLATE = Template('''        <li><a href="{href}">{label}</a>（{size}）</li>''', html={'href', 'label'})
+
+def human_size(n: int) -> str:
+    if n < 1024:
+        return f'{n} B'
+    return f'{n / 1024:.1f} KB' if n < 1024 * 1024 else f'{n / (1024 * 1024):.1f} MB'
+
+def attachments_markup(files) -> str:
+    """附件列表的 <section>；files 为 (文件名, 字节数)，没有附件时为空串。"""
+    if not files:
+        return ''
+    items = '\n'.join(ATTACHMENT_ITEM_TEMPLATE.render(href=f'{FILES_DIR}/{quote(base)}', label=base,
+                                                       size=human_size(size)) for base, size in files)
+    return ATTACHMENTS_TEMPLATE.render(items=items)
 
-def make_folder_readme(title: str) -> str:
-    md = f"""
+def make_index_html(title: str, name: str, css_href: str = "styles.css", js_src: str = "app.js",
+                    html_attrs: str = "", hue: int = 0, avatars: str = "file",
+                    photo: Optional[str] = None, attachments=()) -> str:
+    return INDEX_TEMPLATE.render(title=title, css_href=css_href, js_src=js_src, html_attrs=html_attrs,
+                                 attachments=attachments_markup(attachments),
+                                 **avatar_markup(name, hue, avatars, photo))
+
+FOLDER_README_TEMPLATE = Template("""
 # {title}
 
 这是为 `{title}` 生成的静态站演示。
 
 包含文件：
 - index.html：主页
-- styles.css：样式
-- app.js：前端交互（表单验证、平滑滚动）
-- assets/avatar.svg：占位头像
+{asset_lines}
+{avatar_line}
 
 打开方法：在浏览器中直接打开 `index.html` 即可。
-"""
-    return textwrap.dedent(md)
-
-def ensure_dir(p: Path) -> None:
-    p.mkdir(parents=True, exist_ok=True)
-
-def write_text_file(p: Path, content: str) -> None:
-    p.write_text(content, encoding='utf-8')
-
-def main():
-    base = Path.cwd()
-    created = []
-    for i, name in enumerate(NAMES):
-        folder = base / name
-        assets = folder / 'assets'
-        ensure_dir(assets)
-        hue = int((i * 360 / max(1, len(NAMES))) % 360)
-        # write files
-        write_text_file(folder / 'styles.css', make_css(hue))
-        write_text_file(folder / 'app.js', make_js())
-        write_text_file(folder / 'index.html', make_index_html(name, name))
-        write_text_file(folder / 'README.md', make_folder_readme(name))
-        write_text_file(assets / 'avatar.svg', make_avatar_svg(name, hue))
-        created.append(folder)
-
-    # zip
-    zip_path = base / OUTPUT_ZIP
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-        for folder in created:
-            for root, _, files in os.walk(folder):
-                for f in files:
-                    full = Path(root) / f
-                    rel = full.relative_to(base)
-                    zf.write(full, arcname=str(rel))
-    print(f'已创建 {len(created)} 个文件夹，导出为 {zip_path}')
+""", dedent=True)
+
+OWN_ASSET_LINES = "- styles.css：样式\n- app.js：前端交互（表单验证、平滑滚动）"
+SHARED_ASSET_LINES = (f"- ../{SHARED_DIR}/ 下带内容哈希的样式表和脚本：各站共用，可长期缓存"
+                      f"（本站色相写在 index.html 的 <html style> 上）")
+
+AVATAR_LINES = {
+    'file': "- assets/avatar.svg：占位头像",
+    'sprite': f"- 头像：../{SPRITE_FILE} 中的 <symbol>，各站共用（需通过 HTTP 打开，如 python3 -m genkit.preview）",
+    'inline': "- 头像：内联在 index.html 中",
+}
+
+def make_folder_readme(title: str, asset_lines: str = OWN_ASSET_LINES, avatars: str = 'file',
+                       photo: Optional[str] = None, attachments: int = 0) -> str:
+    avatar_line = f"- {PHOTO_DIR}/{photo_name(photo)}：照片" if photo else AVATAR_LINES[avatars]
+    if attachments:
+        avatar_line += f"\n- {FILES_DIR}/：附件 {attachments} 个"
+    return FOLDER_README_TEMPLATE.render(title=title, asset_lines=asset_lines, avatar_line=avatar_line)
+
+def site_hue(i: int, total: Optional[int]) -> int:
+    if total is None:
+        # 总人数未知（名单来自标准输入）时按黄金角递增，相邻站点的色相仍然相差很大
+        return int((i * GOLDEN_ANGLE) % 360)
+    return int((i * 360 / max(1, total)) % 360)
+
+def hashed_name(stem: str, ext: str, content: str) -> str:
+    """带内容哈希的文件名，内容变化时名字随之变化，可以放心地长期缓存。"""
+    return f"{stem}.{hashlib.sha256(to_bytes(content)).hexdigest()[:10]}{ext}"
+
+def shared_files(production: bool = False) -> List[Entry]:
+    """各站共用的样式表和脚本（写在 _shared/ 下）。
+
+    文件名中的哈希取自最终写出的字节：production 为真时是 engine 压缩之后的版本，这样只改动
+    压缩器也会换名字。条目内容仍是原文，与其他条目一样由 engine 统一做 --production 处理。
+    """
+    opts = engine.RenderOptions(validate=False, production=production)
+    files = []
+    for stem, ext, text in (('site', '.css', make_css(DEFAULT_HUE)), ('app', '.js', make_js())):
+        final = engine.postprocess(StudentOutput('', {}, [(stem + ext, text)]), opts).files[0][1]
+        files.append((f'{SHARED_DIR}/{hashed_name(stem, ext, final)}', text))
+    return files
+
+def render_student(i: int, name: str, total: Optional[int], shared_assets: Optional[tuple] = None,
+                   avatars: str = 'file', assets: StudentAssets = NO_ASSETS) -> StudentOutput:
+    """渲染第 i 个站点的全部文件。
+
+    shared_assets 为 shared_files() 的条目时引用 _shared/ 下的公共资源；avatars 为头像的输出方式
+    （见 AVATAR_MODES）；assets 为名单中的照片和附件，以 FileRef 条目输出，写出时才复制内容。
+    """
+    hue = site_hue(i, total)
+    if shared_assets:
+        (css, _), (js, _) = shared_assets
+        files = []
+        page = dict(css_href=f'../{css}', js_src=f'../{js}', html_attrs=f' style="--h:{hue}"')
+        asset_lines = SHARED_ASSET_LINES
+    else:
+        files = [
+            (f'{name}/styles.css', make_css(hue)),
+            (f'{name}/app.js', make_js()),
+        ]
+        page = {}
+        asset_lines = OWN_ASSET_LINES
+    photo = assets.photo
+    refs = [(os.path.basename(p), file_ref(p)) for p in assets.files]
+    files.append((f'{name}/index.html', make_index_html(name, name, hue=hue, avatars=avatars, photo=photo,
+                                                        attachments=[(b, r.size) for b, r in refs], **page)))
+    files.append((f'{name}/README.md', make_folder_readme(name, asset_lines, avatars, photo, len(refs))))
+    params = {'hue': hue}
+    if photo is not None:
+        files.append((f'{name}/{PHOTO_DIR}/{photo_name(photo)}', file_ref(photo)))
+        params['photo'] = photo
+    elif avatars == 'file':
+        files.append((f'{name}/assets/avatar.svg', make_avatar_svg(name, hue)))
+    files.extend((f'{name}/{FILES_DIR}/{base}', ref) for base, ref in refs)
+    if refs:
+        params['assets'] = list(assets.files)
+    return StudentOutput(name, params, files)
+
+def add_arguments(parser):
+    parser.add_argument('--shared-assets', action='store_true',
+                        help=f'公共样式表和脚本只在 {SHARED_DIR}/ 下以带内容哈希的文件名写一次，各站点只保留色相')
+    parser.add_argument('--avatars', choices=AVATAR_MODES, default='file',
+                        help=f'头像输出方式：file 每站一个 assets/avatar.svg（默认）；sprite 全部写进一个 '
+                             f'{SPRITE_FILE} 并用 <use> 引用；inline 内联在 index.html 中')
+
+def configure(args) -> Family:
+    if not args.shared_assets and args.avatars == 'file':
+        return FAMILY
+    shared = tuple(shared_files(args.production)) if args.shared_assets else ()
+    return FAMILY._replace(
+        render=partial(render_student, shared_assets=shared, avatars=args.avatars),
+        shared_files=shared,
+        collector=AvatarSprite if args.avatars == 'sprite' else None,
+    )
+
+FAMILY = register_family(Family(
+    name='sites',
+    output_zip=OUTPUT_ZIP,
+    render=render_student,
+    templates=(CSS_TEMPLATE, make_js, AVATAR_BODY_TEMPLATE, AVATAR_TEMPLATE, AVATAR_SYMBOL_TEMPLATE,
+               AVATAR_IMG_TEMPLATE, AVATAR_USE_TEMPLATE, INLINE_DEFS_TEMPLATE, PHOTO_IMG_TEMPLATE, INDEX_TEMPLATE,
+               ATTACHMENTS_TEMPLATE, ATTACHMENT_ITEM_TEMPLATE, FOLDER_README_TEMPLATE),
+    description='生成拼音命名的静态站并打包为 zip',
+    done_message='已创建 {count} 个文件夹，导出为 {path}',
+    needs_total=True,
+    add_arguments=add_arguments,
+    configure=configure,
+    assets=True,
+))
+
+def main(argv=None):
+    engine.main([FAMILY], argv)
 
 
 if __name__ == '__main__':
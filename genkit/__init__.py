@@ -0,0 +1,3 @@
+"""
+三个生成脚本（generate_sites.py / generate_java_sorts.py / generate_java_collections.py）共用的工具包。
+"""
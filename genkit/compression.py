@@ -0,0 +1,97 @@
+"""
+zip 成员的压缩策略：按扩展名选择压缩级别，小文件和压不动的内容直接存储。
+
+--compression 的写法为逗号分隔的列表，不带扩展名的一项是默认级别，其余为 扩展名=级别，
+级别 0 表示不压缩（ZIP_STORED）。例如：
+
+    --compression 6,.java=9,.md=9,.svg=9
+
+图片、gz 等本身已压缩的格式默认直接存储；小于 --store-below 字节的文件也直接存储，
+压缩后不比原文小的成员同样退回为存储。
+
+素材文件（filecopy.FileRef）直接存储时不读入内存，CRC 在 mmap 上计算、数据写出时由内核
+复制；需要压缩的素材读入后与普通内容一样压缩。
+"""
+from __future__ import annotations
+import argparse
+import posixpath
+import zipfile
+import zlib
+from typing import Dict, Optional, Tuple
+
+from .filecopy import FileRef, file_crc32, read_file
+from .zipwriter import RawMember, compress_member
+
+DEFAULT_LEVEL = 6
+DEFAULT_STORE_BELOW = 128
+
+# 本身已经压缩过的格式，再 deflate 只会浪费 CPU
+PRECOMPRESSED = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".gz", ".zip", ".br", ".woff2", ".mp3", ".mp4")
+
+
+class CompressionPolicy:
+    def __init__(self, level: int = DEFAULT_LEVEL, levels: Optional[Dict[str, int]] = None,
+                 store_below: int = DEFAULT_STORE_BELOW) -> None:
+        self.level = level
+        self.levels = {ext: 0 for ext in PRECOMPRESSED}
+        self.levels.update(levels or {})
+        self.store_below = store_below
+
+    def key(self) -> str:
+        """策略的规范写法，记在增量清单里：策略变了就不再复用旧压缩包中的成员。"""
+        levels = ",".join(f"{ext}={n}" for ext, n in sorted(self.levels.items()))
+        return f"{self.level},{levels};store-below={self.store_below}"
+
+    def choose(self, name: str, size: int) -> Tuple[int, int]:
+        """返回 (压缩方式, 级别)。"""
+        if size < self.store_below:
+            return zipfile.ZIP_STORED, 0
+        ext = posixpath.splitext(name)[1].lower()
+        level = self.levels.get(ext, self.level)
+        if level == 0:
+            return zipfile.ZIP_STORED, 0
+        return zipfile.ZIP_DEFLATED, level
+
+    def compress(self, name: str, data, date_time) -> RawMember:
+        """按策略压缩一个成员（bytes 或 FileRef）；可在工作线程中调用。"""
+        if isinstance(data, FileRef):
+            method, level = self.choose(name, data.size)
+            if method == zipfile.ZIP_STORED:
+                return RawMember(name, method, file_crc32(data), data.size, data, tuple(date_time))
+            data = read_file(data)
+        method, level = self.choose(name, len(data))
+        member = compress_member(name, data, date_time, level=level, method=method)
+        if method == zipfile.ZIP_DEFLATED and len(member.data) >= len(data):
+            return member._replace(method=zipfile.ZIP_STORED, data=data)
+        return member
+
+
+def parse_policy(spec: Optional[str], store_below: int = DEFAULT_STORE_BELOW) -> CompressionPolicy:
+    level = DEFAULT_LEVEL
+    levels: Dict[str, int] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        ext, sep, value = item.rpartition("=")
+        try:
+            n = int(value)
+        except ValueError:
+            raise ValueError(f"无法解析压缩级别：{item!r}") from None
+        if not 0 <= n <= zlib.Z_BEST_COMPRESSION:
+            raise ValueError(f"压缩级别须在 0-9 之间：{item!r}")
+        if sep:
+            ext = ext.lower()
+            levels[ext if ext.startswith(".") else "." + ext] = n
+        else:
+            level = n
+    return CompressionPolicy(level, levels, store_below)
+
+
+def add_compression_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--compression", metavar="SPEC",
+                        help=f"zip 压缩级别，如 6,.java=9,.png=0（默认 {DEFAULT_LEVEL}，已压缩格式直接存储）")
+    parser.add_argument("--store-below", type=int, default=DEFAULT_STORE_BELOW, metavar="BYTES",
+                        help=f"小于该字节数的文件不压缩（默认 {DEFAULT_STORE_BELOW}）")
+    parser.add_argument("--compress-threads", type=int, default=0, metavar="N",
+                        help="并发压缩成员（以及写文件）的线程数，0 表示全部 CPU（默认）")
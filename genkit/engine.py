@@ -0,0 +1,296 @@
+"""
+多产物生成引擎。
+
+站点、Java 排序示例、Java 集合示例各自以 Family 插件的形式注册到这里（见各 generate_*.py
+末尾的 register_family 调用）。一次运行只遍历名单一遍：对每个学生依次调用所有选中产物的
+渲染函数，把结果交给各自的 OutputWriter，所有压缩包在同一趟中写完。
+
+渲染出的 .java 文件在交给 OutputWriter 之前先经过 javacheck 的词法级检查（随渲染一起在
+进程池中进行）；任何一处不通过都会中止本次运行，已有的压缩包保持不变。
+--production 时网页资源在同一位置经过 minify 压缩并附上 .gz。
+--watch 时先完整生成一次，之后由 watch.py 监视改动并只重新渲染受影响的学生。
+输出位置由 --output-dir、--archive、--no-archive 决定（见 output.py 的输出端）；
+--archive - 时压缩包流式写到标准输出，提示信息改为写到标准错误。
+--shard-size/--shard-bytes 时每个产物拆成多个分片压缩包，另写出索引（见 shards.py）。
+
+单独运行某个 generate_*.py 等价于只选中该产物；generate_all.py 一次生成全部产物。
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import javacheck, minify
+from .compression import CompressionPolicy, add_compression_arguments, parse_policy
+from .manifest import template_version
+from .output import (STDOUT, OutputWriter, StudentOutput, WriteStats, add_output_arguments, archive_target,
+                     describe_target)
+from .parallel import ordered_map, resolve_jobs
+from .profile import Profile, clock
+from .roster import NO_ASSETS, Roster, RosterError, StudentAssets, add_roster_arguments, load_roster
+from .shards import ShardedArchive, add_shard_arguments, shard_spec
+
+# 内置插件所在的模块；导入时即完成注册
+BUILTIN_PLUGINS = ("generate_sites", "generate_java_sorts", "generate_java_collections")
+
+
+class Family(NamedTuple):
+    """一类产物。render(i, name, total) 渲染第 i 个学生；total 为名单总人数，未知时为 None。
+
+    产物自己的命令行参数由 add_arguments(parser) 添加，解析后由 configure(args) 返回按参数
+    调整过的 Family（例如把 render 换成带选项的 functools.partial，以便传给渲染进程）。
+    shared_files 是与学生无关、只写一次的条目，在所有学生之前写入。
+    collector() 返回一个收集器：主进程中依次 add(StudentOutput)，全部学生写完后由 files()
+    给出汇总条目（如所有头像合成的 sprite），在最后写入。
+    checks(StudentOutput) 返回该学生要编译运行并检查输出的 verify.RunCheck 列表（见 verify.py）。
+    assets 为真时，名单中指定了素材的学生以 render(i, name, total, assets=roster.StudentAssets)
+    渲染，素材作为 filecopy.FileRef 条目输出；其余产物忽略名单中的素材。
+    """
+    name: str
+    output_zip: str
+    render: Callable[[int, str, Optional[int]], StudentOutput]
+    templates: tuple            # 参与模板版本摘要的模板文本/渲染函数
+    description: str
+    done_message: str           # 完成提示，可用 {count} 与 {path}
+    needs_total: bool = False   # 渲染是否需要预先知道总人数
+    add_arguments: Optional[Callable[[argparse.ArgumentParser], None]] = None
+    configure: Optional[Callable[[argparse.Namespace], "Family"]] = None
+    shared_files: tuple = ()
+    collector: Optional[Callable[[], object]] = None
+    checks: Optional[Callable[[StudentOutput], list]] = None
+    assets: bool = False
+
+
+_REGISTRY: Dict[str, Family] = {}
+
+
+def register_family(family: Family) -> Family:
+    _REGISTRY[family.name] = family
+    return family
+
+
+def load_plugins(modules: Iterable[str] = BUILTIN_PLUGINS) -> None:
+    for module in modules:
+        importlib.import_module(module)
+
+
+def families(names: Optional[Sequence[str]] = None) -> List[Family]:
+    """按名字取出已注册的产物；names 为 None 时返回全部（按注册顺序）。"""
+    if names is None:
+        return list(_REGISTRY.values())
+    missing = [n for n in names if n not in _REGISTRY]
+    if missing:
+        raise KeyError(f"未注册的产物：{', '.join(missing)}（可选：{', '.join(_REGISTRY)}）")
+    return [_REGISTRY[n] for n in names]
+
+
+class RenderOptions(NamedTuple):
+    """渲染之后、写出之前的处理开关，随渲染任务一起交给进程池。"""
+    validate: bool = True       # 检查 Java 源码
+    production: bool = False    # 压缩 CSS/JS/HTML/SVG 并生成 .gz（见 minify.py）
+
+
+def _validate(out: StudentOutput) -> None:
+    problems = javacheck.check_outputs(out.files)
+    if problems:
+        raise javacheck.JavaCheckError(problems)
+
+
+def _production(out: StudentOutput) -> StudentOutput:
+    return out._replace(files=minify.production_files(out.files))
+
+
+def postprocess(out: StudentOutput, opts: RenderOptions) -> StudentOutput:
+    """渲染之后、写出之前的处理：--production 时压缩网页资源并附上 .gz，再按需检查 Java 源码。
+
+    学生输出、共享文件和收集器的汇总条目都经过这一步；需要知道最终写出字节的插件（如带内容
+    哈希的共享资源名）也用它。检查不通过时抛出 javacheck.JavaCheckError。
+    """
+    if opts.production:
+        out = _production(out)
+    if opts.validate:
+        _validate(out)
+    return out
+
+
+def render_family(f: Family, i: int, name: str, total: Optional[int],
+                  assets: StudentAssets = NO_ASSETS) -> StudentOutput:
+    """渲染一个学生在产物 f 中的输出；只有接受素材的产物才会收到名单中的素材。"""
+    if f.assets and assets != NO_ASSETS:
+        return f.render(i, name, total, assets=assets)
+    return f.render(i, name, total)
+
+
+def render_all(fams: Tuple[Family, ...], opts: RenderOptions, i: int, name: str,
+               total: Optional[int], assets: StudentAssets = NO_ASSETS) -> List[StudentOutput]:
+    """渲染一个学生在所有产物中的输出。模块级函数，可被进程池 pickle。
+
+    opts.validate 为真时检查其中的 Java 源码，不通过则抛出 JavaCheckError。
+    """
+    return [postprocess(render_family(f, i, name, total, assets), opts) for f in fams]
+
+
+def render_all_timed(fams: Tuple[Family, ...], opts: RenderOptions, i: int, name: str, total: Optional[int],
+                     assets: StudentAssets = NO_ASSETS) -> Tuple[List[StudentOutput], List[Tuple[str, str, float]]]:
+    """同 render_all，另返回 (产物, 阶段, 秒) 计时列表，供 --profile 在主进程汇总。"""
+    outputs = []
+    timings = []
+    for f in fams:
+        t0 = clock()
+        out = render_family(f, i, name, total, assets)
+        timings.append((f.name, "render", clock() - t0))
+        if opts.production:
+            t0 = clock()
+            out = _production(out)
+            timings.append((f.name, "minify", clock() - t0))
+        if opts.validate:
+            t0 = clock()
+            _validate(out)
+            timings.append((f.name, "validate", clock() - t0))
+        outputs.append(out)
+    return outputs, timings
+
+
+def _recorded(profile: Profile, results: Iterable[tuple]) -> Iterator[List[StudentOutput]]:
+    for outputs, timings in results:
+        for family, stage, seconds in timings:
+            profile.record(family, stage, seconds)
+        yield outputs
+
+
+def run(fams: Sequence[Family], roster: Roster, base: Path, args: argparse.Namespace,
+        policy: Optional[CompressionPolicy] = None,
+        profile: Optional[Profile] = None) -> List[Tuple[Optional[Path], WriteStats]]:
+    """一趟生成所有产物，返回每个产物的 (压缩包路径, 统计信息)，不打包时路径为 None。
+    传入 profile 时记录各阶段统计。"""
+    fams = tuple(fams)
+    jobs = resolve_jobs(args.jobs)
+    threads = resolve_jobs(args.compress_threads)
+    total = roster.count() if any(f.needs_total for f in fams) else None
+    items = ((i, name, total, assets) for i, (name, assets) in enumerate(roster.records()))
+    opts = RenderOptions(validate=args.validate, production=args.production)
+    if profile is None:
+        rendered = ordered_map(partial(render_all, fams, opts), items, jobs)
+    else:
+        rendered = _recorded(profile, ordered_map(partial(render_all_timed, fams, opts), items, jobs))
+
+    # 多个产物的文件夹同名（都以学生名命名），同时生成时各自写到 base/<产物名>/ 下
+    def folder_root(f: Family) -> Path:
+        return base / f.name if len(fams) > 1 else base
+
+    spec = shard_spec(args)
+
+    def open_writer(f: Family, pool) -> OutputWriter:
+        archive = archive_target(base, f.output_zip, args)
+        shards = None
+        if spec is not None:
+            shards = ShardedArchive(archive, spec, policy, args.reproducible, args.format)
+            archive = shards.index
+        return OutputWriter(folder_root(f), archive,
+                            zip_only=args.zip_only, dedup=args.dedup, incremental=args.incremental,
+                            template=template_version(*f.templates), pool=pool, window=threads * 4,
+                            policy=policy, reproducible=args.reproducible, profile=profile, label=f.name,
+                            fmt=args.format, shards=shards, checksums=args.checksums)
+
+    with ThreadPoolExecutor(max_workers=threads) if threads > 1 else nullcontext() as pool:
+        writers = [open_writer(f, pool) for f in fams]
+        collectors = [f.collector() if f.collector is not None else None for f in fams]
+        try:
+            for f, writer in zip(fams, writers):
+                if f.shared_files:
+                    shared = StudentOutput("", {}, list(f.shared_files))
+                    writer.add(postprocess(shared, opts), count=False)
+            for outputs in rendered:
+                for writer, collector, student in zip(writers, collectors, outputs):
+                    writer.add(student)
+                    if collector is not None:
+                        collector.add(student)
+            for writer, collector in zip(writers, collectors):
+                if collector is not None:
+                    writer.add(postprocess(StudentOutput("", {}, collector.files()), opts), count=False)
+        except BaseException:
+            for writer in writers:
+                writer.abort()
+            raise
+        return [(w.archive, w.close()) for w in writers]
+
+
+def build_parser(description: str, fams: Sequence[Family] = ()) -> argparse.ArgumentParser:
+    """公共命令行参数，外加 fams 中各产物自己的参数。"""
+    parser = argparse.ArgumentParser(description=description)
+    add_roster_arguments(parser)
+    add_output_arguments(parser)
+    add_shard_arguments(parser)
+    add_compression_arguments(parser)
+    parser.add_argument("--no-validate", dest="validate", action="store_false",
+                        help="跳过写出前对 Java 源码的检查")
+    parser.add_argument("--production", action="store_true",
+                        help="生产构建：压缩 CSS/JS/HTML/SVG，并在旁边生成预压缩的 .gz 文件")
+    parser.add_argument("--profile", action="store_true",
+                        help="结束时打印各产物、各阶段的耗时、次数、字节数和压缩率")
+    parser.add_argument("--profile-json", type=Path, metavar="PATH",
+                        help="把 --profile 的统计另存为 JSON（隐含 --profile）")
+    parser.add_argument("--watch", action="store_true",
+                        help="生成后继续监视生成脚本与名单，改动后只重新渲染受影响的学生（见 watch.py）")
+    parser.add_argument("--watch-interval", type=float, default=0.5, metavar="SEC",
+                        help="--watch 检查文件变化的间隔秒数（默认 0.5）")
+    for f in fams:
+        if f.add_arguments is not None:
+            f.add_arguments(parser)
+    return parser
+
+
+def main(fams: Sequence[Family], argv=None, parser: Optional[argparse.ArgumentParser] = None,
+         args: Optional[argparse.Namespace] = None) -> None:
+    """生成脚本的公共入口：解析参数、读取名单、生成并打印结果。"""
+    if parser is None:
+        parser = build_parser(fams[0].description if len(fams) == 1 else "一次生成多类产物", fams)
+    if args is None:
+        args = parser.parse_args(argv)
+    fams = [f.configure(args) if f.configure is not None else f for f in fams]
+    try:
+        policy = parse_policy(args.compression, args.store_below)
+    except ValueError as e:
+        parser.error(str(e))
+    streaming = args.archive == "-"
+    if args.archive and (args.no_archive or len(fams) > 1):
+        parser.error("--archive 只能用于单个产物，且不能与 --no-archive 一起使用")
+    if (args.incremental or args.watch) and (args.no_archive or streaming):
+        parser.error("--incremental/--watch 需要写到压缩包文件，不能与 --no-archive 或 --archive - 一起使用")
+    if shard_spec(args) is not None and (args.incremental or args.watch or args.no_archive or streaming):
+        parser.error("分片（--shard-size/--shard-bytes）不能与 --incremental、--watch、--no-archive、--archive - 一起使用")
+    base = args.output_dir
+    base.mkdir(parents=True, exist_ok=True)
+    if args.watch:
+        if args.roster == "-":
+            parser.error("--watch 不能与标准输入名单一起使用")
+        from .watch import watch
+        watch(fams, args, base, policy)
+        return
+    profile = Profile() if args.profile or args.profile_json else None
+    # 压缩包占用标准输出时，提示信息写到标准错误
+    log = sys.stderr if streaming else sys.stdout
+    try:
+        roster = load_roster(args.roster, args.roster_format)
+        results = run(fams, roster, base, args, policy, profile)
+    except RosterError as e:
+        parser.error(str(e))
+    except javacheck.JavaCheckError as e:
+        print(e, file=sys.stderr)
+        sys.exit(f"Java 源码检查未通过（{len(e.problems)} 处），已有的压缩包保持不变")
+    for f, (path, stats) in zip(fams, results):
+        print(f.done_message.format(count=stats.students, path=describe_target(path, base)), file=log)
+        if args.incremental:
+            print(stats.summary(), file=log)
+        if args.reproducible and path is not None:
+            print(f"sha256: {stats.sha256}  {'-' if path == STDOUT else path.name}", file=log)
+    if profile is not None:
+        profile.stop()
+        print(profile.summary(), file=log)
+        if args.profile_json:
+            profile.dump(args.profile_json)
@@ -0,0 +1,129 @@
+"""
+按引用输出的文件（FileRef）：名单中指定的照片、附件等素材不读进 Python，由内核直接复制。
+
+- 写文件夹：os.copy_file_range（同一文件系统上可能只是共享数据块），不支持时退回
+  os.sendfile，再不行才分块读写；
+- 写压缩包：zip 中直接存储的成员（图片等已压缩格式，见 compression.PRECOMPRESSED）在 mmap
+  上计算 CRC 和摘要，数据同样从源文件复制到压缩包文件或标准输出；需要 deflate 的素材和
+  tar.gz 中的素材只能读出后压缩，按块进行。
+
+素材在渲染时只记下路径和大小；写出时若大小已经变化（生成过程中被改动）则报错。
+"""
+from __future__ import annotations
+import hashlib
+import mmap
+import os
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+CHUNK = 1 << 20
+
+
+class FileRef(NamedTuple):
+    """内容在磁盘文件 path 中的条目，size 为渲染时的大小。"""
+    path: str
+    size: int
+
+
+def file_ref(path: Union[str, Path]) -> FileRef:
+    return FileRef(os.fspath(path), os.stat(path).st_size)
+
+
+def data_size(data: Union[bytes, FileRef]) -> int:
+    return data.size if isinstance(data, FileRef) else len(data)
+
+
+class SourceChangedError(OSError):
+    pass
+
+
+@contextmanager
+def mapped(ref: FileRef) -> Iterator[Union[mmap.mmap, bytes]]:
+    """只读映射整个文件，哈希和 CRC 直接在页缓存上计算；空文件给出 b""。"""
+    with open(ref.path, "rb") as f:
+        if os.fstat(f.fileno()).st_size != ref.size:
+            raise SourceChangedError(f"素材文件在生成过程中被改动：{ref.path}")
+        if ref.size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def file_sha256(ref: FileRef) -> str:
+    with mapped(ref) as mm:
+        return hashlib.sha256(mm).hexdigest()
+
+
+def file_crc32(ref: FileRef) -> int:
+    with mapped(ref) as mm:
+        return zlib.crc32(mm)
+
+
+def read_file(ref: FileRef) -> bytes:
+    with mapped(ref) as mm:
+        return bytes(mm)
+
+
+def read_chunks(ref: FileRef, size: int = CHUNK) -> Iterator[bytes]:
+    with open(ref.path, "rb") as f:
+        left = ref.size
+        while left:
+            chunk = f.read(min(size, left))
+            if not chunk:
+                raise SourceChangedError(f"素材文件在生成过程中被改动：{ref.path}")
+            left -= len(chunk)
+            yield chunk
+
+
+def copy_to_fd(ref: FileRef, out_fd: int) -> None:
+    """把 ref 的全部内容写到 out_fd 的当前位置。"""
+    with open(ref.path, "rb") as src:
+        in_fd = src.fileno()
+        left = ref.size
+        copy_range = getattr(os, "copy_file_range", None)
+        while left and copy_range is not None:
+            try:
+                n = copy_range(in_fd, out_fd, min(left, 1 << 30))
+            except OSError:
+                break               # 跨文件系统（旧内核）、目标是管道等：换下一种方式
+            if n == 0:
+                raise SourceChangedError(f"素材文件在生成过程中被改动：{ref.path}")
+            left -= n
+        offset = ref.size - left
+        while left:
+            try:
+                n = os.sendfile(out_fd, in_fd, offset, min(left, 1 << 30))
+            except (OSError, AttributeError):
+                break
+            if n == 0:
+                raise SourceChangedError(f"素材文件在生成过程中被改动：{ref.path}")
+            offset += n
+            left -= n
+        if left:
+            src.seek(offset)
+            while left:
+                chunk = src.read(min(CHUNK, left))
+                if not chunk:
+                    raise SourceChangedError(f"素材文件在生成过程中被改动：{ref.path}")
+                left -= len(chunk)
+                view = memoryview(chunk)
+                while view:
+                    view = view[os.write(out_fd, view):]
+
+
+def copy_file(ref: FileRef, dest: Path) -> None:
+    with open(dest, "wb") as out:
+        copy_to_fd(ref, out.fileno())
+
+
+def write_ref(fp: BinaryIO, ref: FileRef) -> None:
+    """把 ref 写进文件对象：有 write_file() 的（output._HashingFile）走零拷贝，其余分块写入。"""
+    write_file = getattr(fp, "write_file", None)
+    if write_file is not None:
+        write_file(ref)
+        return
+    for chunk in read_chunks(ref):
+        fp.write(chunk)
@@ -0,0 +1,186 @@
+"""
+进程内的 Java 源码快速检查（词法级），用来在写出任何文件之前发现坏掉的模板。
+
+不是编译器，只检查模板最容易出错的地方：
+- 花括号 / 圆括号 / 方括号是否配对；
+- 字符串、字符字面量和块注释是否闭合；
+- 是否残留未替换的模板占位符（如 {STUDENT}）；
+- public/protected/private 是否出现在方法体或代码块内——典型原因是模板里用于
+  str.format 的 {{ }} 没有被还原，导致 `class Main {{` 多出一层代码块；
+- public 顶层类型名是否与文件名一致。
+
+学生之间的差别只在字符串字面量里（名字、种子），所以检查结果按“去掉字面量和注释后的骨架”缓存：
+同一模板渲染出的文件只完整检查一次，其余只需一次正则替换和占位符查找。
+"""
+from __future__ import annotations
+import posixpath
+import re
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_PLACEHOLDERS = ("STUDENT", "SEED", "name", "idx")
+
+_TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<textblock>"""(?:[^\\]|\\.)*?""")
+  | (?P<string>"(?:[^"\\\n]|\\.)*")
+  | (?P<char>'(?:[^'\\\n]|\\.)+')
+  | (?P<badstring>["'])
+  | (?P<badcomment>/\*)
+  | (?P<word>[A-Za-z_$][\w$]*)
+  | (?P<open>[{(\[])
+  | (?P<close>[})\]])
+  | (?P<punct>[.<>,?;=@-])
+''', re.S | re.X)
+
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+_TYPE_KEYWORDS = {"class", "interface", "enum", "record"}
+_ACCESS = {"public", "protected", "private"}
+# 出现在匿名类 `new Foo<Bar>(...) {` 的类型名部分中的记号
+_TYPE_NAME_TOKENS = {".", "<", ">", ",", "?"}
+
+
+class JavaCheckError(Exception):
+    """渲染出的 Java 源码没有通过检查；problems 为 "路径:行:列: 说明" 列表。"""
+
+    def __init__(self, problems: List[str]) -> None:
+        super().__init__(problems)      # 保持 args 可 pickle，便于从渲染进程传回
+        self.problems = problems
+
+    def __str__(self) -> str:
+        return "\n".join(self.problems)
+
+
+def _line_col(text: str, pos: int) -> Tuple[int, int]:
+    line = text.count("\n", 0, pos) + 1
+    return line, pos - (text.rfind("\n", 0, pos) + 1) + 1
+
+
+def check_java(path: str, text: str, placeholders: Iterable[str] = DEFAULT_PLACEHOLDERS) -> List[str]:
+    """检查一个 Java 源文件，返回问题列表（为空表示通过）。"""
+    problems: List[str] = []
+
+    def report(pos: int, msg: str) -> None:
+        line, col = _line_col(text, pos)
+        problems.append(f"{path}:{line}:{col}: {msg}")
+
+    for name in placeholders:
+        idx = text.find("{" + name + "}")
+        if idx >= 0:
+            report(idx, f"残留未替换的模板占位符 {{{name}}}")
+
+    # stack 中每项为 (括号, 位置, 是否为类型体)
+    stack: List[Tuple[str, int, bool]] = []
+    tokens: List[str] = []          # 已读到的记号（字符串/注释除外），用于回看
+    paren_open: List[int] = []      # 未闭合的 "(" 在 tokens 中的下标
+    last_paren = -1                 # 最近闭合的 "(" 在 tokens 中的下标
+    pending_type = False            # 读到 class 等关键字后，下一个 { 是类型体
+    public_types: List[Tuple[str, int]] = []
+
+    for m in _TOKEN.finditer(text):
+        kind = m.lastgroup
+        tok = m.group()
+        if kind in ("comment", "textblock", "string", "char"):
+            continue
+        if kind == "badstring":
+            report(m.start(), "字符串或字符字面量没有闭合")
+            break
+        if kind == "badcomment":
+            report(m.start(), "块注释没有闭合")
+            break
+        if kind == "word":
+            if tok in _TYPE_KEYWORDS and not (tokens and tokens[-1] in (".", "@")):
+                pending_type = True
+                if not stack and "public" in tokens[-3:]:
+                    nm = _TOKEN.match(text, _skip_ws(text, m.end()))
+                    if nm and nm.lastgroup == "word":
+                        public_types.append((nm.group(), m.start()))
+            elif tok in _ACCESS and stack and not stack[-1][2]:
+                report(m.start(), f"{tok} 出现在方法体或代码块内（模板中的 {{{{ }}}} 是否没有还原？）")
+        elif kind == "open":
+            if tok == "(":
+                paren_open.append(len(tokens))
+            elif tok == "{":
+                is_type = pending_type or (tokens and tokens[-1] == ")" and _is_anonymous_class(tokens, last_paren))
+                pending_type = False
+                stack.append((tok, m.start(), bool(is_type)))
+                tokens.append(tok)
+                continue
+            stack.append((tok, m.start(), False))
+        elif kind == "close":
+            if not stack:
+                report(m.start(), f"多余的 {tok}")
+                break
+            if stack[-1][0] != _PAIRS[tok]:
+                line, col = _line_col(text, stack[-1][1])
+                report(m.start(), f"{tok} 与第 {line} 行第 {col} 列的 {stack[-1][0]} 不匹配")
+                break
+            stack.pop()
+            if tok == ")" and paren_open:
+                last_paren = paren_open.pop()
+        elif tok == ";":
+            pending_type = False
+        tokens.append(tok)
+    else:
+        for open_tok, pos, _ in stack:
+            report(pos, f"{open_tok} 没有闭合")
+
+    stem = posixpath.splitext(posixpath.basename(path))[0]
+    for name, pos in public_types:
+        if name != stem:
+            report(pos, f"public 类型 {name} 必须写在 {name}.java 中")
+    return problems
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def _is_anonymous_class(tokens: List[str], open_idx: int) -> bool:
+    """判断 `... ) {` 是否为 `new Type(...) {` 形式的匿名类体。"""
+    i = open_idx - 1
+    while i >= 0 and (tokens[i] in _TYPE_NAME_TOKENS or tokens[i].isidentifier()) and tokens[i] != "new":
+        i -= 1
+    return i >= 0 and tokens[i] == "new"
+
+
+# 字面量与注释：骨架中分别替换为空字面量和空格，其余原样保留
+_LITERAL = re.compile(r"//[^\n]*|/\*.*?\*/"
+                      r'|"""(?:[^\\]|\\.)*?"""'
+                      r'|"(?:[^"\\\n]|\\.)*"'
+                      r"|'(?:[^'\\\n]|\\.)+'", re.S)
+_cache: Dict[Tuple[str, str], bool] = {}
+_CACHE_LIMIT = 4096
+
+
+def _skeleton(m: "re.Match[str]") -> str:
+    tok = m.group()
+    return " " if tok[0] == "/" else tok[0] * 2
+
+
+def check_outputs(files: Iterable[Tuple[str, object]],
+                  placeholders: Iterable[str] = DEFAULT_PLACEHOLDERS) -> List[str]:
+    """检查一组 (相对路径, 内容) 条目中所有的 .java 文件，返回全部问题。"""
+    placeholders = tuple(placeholders)
+    problems: List[str] = []
+    for rel, content in files:
+        if not rel.endswith(".java") or not isinstance(content, (str, bytes)):
+            continue
+        text = content.decode("utf-8") if isinstance(content, bytes) else content
+        base = posixpath.basename(rel)
+        ok = _cache.get((base, text))      # 与之前完全相同的文件（如各学生共用的排序类）
+        if ok is None:
+            if any("{" + p + "}" in text for p in placeholders):
+                ok = False
+            else:
+                key = (base, _LITERAL.sub(_skeleton, text))
+                ok = _cache.get(key)
+                if ok is None:
+                    ok = not check_java(base, text, ())
+                if len(_cache) >= _CACHE_LIMIT:
+                    _cache.clear()
+                _cache[key] = _cache[base, text] = ok
+        if not ok:
+            problems.extend(check_java(rel, text, placeholders))
+    return problems
@@ -0,0 +1,102 @@
+"""
+增量生成用的清单（manifest）。
+
+清单以 JSON 保存在压缩包旁边（例如 pinyin_folders_42.manifest.json），记录：
+- 模板版本（渲染函数/模板文本的摘要）；
+- 每个学生的参数（如 hue、stable_index）；
+- 每个输出文件的 sha256，以及上次写到磁盘时的大小和 mtime；
+- 压缩包的大小和 mtime（压缩包被其他方式改写过时不再复用其中的成员）；
+- 压缩策略（--compression/--store-below 变了时同样不复用旧成员）。
+
+再次运行时，内容摘要与磁盘状态都没变的文件不会重写，压缩包里对应的成员也直接复用旧的压缩数据。
+"""
+from __future__ import annotations
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from .template import Template
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(archive: Path) -> Path:
+    return archive.with_name(archive.stem + ".manifest.json")
+
+
+def template_version(*parts) -> str:
+    """计算模板版本：字符串和 Template 按原文、函数按源码参与摘要。"""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            text = part
+        elif isinstance(part, Template):
+            text = part.source
+        else:
+            text = inspect.getsource(part)
+        h.update(text.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class Manifest:
+    def __init__(self, template: str = "", students: Optional[Dict[str, dict]] = None,
+                 files: Optional[Dict[str, dict]] = None, archive: Optional[list] = None,
+                 compression: str = "") -> None:
+        self.template = template
+        self.archive = archive
+        self.compression = compression
+        self.students: Dict[str, dict] = students if students is not None else {}
+        self.files: Dict[str, dict] = files if files is not None else {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        """读取清单；文件不存在、损坏或版本不符时返回空清单（相当于全量生成）。"""
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        if raw.get("version") != MANIFEST_VERSION:
+            return cls()
+        return cls(raw.get("template", ""), raw.get("students", {}), raw.get("files", {}),
+                   raw.get("archive"), raw.get("compression", ""))
+
+    def save(self, path: Path) -> None:
+        raw = {
+            "version": MANIFEST_VERSION,
+            "template": self.template,
+            "students": self.students,
+            "files": self.files,
+            "archive": self.archive,
+            "compression": self.compression,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(raw, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def digest(self, rel: str) -> Optional[str]:
+        rec = self.files.get(rel)
+        return rec["sha256"] if rec else None
+
+    def archive_unchanged(self, archive: Path, compression: str = "") -> bool:
+        """压缩包没被改写过，且上次用的是同一个压缩策略，其中的成员可以原样复用。"""
+        return (self.archive is not None and stat_key(archive) == self.archive
+                and self.compression == compression)
+
+    def disk_unchanged(self, rel: str, full: Path) -> bool:
+        """上次写出的文件仍在磁盘上且大小、mtime 未变。"""
+        rec = self.files.get(rel)
+        if not rec or not rec.get("disk"):
+            return False
+        return stat_key(full) == rec["disk"]
+
+
+def stat_key(p: Path) -> Optional[list]:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
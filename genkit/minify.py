@@ -0,0 +1,140 @@
+"""
+--production 构建：压缩 CSS/JS/HTML/SVG，并为它们生成预压缩的 .gz 兄弟文件。
+
+静态服务器（如 nginx 的 gzip_static）可以直接发送 .gz，请求时不再消耗 CPU。
+
+各压缩器都是保守的、只用正则的实现，只针对生成器自己的模板：
+- CSS：去注释，折叠空白，去掉 {};,> 与冒号后的空格和 } 前多余的分号；字符串原样保留；
+- JS：去掉 // 与 /* */ 注释、行首缩进和空行，去掉标点两侧的空格；保留换行，
+  不依赖自动分号插入的规则变化；不识别正则字面量（模板里没有）；
+- HTML/SVG：去注释，空白折叠为一个空格；两个标签之间只有空白、且其中一个是块级标签时
+  删除这段空白（行内元素之间的空格会被渲染，只折叠不删除）；属性值与
+  <pre>、<textarea>、<script>、<style> 的内容原样保留。
+
+.gz 使用 mtime=0 与固定级别，同样内容得到同样字节，--reproducible 下依然可复现；
+压缩后不比原文小的文件不生成 .gz。相同内容只处理一次（各站共用的 app.js 等）。
+"""
+from __future__ import annotations
+import gzip
+import posixpath
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .filecopy import FileRef
+from .output import Entry, to_bytes
+
+GZIP_LEVEL = 9
+
+# 第 1 组为原样保留的部分（字符串、<pre> 等），其余匹配为要删除的注释
+_CSS_TOKEN = re.compile(r'''("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|/\*.*?\*/''', re.S)
+_CSS_TIGHT = re.compile(r"\s*([{};,>])\s*|:\s+")
+_JS_TOKEN = re.compile(r'''("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)|//[^\n]*|/\*.*?\*/''', re.S)
+_JS_TIGHT = re.compile(r"[ \t]*([{}()\[\];,=:<>!&|?*])[ \t]*")
+_HTML_KEEP = re.compile(r"(<(pre|textarea|script|style)\b.*?</\2\s*>)|<!--(?!\[if).*?-->", re.S | re.I)
+_HTML_TAG = re.compile(r'''</?([!\w-]*)(?:[^>"']|"[^"]*"|'[^']*')*>''')
+_HTML_ATTR_WS = re.compile(r'''("[^"]*"|'[^']*')|\s+''')
+_WS = re.compile(r"\s+")
+# 前后空白不影响渲染的标签（HTML 块级与文档级元素、不含文字的 SVG 元素），小写
+_HTML_BLOCK = frozenset("""
+    !doctype html head body title meta link base div p ul ol li dl dt dd nav header footer main section
+    article aside h1 h2 h3 h4 h5 h6 form fieldset legend table caption thead tbody tfoot tr td th br hr
+    figure figcaption blockquote address details summary noscript
+    svg g defs symbol path circle rect ellipse line polygon polyline use lineargradient radialgradient
+    stop clippath mask
+""".split())
+
+_SLOT = re.compile("\x00(\\d+)\x01")
+_HTML_SLOT = re.compile("<\x00(\\d+)\x01>")     # HTML 占位符连同外层的 < > 一起还原
+
+
+def _minify(pattern: "re.Pattern[str]", text: str, transform: Callable[[str], str], slot: str = "{}",
+            restore: "re.Pattern[str]" = _SLOT) -> str:
+    """先把 pattern 第 1 组（字符串、<pre> 等）换成占位符、把其余匹配（注释）换成空格，
+    对剩下的文本整体做 transform，再把占位符还原。slot 决定占位符的外形（HTML 中要像一个标签），
+    restore 匹配还原时要替换掉的整个占位符。"""
+    kept: List[str] = []
+
+    def hide(m: "re.Match[str]") -> str:
+        if m.group(1) is None:
+            return " "
+        kept.append(m.group(1))
+        return slot.format(f"\x00{len(kept) - 1}\x01")
+
+    out = transform(pattern.sub(hide, text))
+    return restore.sub(lambda m: kept[int(m.group(1))], out) if kept else out
+
+
+def minify_css(text: str) -> str:
+    def tighten(t: str) -> str:
+        return _CSS_TIGHT.sub(lambda m: m.group(1) or ":", _WS.sub(" ", t)).replace(";}", "}").strip()
+    return _minify(_CSS_TOKEN, text, tighten)
+
+
+def minify_js(text: str) -> str:
+    def tighten(t: str) -> str:
+        lines = (line.strip() for line in _JS_TIGHT.sub(r"\1", t).splitlines())
+        return "\n".join(line for line in lines if line)
+    return _minify(_JS_TOKEN, text, tighten)
+
+
+def _tag_is_block(m: "Optional[re.Match[str]]") -> bool:
+    return m is not None and m.group(1).lower() in _HTML_BLOCK
+
+
+def _tighten_html(t: str) -> str:
+    parts: List[str] = []
+    pos = 0
+    prev: "Optional[re.Match[str]]" = None
+    for m in _HTML_TAG.finditer(t):
+        gap = t[pos:m.start()]
+        if gap.isspace() and (_tag_is_block(prev) or _tag_is_block(m)):
+            gap = ""
+        parts.append(_WS.sub(" ", gap))
+        parts.append(_HTML_ATTR_WS.sub(lambda a: a.group(1) or " ", m.group(0)))
+        pos, prev = m.end(), m
+    parts.append(_WS.sub(" ", t[pos:]))
+    return "".join(parts).strip()
+
+
+def minify_html(text: str) -> str:
+    return _minify(_HTML_KEEP, text, _tighten_html, slot="<{}>", restore=_HTML_SLOT)
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {
+    ".css": minify_css,
+    ".js": minify_js,
+    ".html": minify_html,
+    ".htm": minify_html,
+    ".svg": minify_html,
+}
+
+_cache: Dict[Tuple[str, str], Tuple[bytes, bytes]] = {}
+_CACHE_LIMIT = 1024
+
+
+def _build(ext: str, text: str) -> Tuple[bytes, bytes]:
+    data = to_bytes(MINIFIERS[ext](text))
+    gz = gzip.compress(data, GZIP_LEVEL, mtime=0)
+    return data, gz if len(gz) < len(data) else b""
+
+
+def production_files(files: List[Entry]) -> List[Entry]:
+    """把一个学生的条目换成生产版本：可压缩的文本被压缩，并在其后紧跟 .gz 兄弟文件。"""
+    out: List[Entry] = []
+    for rel, content in files:
+        ext = posixpath.splitext(rel)[1].lower()
+        if ext not in MINIFIERS or isinstance(content, FileRef):     # 名单中的素材原样保留
+            out.append((rel, content))
+            continue
+        text = content.decode("utf-8") if isinstance(content, bytes) else content
+        key = (ext, text)
+        built = _cache.get(key)
+        if built is None:
+            if len(_cache) >= _CACHE_LIMIT:
+                _cache.clear()
+            built = _cache[key] = _build(ext, text)
+        data, gz = built
+        out.append((rel, data))
+        if gz:
+            out.append((rel + ".gz", gz))
+    return out
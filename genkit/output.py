@@ -0,0 +1,722 @@
+"""
+输出层：把渲染好的 (相对路径, 内容) 条目写到磁盘和压缩包（zip 或 tar）。
+
+各生成脚本按学生产出 StudentOutput，由这里统一落盘与打包。压缩包成员直接取自内存中的内容，
+不再写完文件后用 os.walk 重新遍历、逐个读回；zip_only=True 时完全不写磁盘。
+
+dedup=True 时启用内容寻址：每份内容按 sha256 只写一次，之后相同内容的文件在磁盘上
+以硬链接出现，在 tar 中以硬链接成员出现（zip 格式不支持链接，仍逐个存放）。
+
+incremental=True 时读取压缩包旁的清单（见 manifest.py）：内容没变的文件不重写，
+zip 中对应成员直接复制旧的压缩数据，清单里有而本次没有的文件会被删除。
+
+压缩包一侧是可替换的输出端（open_archive）：zip、tar、tar.gz 文件（先写临时文件，完成后
+替换），STDOUT 时以同样的格式流式写到标准输出，archive=None 时不打包、只写文件夹。
+各输出端只按顺序追加、不回头修改已写出的字节，内存占用与在途学生数有关，与总人数无关。
+
+条目内容除 str/bytes 外也可以是 filecopy.FileRef（名单中的素材文件）：写盘和写入压缩包时
+由内核直接复制，不经过 Python 的缓冲区（见 filecopy.py）。
+
+checksums=True 时每个学生文件夹多一个 MANIFEST.sha256（相对该文件夹的路径），压缩包根目录也有一个
+列出全部成员的 MANIFEST.sha256，格式与 sha256sum 相同，解压后可用 sha256sum -c 校验。摘要就是
+规划时为增量/去重算出的那一份，按写出顺序随写随记，不再回读任何文件。
+"""
+from __future__ import annotations
+import argparse
+import calendar
+import gzip
+import hashlib
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, Future
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .compression import CompressionPolicy
+from .filecopy import FileRef, copy_file, copy_to_fd, data_size, file_sha256, mapped, read_file
+from .manifest import Manifest, manifest_path, stat_key
+from .profile import Profile, clock
+from .tarwriter import TarAssembler
+from .zipwriter import DEFAULT_EXTERNAL_ATTR, RawMember, ZipAssembler, read_raw_member
+
+Content = Union[str, bytes, FileRef]
+Entry = Tuple[str, Content]
+
+ARCHIVE_FORMATS = ("zip", "tar", "tar.gz")
+STDOUT = Path("-")      # 压缩包写到标准输出
+CHECKSUMS = "MANIFEST.sha256"
+
+
+class StudentOutput(NamedTuple):
+    """一个学生的全部输出：参数（记入清单）和按顺序排列的 (相对路径, 内容) 条目。"""
+    name: str
+    params: dict
+    files: List[Entry]
+
+
+class WriteStats:
+    def __init__(self) -> None:
+        self.students = 0
+        self.files = 0
+        self.written = 0
+        self.skipped = 0
+        self.removed = 0
+        self.sha256 = ""
+
+    def summary(self) -> str:
+        return f"文件 {self.files} 个：重写 {self.written}，未变跳过 {self.skipped}，删除 {self.removed}"
+
+
+def ensure_dir(p: Path) -> None:
+    p.mkdir(parents=True, exist_ok=True)
+
+
+def to_bytes(content: Content) -> bytes:
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, FileRef):
+        return read_file(content)
+    return content.encode("utf-8")
+
+
+class ContentStore:
+    """内容寻址存储：记录每个 sha256 第一次出现时的路径。"""
+
+    def __init__(self) -> None:
+        self._first: Dict[str, str] = {}
+
+    def add(self, rel: str, digest: str) -> Optional[str]:
+        """登记一份内容；如果之前出现过相同内容，返回那次的路径，否则返回 None。"""
+        first = self._first.get(digest)
+        if first is None:
+            self._first[digest] = rel
+        return first
+
+    def __len__(self) -> int:
+        return len(self._first)
+
+
+# --reproducible 时所有成员使用的固定时间（zip 能表示的最早时刻），可用 SOURCE_DATE_EPOCH 覆盖
+REPRODUCIBLE_EPOCH = calendar.timegm((1980, 1, 1, 0, 0, 0))
+
+
+def reproducible_epoch() -> int:
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    return max(int(value), REPRODUCIBLE_EPOCH) if value else REPRODUCIBLE_EPOCH
+
+
+class _HashingFile:
+    """写入时顺带计算 sha256，省去写完后再读一遍压缩包。"""
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self._fp = fp
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, b) -> int:
+        self.sha256.update(b)
+        self.size += len(b)
+        return self._fp.write(b)
+
+    def tell(self) -> int:
+        return self._fp.tell()
+
+    def flush(self) -> None:
+        self._fp.flush()
+
+    def write_file(self, ref: FileRef) -> None:
+        """写入素材文件的内容：摘要在 mmap 上计算，数据由内核从源文件复制过来。"""
+        with mapped(ref) as mm:
+            self.sha256.update(mm)
+        self._fp.flush()
+        copy_to_fd(ref, self._fp.fileno())
+        self.size += ref.size
+
+    def close(self) -> None:
+        self._fp.close()
+
+
+class _Target:
+    """压缩包字节的去处：文件先写到临时文件，commit() 时替换目标；STDOUT 直接写到标准输出。"""
+
+    def __init__(self, path: Path) -> None:
+        if path == STDOUT:
+            self._tmp = None
+            self.fp = _HashingFile(sys.stdout.buffer)
+        else:
+            self._path = path
+            self._tmp = path.with_name(path.name + ".tmp")
+            self.fp = _HashingFile(open(self._tmp, "wb"))
+
+    def commit(self) -> str:
+        """写完，返回全部字节的 sha256。"""
+        if self._tmp is None:
+            self.fp.flush()
+        else:
+            self.fp.close()
+            os.replace(self._tmp, self._path)
+        return self.fp.sha256.hexdigest()
+
+    def discard(self) -> None:
+        """丢弃临时文件，保留原来的压缩包。已经写到标准输出的部分无法收回，
+        但缺少结尾（zip 的中央目录、tar 的结束块）的压缩包不会被当作完整的读取。"""
+        if self._tmp is None:
+            self.fp.flush()
+        else:
+            self.fp.close()
+            self._tmp.unlink()
+
+
+class _ZipArchive:
+    """先写到临时文件，完成后替换目标；reuse=True 的成员从旧 zip 原样复制压缩数据。
+
+    prepare() 只做压缩，可以在工作线程中调用；add() 必须在主线程按顺序调用。
+    """
+
+    def __init__(self, path: Path, reuse_old: bool = False,
+                 policy: Optional[CompressionPolicy] = None, reproducible: bool = False) -> None:
+        self._target = _Target(path)
+        self._policy = policy or CompressionPolicy()
+        self._zip = ZipAssembler(self._target.fp)       # 只追加写入，标准输出也可以
+        self._reproducible = reproducible
+        if reproducible:
+            self._date_time = time.gmtime(reproducible_epoch())[:6]
+        else:
+            self._date_time = time.localtime(time.time())[:6]
+        self._old: Optional[zipfile.ZipFile] = None
+        if reuse_old and path != STDOUT:
+            try:
+                self._old = zipfile.ZipFile(path)
+            except (OSError, zipfile.BadZipFile):
+                self._old = None
+
+    def prepare(self, rel: str, data: bytes, link_to: Optional[str] = None, reuse: bool = False):
+        if reuse and self._old is not None and rel in self._old.NameToInfo:
+            # 旧成员在 add() 时再读取：旧 zip 的文件对象不能被多个线程同时 seek
+            return self._old.NameToInfo[rel]
+        return self._policy.compress(rel, data, self._date_time)
+
+    def has_old(self, rel: str) -> bool:
+        """旧压缩包中是否有可以原样复制的成员 rel。"""
+        return self._old is not None and rel in self._old.NameToInfo
+
+    def add(self, prepared) -> None:
+        if isinstance(prepared, zipfile.ZipInfo):
+            prepared = read_raw_member(self._old, prepared)
+            if self._reproducible:
+                # 复用的旧成员可能来自非 reproducible 的构建，时间和权限统一改写
+                prepared = prepared._replace(date_time=self._date_time, external_attr=DEFAULT_EXTERNAL_ATTR)
+        self._zip.add(prepared)
+
+    @property
+    def size(self) -> int:
+        return self._target.fp.size
+
+    def close(self) -> str:
+        """写完并替换目标文件，返回压缩包的 sha256。"""
+        self._zip.close()
+        if self._old is not None:
+            self._old.close()
+        return self._target.commit()
+
+    def abort(self) -> None:
+        """出错时丢弃临时文件，保留原来的压缩包。"""
+        if self._old is not None:
+            self._old.close()
+        self._target.discard()
+
+
+class _TarArchive:
+    """tar 以流模式写出（不需要 seek，可以直接写到管道）；gz=True 时整体再经 gzip 压缩，
+    级别取 policy 的默认级别，gzip 头中的时间与成员相同。"""
+
+    def __init__(self, path: Path, reuse_old: bool = False,
+                 policy: Optional[CompressionPolicy] = None, reproducible: bool = False,
+                 gz: bool = False) -> None:
+        self._target = _Target(path)
+        self._mtime = reproducible_epoch() if reproducible else int(time.time())
+        self._gz = None
+        fp = self._target.fp
+        if gz:
+            level = (policy or CompressionPolicy()).level
+            fp = self._gz = gzip.GzipFile(filename="", mode="wb", fileobj=fp, compresslevel=level,
+                                          mtime=self._mtime)
+        self._tar = TarAssembler(fp)
+
+    def prepare(self, rel: str, data: bytes, link_to: Optional[str] = None, reuse: bool = False):
+        return rel, data, link_to
+
+    def has_old(self, rel: str) -> bool:
+        return False        # tar 成员不能不解包地复用
+
+    def add(self, prepared) -> None:
+        rel, data, link_to = prepared
+        info = tarfile.TarInfo(rel)
+        info.mtime = self._mtime
+        info.mode = 0o644
+        if link_to is not None:
+            info.type = tarfile.LNKTYPE
+            info.linkname = link_to
+            self._tar.add(info)
+        else:
+            self._tar.add(info, data)
+
+    @property
+    def size(self) -> int:
+        return self._target.fp.size
+
+    def close(self) -> str:
+        self._tar.close()
+        if self._gz is not None:
+            self._gz.close()
+        return self._target.commit()
+
+    def abort(self) -> None:
+        self._target.discard()      # 不写结束块，流上的消费方会读到截断的 tar
+
+
+class _NoArchive:
+    """不打包（--no-archive）：只写文件夹，成员不做任何准备。"""
+    size = 0
+
+    def prepare(self, rel: str, data: bytes, link_to: Optional[str] = None, reuse: bool = False):
+        return None
+
+    def has_old(self, rel: str) -> bool:
+        return False
+
+    def add(self, prepared) -> None:
+        pass
+
+    def close(self) -> str:
+        return ""
+
+    def abort(self) -> None:
+        pass
+
+
+def archive_format(path: Path, default: str = "zip") -> str:
+    """按扩展名判断压缩包格式，认不出（包括 STDOUT）时为 default。"""
+    name = path.name.lower()
+    if name.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    if name.endswith(".tar"):
+        return "tar"
+    if name.endswith(".zip"):
+        return "zip"
+    return default
+
+
+def open_archive(path: Optional[Path], reuse_old: bool = False, policy: Optional[CompressionPolicy] = None,
+                 reproducible: bool = False, fmt: str = "zip"):
+    """打开压缩包输出端；path 为 None 时不打包，为 STDOUT 时按 fmt 写到标准输出。"""
+    if path is None:
+        return _NoArchive()
+    fmt = archive_format(path, fmt)
+    if fmt != "zip":
+        return _TarArchive(path, reuse_old, policy, reproducible, gz=fmt == "tar.gz")
+    return _ZipArchive(path, reuse_old, policy, reproducible)
+
+
+def digest_path(archive: Path) -> Path:
+    """--reproducible 时写出的摘要文件，格式与 sha256sum 相同。"""
+    return archive.with_name(archive.name + ".sha256")
+
+
+def archive_path(base: Path, output_zip: str, fmt: str) -> Path:
+    """根据 --format 把脚本默认的 zip 文件名换成对应的扩展名。"""
+    return base / Path(output_zip).with_suffix("." + fmt)
+
+
+def archive_target(base: Path, output_zip: str, args: argparse.Namespace) -> Optional[Path]:
+    """按 --no-archive、--archive 和 --format 决定压缩包的去处：None 为不打包，STDOUT 为标准输出。"""
+    if args.no_archive:
+        return None
+    if args.archive == "-":
+        return STDOUT
+    if args.archive:
+        return Path(args.archive)
+    return archive_path(base, output_zip, args.format)
+
+
+def describe_target(archive: Optional[Path], base: Path) -> str:
+    """完成提示中的输出位置。"""
+    if archive is None:
+        return str(base)
+    return "标准输出" if archive == STDOUT else str(archive)
+
+
+def checksum_line(digest: str, path: str) -> str:
+    """sha256sum 格式的一行；路径含反斜杠或换行时按 GNU coreutils 的约定转义并以 \\ 开头。"""
+    if "\\" in path or "\n" in path:
+        return "\\" + digest + "  " + path.replace("\\", "\\\\").replace("\n", "\\n") + "\n"
+    return f"{digest}  {path}\n"
+
+
+def _put(full: Path, data: Union[bytes, FileRef]) -> None:
+    if isinstance(data, FileRef):
+        copy_file(data, full)
+    else:
+        full.write_bytes(data)
+
+
+def _write_file(full: Path, data: Union[bytes, FileRef]) -> None:
+    # 上次 --dedup 留下的硬链接不能原地覆盖，否则会连带改掉其他学生的同一文件
+    try:
+        if full.stat().st_nlink > 1:
+            full.unlink()
+    except FileNotFoundError:
+        pass
+    _put(full, data)
+
+
+def _link_file(src: Path, full: Path, data: Union[bytes, FileRef]) -> None:
+    try:
+        full.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, full)
+    except OSError:
+        # 文件系统不支持硬链接时退回为普通写入
+        _put(full, data)
+
+
+def _remove_stale(base: Path, rel: str) -> None:
+    full = base / rel
+    try:
+        full.unlink()
+    except FileNotFoundError:
+        return
+    # 顺带清理因此变空的目录
+    parent = full.parent
+    while parent != base:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
+
+
+class _FilePlan(NamedTuple):
+    rel: str
+    data: Union[bytes, FileRef]
+    action: str              # "write" / "link" / "skip"（磁盘上不动）
+    link_to: Optional[str]   # 内容相同的第一个文件
+    reuse: bool              # 压缩包可复用旧成员
+    sha256: str
+
+
+def _materialise(base: Path, plans: List[_FilePlan], out, made: set,
+                 prof: Optional[Profile] = None, label: str = "") -> list:
+    """执行一个学生的磁盘写入并准备压缩包成员；可在工作线程中运行。硬链接留给主线程做。"""
+    prepared = []
+    if prof is not None:
+        # [mkdir 耗时, 次数, write 耗时, 次数, 字节, compress 耗时, 次数, 原始字节, 压缩后字节]
+        acc = [0.0, 0, 0.0, 0, 0, 0.0, 0, 0, 0]
+    for plan in plans:
+        if plan.action == "write":
+            full = base / plan.rel
+            if full.parent not in made:
+                t0 = clock() if prof is not None else 0.0
+                ensure_dir(full.parent)
+                made.add(full.parent)
+                if prof is not None:
+                    acc[0] += clock() - t0
+                    acc[1] += 1
+            t0 = clock() if prof is not None else 0.0
+            _write_file(full, plan.data)
+            if prof is not None:
+                acc[2] += clock() - t0
+                acc[3] += 1
+                acc[4] += data_size(plan.data)
+        t0 = clock() if prof is not None else 0.0
+        member = out.prepare(plan.rel, plan.data, link_to=plan.link_to, reuse=plan.reuse)
+        if prof is not None and isinstance(member, RawMember):
+            acc[5] += clock() - t0
+            acc[6] += 1
+            acc[7] += data_size(plan.data)
+            acc[8] += data_size(member.data)
+        prepared.append(member)
+    if prof is not None:
+        if acc[1]:
+            prof.record(label, "mkdir", acc[0], acc[1])
+        if acc[3]:
+            prof.record(label, "write", acc[2], acc[3], bytes_out=acc[4])
+        if acc[6]:
+            prof.record(label, "compress", acc[5], acc[6], bytes_in=acc[7], bytes_out=acc[8])
+    return prepared
+
+
+class OutputWriter:
+    """逐个接收 StudentOutput，写到磁盘和一个压缩包。
+
+    条目路径使用 "/" 分隔、相对于 base，同时作为压缩包内的成员名。
+    压缩包格式由 archive 的扩展名决定（.tar、.tar.gz/.tgz、.zip），认不出时用 fmt；
+    archive 为 STDOUT 时按 fmt 写到标准输出，为 None 时不打包。incremental 需要压缩包文件。
+    传入 pool 时磁盘写入和成员压缩（按 policy 选择级别）在线程池中进行，压缩包成员顺序
+    与串行时完全一致；多个 OutputWriter 可以共用同一个线程池。
+    传入 profile 时各阶段的耗时和字节数以 label 为产物名记入其中。
+    checksums=True 时写出学生文件夹和压缩包的 MANIFEST.sha256（见模块说明）。
+    """
+
+    def __init__(self, base: Path, archive: Optional[Path], zip_only: bool = False, dedup: bool = False,
+                 incremental: bool = False, template: str = "",
+                 pool: Optional[Executor] = None, window: int = 1,
+                 policy: Optional[CompressionPolicy] = None, reproducible: bool = False,
+                 profile: Optional[Profile] = None, label: str = "", fmt: str = "zip",
+                 shards=None, checksums: bool = False) -> None:
+        if incremental and (archive in (None, STDOUT) or shards is not None):
+            raise ValueError("incremental 需要写到单个压缩包文件")
+        self.base = base
+        self.archive = archive
+        self.zip_only = zip_only
+        self.incremental = incremental
+        self.reproducible = reproducible
+        self.stats = WriteStats()
+        self._made: set = set()
+        self._store = ContentStore() if dedup else None
+        self._mpath = manifest_path(archive) if incremental else None
+        self._old = Manifest.load(self._mpath) if incremental else Manifest()
+        self._new = Manifest(template, compression=(policy or CompressionPolicy()).key())
+        if shards is not None:
+            # 分片时 archive 为索引文件（摘要、提示都针对它），成员交给 shards.ShardedArchive
+            self._out = self._shards = shards
+        else:
+            self._shards = None
+            reuse = incremental and self._old.archive_unchanged(archive, self._new.compression)
+            self._out = open_archive(archive, reuse_old=reuse,
+                                     policy=policy, reproducible=reproducible, fmt=fmt)
+        self._pool = pool
+        self._window = max(1, window)
+        self._pending: Deque[Tuple[List[_FilePlan], Future, Optional[str]]] = deque()
+        self._prof = profile
+        self._label = label or (archive or base).name
+        self._checksums = checksums
+        # 压缩包的 MANIFEST.sha256 先逐行追加到临时文件（不随人数占用内存），close() 时作为最后一个成员
+        self._sums = self._sums_hash = None
+        if checksums and archive is not None:
+            self._sums = tempfile.NamedTemporaryFile("wb", suffix=".sha256", delete=False)
+            self._sums_hash = hashlib.sha256()
+
+    def add(self, student: StudentOutput, count: bool = True) -> None:
+        """写入一个学生的输出；count=False 用于不属于任何学生的共享文件，不计入人数和清单参数。"""
+        if self._prof is None:
+            plans = self._plan(student, count)
+        else:
+            t0 = clock()
+            plans = self._plan(student, count)
+            self._prof.record(self._label, "plan", clock() - t0, len(plans),
+                              bytes_in=sum(data_size(p.data) for p in plans))
+        self._submit(plans, student.name if count else None)
+
+    def can_keep(self, name: str, rels: List[str]) -> bool:
+        """上次的清单和压缩包里是否完整保留着这个学生的输出，可以用 keep() 沿用。"""
+        old = self._old
+        return (self.incremental and name in old.students
+                and all(rel in old.files and self._out.has_old(rel)
+                        and (self.zip_only or old.disk_unchanged(rel, self.base / rel)) for rel in rels))
+
+    def keep(self, name: str, rels: List[str]) -> dict:
+        """沿用上次的输出而不重新渲染：磁盘文件不动，压缩包成员直接复制旧的压缩数据。
+
+        调用前须先用 can_keep() 确认；返回上次记录的学生参数。
+        """
+        old, new = self._old, self._new
+        plans = []
+        for rel in rels:
+            rec = new.files[rel] = old.files[rel]
+            if self._store is not None:
+                self._store.add(rel, rec["sha256"])
+            plans.append(_FilePlan(rel, b"", "skip", None, True, rec["sha256"]))
+        params = new.students[name] = old.students[name]
+        self.stats.students += 1
+        if not self.zip_only:
+            self.stats.skipped += len(plans)
+        if self._checksums:
+            self._checksum(plans)       # 文件夹清单按摘要重新生成，内容没变时同样沿用
+        self._submit(plans, name)
+        return params
+
+    def _submit(self, plans: List[_FilePlan], name: Optional[str]) -> None:
+        """name 为学生名，共享文件为 None（分片时据此决定成员去哪个压缩包）。"""
+        task = partial(_materialise, self.base, plans, self._out, self._made, self._prof, self._label)
+        if self._pool is None:
+            self._finish(plans, task(), name)
+            return
+        self._pending.append((plans, self._pool.submit(task), name))
+        if len(self._pending) >= self._window:
+            self._finish_oldest()
+
+    def _finish_oldest(self) -> None:
+        plans, fut, name = self._pending.popleft()
+        self._finish(plans, fut.result(), name)
+
+    def _plan_entry(self, rel: str, content: Content) -> _FilePlan:
+        old, stats = self._old, self.stats
+        if isinstance(content, FileRef):
+            data = content
+            digest = file_sha256(content)
+        else:
+            data = to_bytes(content)
+            digest = hashlib.sha256(data).hexdigest()
+        unchanged = old.digest(rel) == digest
+        first = self._store.add(rel, digest) if self._store is not None else None
+        rec = {"sha256": digest, "disk": None}
+        if self.zip_only:
+            # 不碰磁盘；内容没变时沿用上次的磁盘记录，下次写文件夹时仍可跳过
+            action = "skip"
+            if unchanged:
+                rec["disk"] = old.files[rel].get("disk")
+        elif unchanged and old.disk_unchanged(rel, self.base / rel):
+            action = "skip"
+            rec["disk"] = old.files[rel]["disk"]
+            stats.skipped += 1
+        else:
+            action = "link" if first is not None else "write"
+            stats.written += 1
+        if self.incremental:
+            self._new.files[rel] = rec
+        return _FilePlan(rel, data, action, first, unchanged, digest)
+
+    def _plan(self, student: StudentOutput, count: bool = True) -> List[_FilePlan]:
+        new, stats = self._new, self.stats
+        plans = [self._plan_entry(rel, content) for rel, content in student.files]
+        if self._checksums:
+            self._checksum(plans, folder=count)
+        if count:
+            stats.students += 1
+            if self.incremental:
+                new.students[student.name] = student.params
+        if len(self._made) > 4096:
+            # 只是省去重复 mkdir 的缓存，名单很长时定期清空，避免随人数增长
+            self._made.clear()
+        return plans
+
+    def _checksum(self, plans: List[_FilePlan], folder: bool = True) -> None:
+        """folder 为真时给学生文件夹（第一个条目的顶层目录）追加 MANIFEST.sha256 条目；
+        再把 plans 的摘要按成员顺序记入压缩包的清单。"""
+        if folder and plans:
+            top = plans[0].rel.split("/", 1)[0] + "/"
+            text = "".join(checksum_line(p.sha256, p.rel[len(top):]) for p in plans if p.rel.startswith(top))
+            plans.append(self._plan_entry(top + CHECKSUMS, text.encode("utf-8")))
+        if self._sums is not None:
+            data = "".join(checksum_line(p.sha256, p.rel) for p in plans).encode("utf-8")
+            self._sums.write(data)
+            self._sums_hash.update(data)
+
+    def _add_archive_checksums(self) -> None:
+        """压缩包根目录的 MANIFEST.sha256：只进压缩包，不写到文件夹里。"""
+        self._sums.close()
+        rel, digest = CHECKSUMS, self._sums_hash.hexdigest()
+        if self.incremental:
+            self._new.files[rel] = {"sha256": digest, "disk": None}
+        ref = FileRef(self._sums.name, os.stat(self._sums.name).st_size)
+        self._submit([_FilePlan(rel, ref, "skip", None, self._old.digest(rel) == digest, digest)], None)
+
+    def _drop_checksums(self) -> None:
+        if self._sums is not None:
+            self._sums.close()
+            try:
+                os.unlink(self._sums.name)
+            except FileNotFoundError:
+                pass
+
+    def _finish(self, plans: List[_FilePlan], prepared: list, name: Optional[str] = None) -> None:
+        base, prof = self.base, self._prof
+        t_link = t_archive = 0.0
+        links = 0
+        if self._shards is not None:
+            self._shards.start(name)
+        for plan, member in zip(plans, prepared):
+            if plan.action == "link":
+                t0 = clock() if prof is not None else 0.0
+                full = base / plan.rel
+                if full.parent not in self._made:
+                    ensure_dir(full.parent)
+                    self._made.add(full.parent)
+                _link_file(base / plan.link_to, full, plan.data)
+                if prof is not None:
+                    t_link += clock() - t0
+                    links += 1
+            if self.incremental and plan.action != "skip":
+                self._new.files[plan.rel]["disk"] = stat_key(base / plan.rel)
+            t0 = clock() if prof is not None else 0.0
+            self._out.add(member)
+            if prof is not None:
+                t_archive += clock() - t0
+            self.stats.files += 1
+        if prof is not None:
+            if links:
+                prof.record(self._label, "link", t_link, links)
+            prof.record(self._label, "archive", t_archive, len(plans))
+
+    def close(self) -> WriteStats:
+        if self._sums is not None:
+            self._add_archive_checksums()
+        while self._pending:
+            self._finish_oldest()
+        t0 = clock() if self._prof is not None else 0.0
+        try:
+            self.stats.sha256 = self._out.close()
+        finally:
+            self._drop_checksums()
+        if self.reproducible and self.archive not in (None, STDOUT):
+            digest_path(self.archive).write_text(f"{self.stats.sha256}  {self.archive.name}\n", encoding="utf-8")
+        if self.incremental:
+            old, new = self._old, self._new
+            for rel, rec in old.files.items():
+                if rel not in new.files and rec.get("disk") and not self.zip_only:
+                    _remove_stale(self.base, rel)
+                    self.stats.removed += 1
+            new.archive = stat_key(self.archive)
+            new.save(self._mpath)
+        if self._prof is not None:
+            self._prof.record(self._label, "close", clock() - t0, bytes_out=self._out.size)
+        return self.stats
+
+    def abort(self) -> None:
+        """出错时等在途任务结束后丢弃临时压缩包，保留原来的压缩包和清单。"""
+        for _, fut, _ in self._pending:
+            fut.cancel()
+        for _, fut, _ in self._pending:
+            if not fut.cancelled():
+                try:
+                    fut.result()
+                except Exception:
+                    pass
+        self._pending.clear()
+        self._out.abort()
+        self._drop_checksums()
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """给生成脚本加上公共的输出相关命令行参数。"""
+    only = parser.add_mutually_exclusive_group()
+    only.add_argument("--zip-only", "--archive-only", dest="zip_only", action="store_true",
+                      help="只生成压缩包，不写出各文件夹")
+    only.add_argument("--no-archive", action="store_true", help="只写出各文件夹，不生成压缩包")
+    parser.add_argument("--format", choices=ARCHIVE_FORMATS, default="zip",
+                        help="压缩包格式（默认 zip；tar 支持把重复内容存为硬链接成员，tar.gz 再整体 gzip）")
+    parser.add_argument("--output-dir", "-o", type=Path, default=Path("."), metavar="DIR",
+                        help="文件夹和压缩包的输出目录（默认当前目录）")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="压缩包路径，代替脚本默认的文件名（扩展名决定格式）；- 表示按 --format "
+                             "流式写到标准输出，便于直接接上传或解压命令")
+    parser.add_argument("--dedup", action="store_true",
+                        help="相同内容只写一次，重复文件在磁盘上用硬链接、在 tar 中用硬链接成员")
+    parser.add_argument("--incremental", action="store_true",
+                        help="依据压缩包旁的 .manifest.json 只重写内容有变化的文件")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="可复现的压缩包：固定时间戳（可用 SOURCE_DATE_EPOCH）和权限，并写出 <压缩包>.sha256")
+    parser.add_argument("--checksums", action="store_true",
+                        help="每个学生文件夹和压缩包根目录各写一个 MANIFEST.sha256（sha256sum -c 可校验），"
+                             "摘要在写出时顺带得到，不回读文件")
+    parser.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                        help="并行渲染的进程数（0 表示全部 CPU，默认 1）")
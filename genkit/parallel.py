@@ -0,0 +1,54 @@
+"""
+按顺序并行：把逐个学生的渲染分发到进程池，结果仍按输入顺序产出。
+
+渲染是纯 Python 代码，受 GIL 限制，所以用进程池；写文件和 zlib 压缩会释放 GIL，
+由 output.OutputWriter 在线程池中完成。两处都只保留有限个在途任务，内存不随名单长度增长。
+"""
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, TypeVar
+
+R = TypeVar("R")
+
+DEFAULT_CHUNKSIZE = 64
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def _run_chunk(fn: Callable[..., R], chunk: List[tuple]) -> List[R]:
+    return [fn(*args) for args in chunk]
+
+
+def ordered_map(fn: Callable[..., R], items: Iterable[tuple], jobs: int = 1,
+                chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[R]:
+    """对每个参数元组调用 fn(*args)，结果顺序与输入一致。
+
+    jobs <= 1 时直接在当前进程中逐个计算（与原来的串行循环完全相同）；否则按 chunksize
+    分块提交到进程池。fn 必须是模块级函数，以便被 pickle。
+    """
+    if jobs <= 1:
+        for args in items:
+            yield fn(*args)
+        return
+    it = iter(items)
+    chunks = iter(lambda: list(islice(it, chunksize)), [])
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_run_chunk, fn, chunk))
+            if len(pending) >= jobs * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """命令行 --jobs 0 表示使用全部 CPU。"""
+    if jobs is None:
+        return 1
+    return jobs if jobs > 0 else default_jobs()
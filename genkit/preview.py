@@ -0,0 +1,384 @@
+"""
+本地预览服务器：直接从生成的压缩包（zip 或 tar）里按需读取成员并通过 HTTP 提供，无需解压。
+
+    python3 -m genkit.preview pinyin_folders_42.zip            # http://127.0.0.1:8000/
+    python3 -m genkit.preview java_sorts_42.tar --port 9000
+
+- 每个响应带 ETag（zip 取成员的 CRC 与大小），If-None-Match 命中时返回 304；
+- 浏览器接受 gzip 时优先发送 --production 生成的 .gz 兄弟成员，没有则对文本类型现场压缩；
+- 最近读过的成员（以及现场压缩的结果）保存在按字节数限额的 LRU 中，重复访问不再解压；
+- 直接请求 .gz 成员时，浏览器接受 gzip 就按原文件的类型加 Content-Encoding: gzip 发送；
+- 压缩包被重新生成（大小或修改时间变化）后自动重新打开并清空缓存；每个请求只用一个版本，
+  处理中途遇到重新生成时用新版本重试；
+- _shared/ 下带内容哈希的资源标记为可长期缓存，其余要求每次用 ETag 重新验证。
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import html
+import mimetypes
+import posixpath
+import tarfile
+import threading
+import zipfile
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+DEFAULT_PORT = 8000
+DEFAULT_CACHE_MB = 32
+GZIP_MIN_SIZE = 256
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+IMMUTABLE_PREFIX = "_shared/"
+RETRIES = 3             # 请求处理中途压缩包被重新生成时，最多用新版本重试的次数
+
+
+class LRUCache:
+    """按字节数限额的 LRU；多线程共用。"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, dropped = self._data.popitem(last=False)
+                self._size -= len(dropped)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+
+class ArchiveChanged(Exception):
+    """请求进行中压缩包被重新生成，请求所用的旧视图已经关闭；应以新视图重新处理该请求。"""
+
+
+class ArchiveView:
+    """压缩包某一版本（generation）的只读视图：按成员名查询 ETag、大小和内容。
+
+    一个请求自始至终使用同一个视图，ETag 与内容总是来自同一个压缩包。读取与重新打开
+    共用 ArchiveSource 的锁（lock）；视图被换下后再读取会抛出 ArchiveChanged，而不是读到已关闭的
+    文件或新压缩包中的数据。
+    """
+
+    def __init__(self, lock: threading.Lock, cache: LRUCache, generation: int, archive,
+                 members: Dict[str, object]) -> None:
+        self._lock = lock
+        self._cache = cache
+        self.generation = generation
+        self._archive = archive
+        self._members = members
+        self._dirs = {posixpath.dirname(n) for n in members}
+        for d in list(self._dirs):
+            while d:
+                d = posixpath.dirname(d)
+                self._dirs.add(d)
+
+    def is_dir(self, name: str) -> bool:
+        return name in self._dirs
+
+    def children(self, name: str) -> list:
+        prefix = name + "/" if name else ""
+        found = set()
+        for n in self._members:
+            if n.startswith(prefix):
+                rest = n[len(prefix):]
+                head, sep, _ = rest.partition("/")
+                found.add(head + sep)
+        return sorted(found)
+
+    def _member(self, name: str):
+        """name 的成员信息；tar 中的硬链接成员（--dedup）换成它指向的成员，大小和数据位置都以目标为准。"""
+        info = self._members.get(name)
+        seen = set()
+        while isinstance(info, tarfile.TarInfo) and info.islnk() and info.linkname not in seen:
+            seen.add(info.linkname)
+            target = self._members.get(info.linkname)
+            if target is None:
+                break
+            info = target
+        return info
+
+    def etag(self, name: str) -> Optional[str]:
+        info = self._member(name)
+        if info is None:
+            return None
+        if isinstance(info, zipfile.ZipInfo):
+            return f'"{info.CRC:08x}-{info.file_size:x}"'
+        return f'"{self.generation:x}-{info.offset_data:x}-{info.size:x}"'
+
+    def size(self, name: str) -> int:
+        info = self._member(name)
+        return info.file_size if isinstance(info, zipfile.ZipInfo) else info.size
+
+    def read(self, name: str) -> bytes:
+        key = (self.generation, name, "")
+        data = self._cache.get(key)
+        if data is None:
+            info = self._member(name)
+            with self._lock:
+                if self._archive is None:
+                    raise ArchiveChanged(name)
+                if isinstance(info, zipfile.ZipInfo):
+                    data = self._archive.read(info)
+                else:
+                    data = self._archive.extractfile(info).read()
+            self._cache.put(key, data)
+        return data
+
+    def read_gzip(self, name: str) -> bytes:
+        """现场压缩的版本；同样进入 LRU。"""
+        key = (self.generation, name, "gzip")
+        data = self._cache.get(key)
+        if data is None:
+            data = gzip.compress(self.read(name), 6, mtime=0)
+            self._cache.put(key, data)
+        return data
+
+    def _close(self) -> None:
+        """由 ArchiveSource 在持有锁时调用。"""
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+
+class ArchiveSource:
+    """一个压缩包文件；refresh() 给出当前版本的 ArchiveView，文件变化后自动重新打开。"""
+
+    def __init__(self, path: Path, cache: LRUCache) -> None:
+        self.path = path
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._view: Optional[ArchiveView] = None
+        self._generation = 0
+        self.refresh()
+
+    def refresh(self) -> ArchiveView:
+        """压缩包被重新生成时重新打开，返回当前视图；每个请求开始时调用一次。"""
+        st = self.path.stat()
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if stamp == self._stamp and self._view is not None:
+                return self._view
+            if tarfile.is_tarfile(self.path):
+                archive = tarfile.open(self.path)
+                members = {m.name: m for m in archive.getmembers() if m.isfile() or m.islnk()}
+            else:
+                archive = zipfile.ZipFile(self.path)
+                members = {i.filename: i for i in archive.infolist() if not i.is_dir()}
+            if self._view is not None:
+                self._view._close()
+            self._generation += 1
+            self._view = ArchiveView(self._lock, self.cache, self._generation, archive, members)
+            self._stamp = stamp
+            self.cache.clear()
+            return self._view
+
+    def close(self) -> None:
+        with self._lock:
+            if self._view is not None:
+                self._view._close()
+                self._view = None
+            self._stamp = None
+
+
+def _content_type(name: str) -> Tuple[str, Optional[str]]:
+    """(Content-Type, 成员本身的压缩编码)；如 styles.css.gz 为 ("text/css; charset=utf-8", "gzip")。"""
+    ctype, coding = mimetypes.guess_type(name)
+    ctype = ctype or "application/octet-stream"
+    if ctype.startswith("text/") or ctype in ("application/javascript", "image/svg+xml"):
+        ctype += "; charset=utf-8"
+    return ctype, coding
+
+
+def _accepts_gzip(header: Optional[str]) -> bool:
+    """Accept-Encoding 是否接受 gzip。明确列出的 gzip（或 x-gzip）优先于 *，与先后顺序无关；q=0 为拒绝。"""
+    weights: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights.setdefault(coding, q)
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in weights:
+            return weights[coding] > 0
+    return False
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    source: ArchiveSource     # 由 make_server 绑定
+    quiet = False
+    server_version = "genkit-preview"
+
+    def do_GET(self) -> None:
+        self._serve(head=False)
+
+    def do_HEAD(self) -> None:
+        self._serve(head=True)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _serve(self, head: bool) -> None:
+        for _ in range(RETRIES):
+            try:
+                view = self.source.refresh()
+            except (OSError, zipfile.BadZipFile, tarfile.TarError):
+                break
+            try:
+                self._respond(view, head)
+                return
+            except ArchiveChanged:
+                continue        # 处理中途压缩包被重新生成：用新的版本从头再来
+        self.send_error(HTTPStatus.SERVICE_UNAVAILABLE, explain="压缩包暂时不可读")
+
+    def _respond(self, view: ArchiveView, head: bool) -> None:
+        """用同一个视图处理整个请求；读取时视图已被换下则抛出 ArchiveChanged（此时尚未发送任何内容）。"""
+        url_path = unquote(urlsplit(self.path).path)
+        name = posixpath.normpath(url_path).lstrip("/")
+        if name == ".":
+            name = ""
+        if view.is_dir(name):
+            if not url_path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", quote(url_path + "/"))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            index = posixpath.join(name, "index.html") if name else "index.html"
+            if view.etag(index) is None:
+                self._listing(view, name, head)
+                return
+            name = index
+        etag = view.etag(name)
+        if etag is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        ctype, coding = _content_type(name)
+        gzip_ok = _accepts_gzip(self.headers.get("Accept-Encoding"))
+        encoding = None
+        source = name               # 发送哪个成员；None 表示现场压缩 name
+        if coding is not None:
+            # 直接请求预压缩的成员（如 styles.css.gz）：浏览器接受时按原类型加 Content-Encoding 发送，
+            # 否则作为压缩文件本身下载
+            if coding == "gzip" and gzip_ok:
+                encoding, etag = "gzip", etag[:-1] + '-gz"'
+            else:
+                ctype = "application/gzip" if coding == "gzip" else "application/octet-stream"
+        elif gzip_ok:
+            if view.etag(name + ".gz") is not None:
+                encoding, etag, source = "gzip", view.etag(name + ".gz")[:-1] + '-gz"', name + ".gz"
+            elif ctype.startswith(COMPRESSIBLE) and view.size(name) >= GZIP_MIN_SIZE:
+                encoding, etag, source = "gzip", etag[:-1] + '-gzip"', None
+
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._common_headers(name, etag)
+            self.end_headers()
+            return
+
+        body = view.read(source) if source is not None else view.read_gzip(name)
+        self.send_response(HTTPStatus.OK)
+        self._common_headers(name, etag)
+        self.send_header("Content-Type", ctype)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _common_headers(self, name: str, etag: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        if name.startswith(IMMUTABLE_PREFIX):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+
+    def _listing(self, view: ArchiveView, name: str, head: bool) -> None:
+        title = html.escape("/" + name + ("/" if name else ""))
+        items = "".join(f'<li><a href="{quote(c)}">{html.escape(c)}</a></li>\n' for c in view.children(name))
+        body = (f'<!doctype html>\n<meta charset="utf-8">\n<title>{title}</title>\n'
+                f'<h1>{html.escape(self.source.path.name)}：{title}</h1>\n<ul>\n{items}</ul>\n').encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+
+def make_server(archive: Path, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                cache_mb: int = DEFAULT_CACHE_MB, quiet: bool = False) -> ThreadingHTTPServer:
+    source = ArchiveSource(archive, LRUCache(cache_mb * 1024 * 1024))
+    handler = type("BoundPreviewHandler", (PreviewHandler,), {"source": source, "quiet": quiet})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="直接从生成的压缩包提供本地预览，无需解压")
+    parser.add_argument("archive", nargs="?", default="pinyin_folders_42.zip", type=Path,
+                        help="压缩包路径（zip 或 tar，默认 pinyin_folders_42.zip）")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"端口（默认 {DEFAULT_PORT}）")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB, metavar="MB",
+                        help=f"内存中缓存成员的上限（默认 {DEFAULT_CACHE_MB} MB）")
+    parser.add_argument("--quiet", action="store_true", help="不打印每个请求的日志")
+    args = parser.parse_args(argv)
+    if not args.archive.exists():
+        parser.error(f"找不到压缩包：{args.archive}（先运行对应的生成脚本）")
+    server = make_server(args.archive, args.host, args.port, args.cache_mb, args.quiet)
+    host, port = server.server_address[:2]
+    print(f"预览 {args.archive}：http://{host}:{port}/  （Ctrl+C 结束）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.source.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+--profile：按产物、按阶段统计耗时、调用次数和字节数。
+
+阶段：
+    render    渲染模板（在渲染进程中计时，随结果传回）
+    minify    --production 的资源压缩与 .gz 生成（同上）
+    validate  Java 源码检查
+    plan      内容编码、sha256、增量比较（输入字节即渲染出的字节数）
+    mkdir     创建目录
+    write     写磁盘文件（输出字节即写入磁盘的字节数）
+    link      --dedup 的硬链接
+    compress  压缩包成员压缩（输入/输出字节之比即压缩率）
+    archive   把成员按顺序写入压缩包
+    close     收尾：中央目录、摘要、清单
+
+mkdir/write/compress 在线程池中进行时，各线程的耗时累加计入，合计可能超过总耗时。
+未开启时各处只多一次 `is None` 判断。
+"""
+from __future__ import annotations
+import json
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+STAGES = ("render", "minify", "validate", "plan", "mkdir", "write", "link", "compress", "archive", "close")
+
+clock = time.perf_counter
+
+
+def pad(text: str, width: int, left: bool = False) -> str:
+    """按显示宽度补齐空格（中文占两格），默认右对齐。"""
+    fill = " " * max(0, width - sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text))
+    return text + fill if left else fill + text
+
+
+class Profile:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # (产物, 阶段) -> [耗时, 次数, 输入字节, 输出字节]
+        self._stages: Dict[Tuple[str, str], List[float]] = {}
+        self._start = clock()
+        self.wall = 0.0
+
+    def record(self, family: str, stage: str, seconds: float, calls: int = 1,
+               bytes_in: int = 0, bytes_out: int = 0) -> None:
+        """累加一次统计；可在工作线程中调用。"""
+        with self._lock:
+            row = self._stages.get((family, stage))
+            if row is None:
+                row = self._stages[family, stage] = [0.0, 0, 0, 0]
+            row[0] += seconds
+            row[1] += calls
+            row[2] += bytes_in
+            row[3] += bytes_out
+
+    def stop(self) -> None:
+        self.wall = clock() - self._start
+
+    def rows(self) -> List[dict]:
+        order = {s: i for i, s in enumerate(STAGES)}
+        families = list(dict.fromkeys(f for f, _ in self._stages))
+        keys = sorted(self._stages, key=lambda k: (families.index(k[0]), order.get(k[1], len(order))))
+        out = []
+        for family, stage in keys:
+            seconds, calls, bytes_in, bytes_out = self._stages[family, stage]
+            out.append({
+                "family": family, "stage": stage, "seconds": seconds, "calls": calls,
+                "bytes_in": bytes_in, "bytes_out": bytes_out,
+                "ratio": bytes_out / bytes_in if bytes_in and bytes_out else None,
+            })
+        return out
+
+    def summary(self) -> str:
+        lines = [f"性能剖析：总耗时 {self.wall:.3f}s",
+                 pad("产物", 12, left=True) + pad("阶段", 10, left=True) + pad("耗时(s)", 10) + pad("占比", 9)
+                 + pad("次数", 10) + pad("输入字节", 16) + pad("输出字节", 16) + pad("比率", 9)]
+        for r in self.rows():
+            share = r["seconds"] / self.wall * 100 if self.wall else 0.0
+            ratio = f"{r['ratio']:.2f}" if r["ratio"] is not None else "-"
+            lines.append(f"{r['family']:<12}{r['stage']:<10}{r['seconds']:>10.3f}{share:>8.1f}%{r['calls']:>10}"
+                         f"{r['bytes_in'] or '-':>16}{r['bytes_out'] or '-':>16}{ratio:>9}")
+        return "\n".join(lines)
+
+    def dump(self, path: Path) -> None:
+        doc = {"wall": self.wall, "stages": self.rows()}
+        path.write_text(json.dumps(doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,253 @@
+"""
+名单（roster）读取。
+
+默认使用内置的 42 个拼音名；也可以用 --roster 指定外部名单文件（"-" 表示标准输入）：
+- .txt  每行一个名字，空行和以 # 开头的行忽略；
+- .csv  若首行含 name 列则取该列，否则取第一列；
+- .jsonl 每行一个 JSON 对象（取 "name" 字段）或 JSON 字符串。
+扩展名认不出（以及标准输入）时按首行判断：以 { 或 " 开头为 jsonl，含逗号或只有 name 一词
+（单列 csv 的表头）为 csv，否则为 txt。
+
+csv 的表头和 jsonl 的对象还可以为学生指定素材文件（相对路径以名单文件所在目录为准，
+标准输入以当前目录为准）：photo 为照片，用作站点头像；assets 为附件，csv 中以 ; 分隔，
+jsonl 中为字符串列表。素材在读名单时只检查是否存在，内容在写出时才由内核直接复制。
+
+名单按行流式读取，只记住已出现的名字：名字会作为输出文件夹名，重复的名字会写进同一个
+文件夹，因此视为错误。需要总人数时（例如按人数均分色相），文件名单可以用 count() 再快速
+扫一遍（只检查名字，不检查素材文件）；标准输入无法回读，count() 返回 None。
+"""
+from __future__ import annotations
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+NAMES = [
+    "liting","ganrourou","panjincheng","huhao","wangxinyu","tanziqiang","zhangxinghuo","tanjierong","fanli","laishuanggui",
+    "hehao","liujunli","zhongyupeng","menghangxu","xubo","yuzhuokun","shijiaxue","zouyuxiang","wuhan","zhangyixin",
+    "liuhongcheng","zhouziyi","renran","zhengjiezhong","chengyanping","luoyi","zhengronglei","hemeilin","yanghaoran",
+    "dengxiaoyan","wangjingsheng","liaojiayu","zhangjingxi","zhangjieyi","tangqiang","huangjiajun","hutao","yangxiling",
+    "xieyucan","luoyifeng","guwencai","caichunmei",
+]
+
+ROSTER_FORMATS = ("auto", "txt", "csv", "jsonl")
+CSV_COLUMNS = ("name", "photo", "assets")      # csv 表头中认得的列名
+
+
+PHOTO_TYPES = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg")
+
+
+class RosterError(ValueError):
+    """名单内容不合法。"""
+
+
+class StudentAssets(NamedTuple):
+    """名单中为一个学生指定的素材文件（绝对路径）。"""
+    photo: Optional[str] = None
+    files: Tuple[str, ...] = ()
+
+
+NO_ASSETS = StudentAssets()
+
+
+def check_name(name: str, where: str = "") -> str:
+    """名字会直接作为文件夹名并填进模板，不能为空，不能含路径分隔符或换行等控制字符。"""
+    name = name.strip()
+    if not name or name in (".", "..") or "/" in name or "\\" in name or not name.isprintable():
+        raise RosterError(f"{where}非法的名字：{name!r}")
+    return name
+
+
+def _unique(name: str, seen: set, where: str = "") -> str:
+    if name in seen:
+        raise RosterError(f"{where}名字重复：{name!r}（重名的学生会写进同一个文件夹）")
+    seen.add(name)
+    return name
+
+
+def _sniff(first_line: str) -> str:
+    stripped = first_line.lstrip()
+    if stripped.startswith("{") or stripped.startswith('"'):
+        return "jsonl"
+    if "," in first_line:
+        return "csv"
+    if stripped.rstrip().lower() == "name":
+        # 只有一列的 csv：首行是表头而不是名叫 name 的学生
+        return "csv"
+    return "txt"
+
+
+Record = Tuple[str, StudentAssets]
+
+
+def check_assets(photo: Optional[str], files: Iterable[str], base: Path, where: str = "") -> StudentAssets:
+    """把素材路径解析为绝对路径，检查文件存在、照片类型和附件文件名不重复。"""
+    def resolve(p: str) -> str:
+        full = os.path.abspath(os.path.join(base, os.path.expanduser(p.strip())))
+        if not os.path.isfile(full):
+            raise RosterError(f"{where}找不到素材文件：{p!r}")
+        return full
+
+    if photo is not None and photo.strip():
+        photo = resolve(photo)
+        if os.path.splitext(photo)[1].lower() not in PHOTO_TYPES:
+            raise RosterError(f"{where}照片须为 {'/'.join(PHOTO_TYPES)} 之一：{photo!r}")
+    else:
+        photo = None
+    resolved = tuple(resolve(p) for p in files if p.strip())
+    seen = set()
+    for full in resolved:
+        base_name = os.path.basename(full)
+        if base_name in seen or not base_name.isprintable():
+            raise RosterError(f"{where}附件文件名重复或含控制字符：{base_name!r}")
+        seen.add(base_name)
+    return StudentAssets(photo, resolved) if photo or resolved else NO_ASSETS
+
+
+def _iter_txt(lines: Iterable[str], base: Optional[Path]) -> Iterator[Record]:
+    seen: set = set()
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if lineno == 1 and line.lower() == "name":
+            raise RosterError("第 1 行是 csv 表头 name，请使用 .csv 扩展名或 --roster-format csv")
+        where = f"第 {lineno} 行："
+        yield _unique(check_name(line, where), seen, where), NO_ASSETS
+
+
+def _iter_csv(lines: Iterable[str], base: Optional[Path]) -> Iterator[Record]:
+    seen: set = set()
+    col = 0
+    photo_col = assets_col = None
+    for lineno, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+        header = [c.strip().lower() for c in row]
+        if lineno == 1 and "name" not in header and all(c in CSV_COLUMNS for c in header):
+            raise RosterError(f"表头缺少 name 列：{','.join(row)}")
+        if lineno == 1 and "name" in header:
+            col = header.index("name")
+            photo_col = header.index("photo") if "photo" in header else None
+            assets_col = header.index("assets") if "assets" in header else None
+            continue
+        where = f"第 {lineno} 行："
+        name = _unique(check_name(row[col] if col < len(row) else "", where), seen, where)
+        photo = row[photo_col] if photo_col is not None and photo_col < len(row) else None
+        files = row[assets_col].split(";") if assets_col is not None and assets_col < len(row) else ()
+        yield name, check_assets(photo, files, base, where) if (photo or files) and base is not None else NO_ASSETS
+
+
+def _iter_jsonl(lines: Iterable[str], base: Optional[Path]) -> Iterator[Record]:
+    seen: set = set()
+    for lineno, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        where = f"第 {lineno} 行："
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            raise RosterError(f"{where}无法解析 JSON：{e}") from None
+        name = obj.get("name", "") if isinstance(obj, dict) else obj
+        if not isinstance(name, str):
+            raise RosterError(f"{where}缺少字符串类型的 name")
+        name = _unique(check_name(name, where), seen, where)
+        if base is None or not isinstance(obj, dict) or ("photo" not in obj and "assets" not in obj):
+            yield name, NO_ASSETS
+            continue
+        photo, files = obj.get("photo"), obj.get("assets") or []
+        if isinstance(files, str):
+            files = [files]
+        if (photo is not None and not isinstance(photo, str)) or not all(isinstance(f, str) for f in files):
+            raise RosterError(f"{where}photo 应为字符串，assets 应为字符串或字符串列表")
+        yield name, check_assets(photo, files, base, where)
+
+
+_PARSERS = {"txt": _iter_txt, "csv": _iter_csv, "jsonl": _iter_jsonl}
+
+
+def iter_records(lines: Iterable[str], fmt: str = "auto", base: Optional[Path] = Path(".")) -> Iterator[Record]:
+    """从文本行流中逐个解析 (名字, 素材)。fmt 为 auto 时根据第一行内容判断格式；
+    base 为 None 时不解析也不检查素材，素材一律为 NO_ASSETS。"""
+    it = iter(lines)
+    if fmt == "auto":
+        first = next(it, None)
+        if first is None:
+            return iter(())
+        fmt = _sniff(first)
+        it = _chain_first(first, it)
+    return _PARSERS[fmt](it, base)
+
+
+def iter_names(lines: Iterable[str], fmt: str = "auto") -> Iterator[str]:
+    """从文本行流中逐个解析名字。"""
+    return (name for name, _ in iter_records(lines, fmt, None))
+
+
+def _chain_first(first: str, rest: Iterator[str]) -> Iterator[str]:
+    yield first
+    yield from rest
+
+
+class Roster:
+    """可重复遍历（标准输入除外）的名单。"""
+
+    def __init__(self, names: Optional[List[str]] = None, path: Optional[Path] = None,
+                 fmt: str = "auto", stream: Optional[io.TextIOBase] = None) -> None:
+        self._names = names
+        self._path = path
+        self._stream = stream
+        if fmt == "auto" and path is not None and path.suffix.lower().lstrip(".") in _PARSERS:
+            fmt = path.suffix.lower().lstrip(".")
+        self._fmt = fmt
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self.records())
+
+    def records(self) -> Iterator[Record]:
+        """逐个给出 (名字, 素材)；没有指定素材的学生为 NO_ASSETS。"""
+        if self._names is not None:
+            return ((name, NO_ASSETS) for name in self._names)
+        if self._path is not None:
+            return self._iter_file()
+        return iter_records(self._stream, self._fmt)
+
+    def _iter_file(self, assets: bool = True) -> Iterator[Record]:
+        with open(self._path, encoding="utf-8-sig", newline="") as f:
+            yield from iter_records(f, self._fmt, self._path.parent if assets else None)
+
+    @property
+    def path(self) -> Optional[Path]:
+        """文件名单的路径；内置名单和标准输入为 None。"""
+        return self._path
+
+    def count(self) -> Optional[int]:
+        """名单总人数；文件名单会额外扫描一遍（不检查素材文件），标准输入返回 None。"""
+        if self._names is not None:
+            return len(self._names)
+        if self._path is not None:
+            return sum(1 for _ in self._iter_file(assets=False))
+        return None
+
+
+def load_roster(source: Optional[str] = None, fmt: str = "auto") -> Roster:
+    """source 为 None 时使用内置名单，"-" 表示标准输入，否则为文件路径。"""
+    if source is None:
+        return Roster(names=NAMES)
+    if source == "-":
+        return Roster(fmt=fmt, stream=sys.stdin)
+    path = Path(source)
+    if not path.is_file():
+        raise RosterError(f"找不到名单文件：{source}")
+    return Roster(path=path, fmt=fmt)
+
+
+def add_roster_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--roster", metavar="PATH",
+                        help="外部名单文件（txt/csv/jsonl，- 表示标准输入）；默认使用内置的 42 人名单")
+    parser.add_argument("--roster-format", choices=ROSTER_FORMATS, default="auto",
+                        help="名单格式，默认按扩展名或首行内容自动判断")
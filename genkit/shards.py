@@ -0,0 +1,393 @@
+"""
+分片压缩包：名单很长时把一个产物拆成多个压缩包，附带 学生 -> 分片 的索引。
+
+    python3 generate_sites.py --zip-only --shard-size 1000        # 每 1000 人一个分片
+    python3 generate_java_sorts.py --shard-bytes 64M --format tar.gz
+    python3 -m genkit.shards java_sorts_42.shards.json liting     # 查某个学生在哪个分片
+
+分片命名为 <压缩包名>-0001.zip、-0002.zip……，按名单顺序依次填满：当前分片的学生数达到
+--shard-size，或其中成员的数据量（zip 为压缩后，tar.gz 为 gzip 之前）达到 --shard-bytes 时，
+从下一个学生起换新分片。不属于任何学生的共享文件（如 --shared-assets 的公共资源、sprite）
+单独放在 <压缩包名>-shared.zip 中，每个分片都需要配合它使用。
+
+每个分片有自己的写出线程：主线程只负责把准备好的成员按顺序交给对应分片，组装、tar.gz 的
+gzip 压缩和写盘在各分片的线程中进行，前一个分片收尾时后面的分片已在写入。所有分片排队中的
+成员合计不超过 QUEUE_LIMIT 个；学生 -> 分片的对应关系逐行追加到临时文件，收尾时接在索引后面，
+内存不随人数增长。分片先写成 <文件名>.part，全部完成后才改名并写出索引；中途出错时已有的
+分片和索引保持不变。
+
+tar 的硬链接（--dedup）只能指向同一分片中的成员：目标在别的分片时，该成员在本分片中以普通
+成员写出一次，本分片中之后内容相同的成员再链接到它。
+
+索引 <压缩包名>.shards.json 在全部分片写完后生成，记录每个分片的文件名、人数、首尾学生、
+大小和 sha256，以及每个学生所在的分片。上次运行留下、这次不再需要的分片文件会被删除。
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional
+
+from .compression import CompressionPolicy
+from .filecopy import data_size
+from .output import archive_format, open_archive
+from .zipwriter import RawMember
+
+INDEX_FORMAT = "genkit-shards/1"
+QUEUE_LIMIT = 1024          # 所有分片排队中的成员总数上限
+SHARED = "shared"
+
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+
+class ShardSpec(NamedTuple):
+    """分片规则；两者都给出时先达到哪个就换分片，0 表示不按该项限制。"""
+    students: int = 0
+    max_bytes: int = 0
+
+
+def parse_size(text: str) -> int:
+    """argparse 用：解析 64M、512K、1G 或纯字节数。"""
+    m = re.fullmatch(r"\s*(\d+)\s*([KMG]?)i?B?\s*", text, re.IGNORECASE)
+    if not m or int(m.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(f"无法解析大小：{text!r}（例如 64M、512K、1G）")
+    return int(m.group(1)) * _UNITS[m.group(2).upper()]
+
+
+def _positive(text: str) -> int:
+    try:
+        n = int(text)
+    except ValueError:
+        n = 0
+    if n <= 0:
+        raise argparse.ArgumentTypeError(f"应为正整数：{text!r}")
+    return n
+
+
+def add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--shard-size", type=_positive, metavar="N",
+                        help="每 N 个学生一个压缩包，另写出 <压缩包名>.shards.json 索引（见 shards.py）")
+    parser.add_argument("--shard-bytes", type=parse_size, metavar="SIZE",
+                        help="每个分片的成员数据量上限，如 64M；可与 --shard-size 同时使用")
+
+
+def shard_spec(args: argparse.Namespace) -> Optional[ShardSpec]:
+    if not args.shard_size and not args.shard_bytes:
+        return None
+    return ShardSpec(args.shard_size or 0, args.shard_bytes or 0)
+
+
+def index_path(archive: Path, fmt: str = "zip") -> Path:
+    """分片索引的路径：java_sorts_42.zip -> java_sorts_42.shards.json。"""
+    stem, _ = _split(archive, fmt)
+    return archive.with_name(stem + ".shards.json")
+
+
+def _split(archive: Path, fmt: str) -> tuple:
+    """(不带扩展名的文件名, 扩展名)；扩展名按格式取，tar.gz 的两段一起去掉。"""
+    fmt = archive_format(archive, fmt)
+    name = archive.name
+    for ext in ((".tar.gz", ".tgz") if fmt == "tar.gz" else ("." + fmt,)):
+        if name.lower().endswith(ext):
+            return name[:-len(ext)], ext
+    return name, "." + fmt
+
+
+def _member_size(prepared) -> int:
+    if isinstance(prepared, RawMember):
+        return data_size(prepared.data)
+    _, data, link_to = prepared
+    return 0 if link_to is not None else data_size(data)
+
+
+_CLOSE = object()
+_ABORT = object()
+_CHUNK = 1 << 20
+
+
+class _Shard:
+    """一个分片：自己的压缩包输出端和写出线程，成员按到达顺序写入。"""
+
+    def __init__(self, path: Path, sink, budget: threading.Semaphore, tar: bool) -> None:
+        self.path = path
+        self.sink = sink
+        self.students = 0
+        self.bytes = 0
+        self.first = self.last = ""
+        self.sha256 = ""
+        self.error: Optional[BaseException] = None
+        # tar：硬链接目标（全局第一个同内容成员）-> 本分片中可链接到的同内容成员
+        self._names: Optional[Dict[str, str]] = {} if tar else None
+        self._budget = budget
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name=f"shard-{path.name}", daemon=True)
+        self._thread.start()
+
+    def put(self, prepared) -> None:
+        if self.error is not None:
+            raise self.error
+        if self._names is not None:
+            rel, data, link_to = prepared
+            if link_to is None:
+                self._names[rel] = rel
+            elif link_to in self._names:
+                prepared = (rel, data, self._names[link_to])
+            else:
+                # 目标在别的分片：在本分片中写出一次，之后同内容的成员链接到这里
+                prepared = (rel, data, None)
+                self._names[link_to] = rel
+        self.bytes += _member_size(prepared)
+        self._budget.acquire()
+        self._queue.put(prepared)
+
+    def finish(self) -> None:
+        self._names = None
+        self._queue.put(_CLOSE)
+
+    def cancel(self) -> None:
+        self._queue.put(_ABORT)
+
+    def join(self) -> None:
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _CLOSE or item is _ABORT:
+                break
+            try:
+                if self.error is None:
+                    self.sink.add(item)
+            except BaseException as e:      # 记下后继续取走排队的成员，以免主线程等不到名额
+                self.error = e
+            finally:
+                self._budget.release()
+        try:
+            if item is _CLOSE and self.error is None:
+                self.sha256 = self.sink.close()
+            else:
+                self.sink.abort()
+        except BaseException as e:
+            self.error = self.error or e
+
+
+class ShardedArchive:
+    """按 ShardSpec 把成员分到多个压缩包的输出端，接口与 output.open_archive 返回的相同，
+    另需 OutputWriter 在每个学生的成员之前调用 start(名字)，共享文件为 start(None)。
+
+    archive 是不分片时的压缩包路径，各分片和索引的文件名由它派生；index 为索引路径。
+    """
+
+    def __init__(self, archive: Path, spec: ShardSpec, policy: Optional[CompressionPolicy] = None,
+                 reproducible: bool = False, fmt: str = "zip") -> None:
+        self.spec = spec
+        self.fmt = archive_format(archive, fmt)
+        self.index = index_path(archive, fmt)
+        self._stem, self._ext = _split(archive, fmt)
+        self._dir = archive.parent
+        self._policy = policy
+        self._reproducible = reproducible
+        self._budget = threading.Semaphore(QUEUE_LIMIT)
+        self._shards: List[_Shard] = []
+        self._shared: Optional[_Shard] = None
+        # 索引中 "students" 的各行，逐个追加到临时文件
+        self._students: BinaryIO = tempfile.NamedTemporaryFile("wb", suffix=".students", delete=False)
+        self._student_count = 0
+        self._current = self._open(f"{len(self._shards) + 1:04d}")
+        self._shards.append(self._current)
+        self._target = self._current
+        # 成员在工作线程中准备（压缩），与分到哪个分片无关，统一由第一个分片的输出端完成
+        self._prepare = self._current.sink.prepare
+
+    def _open(self, suffix: str) -> _Shard:
+        path = self._dir / f"{self._stem}-{suffix}{self._ext}"
+        # 先写成 .part，全部分片完成后才一起改名，中途出错时旧的分片和索引仍然一致
+        sink = open_archive(_staged(path), policy=self._policy, reproducible=self._reproducible, fmt=self.fmt)
+        return _Shard(path, sink, self._budget, self.fmt != "zip")
+
+    def prepare(self, rel: str, data: bytes, link_to: Optional[str] = None, reuse: bool = False):
+        return self._prepare(rel, data, link_to=link_to)
+
+    def has_old(self, rel: str) -> bool:
+        return False
+
+    def start(self, student: Optional[str]) -> None:
+        """之后 add() 的成员属于 student；None 为共享文件。需要时换到新的分片。"""
+        if student is None:
+            if self._shared is None:
+                self._shared = self._open(SHARED)
+            self._target = self._shared
+            return
+        cur, spec = self._current, self.spec
+        if cur.students and ((spec.students and cur.students >= spec.students)
+                             or (spec.max_bytes and cur.bytes >= spec.max_bytes)):
+            cur.finish()            # 在自己的线程中收尾，不等它
+            cur = self._current = self._open(f"{len(self._shards) + 1:04d}")
+            self._shards.append(cur)
+        if not cur.students:
+            cur.first = student
+        cur.students += 1
+        cur.last = student
+        line = f"{',' if self._student_count else ''}\n  {json.dumps(student, ensure_ascii=False)}: {len(self._shards) - 1}"
+        self._students.write(line.encode("utf-8"))
+        self._student_count += 1
+        self._target = cur
+
+    def add(self, prepared) -> None:
+        self._target.put(prepared)
+
+    @property
+    def size(self) -> int:
+        return sum(s.sink.size for s in self._all())
+
+    def _all(self) -> List[_Shard]:
+        return self._shards + ([self._shared] if self._shared is not None else [])
+
+    def close(self) -> str:
+        """等所有分片写完，写出索引并删除上次多出的分片，返回索引的 sha256。"""
+        shards = self._all()
+        self._current.finish()
+        if self._shared is not None:
+            self._shared.finish()
+        errors = []
+        for s in shards:
+            try:
+                s.join()
+            except BaseException as e:
+                errors.append(e)
+        if errors:
+            self._discard()
+            raise errors[0]
+        for s in shards:
+            os.replace(_staged(s.path), s.path)
+        old = load_index(self.index)
+        doc = {
+            "format": INDEX_FORMAT,
+            "archive_format": self.fmt,
+            "shared": self._entry(self._shared) if self._shared is not None else None,
+            "shards": [self._entry(s) for s in self._shards],
+        }
+        tmp = self.index.with_name(self.index.name + ".tmp")
+        digest = self._write_index(tmp, doc)
+        os.replace(tmp, self.index)
+        if old is not None:
+            keep = {s.path.name for s in shards}
+            for name in shard_files(old):
+                if name not in keep:
+                    try:
+                        (self._dir / name).unlink()
+                    except FileNotFoundError:
+                        pass
+        return digest
+
+    def _write_index(self, path: Path, doc: dict) -> str:
+        """写出与 json.dumps(doc + students, indent=1) 相同的索引，students 从临时文件逐块接上；
+        返回 sha256。"""
+        self._students.close()
+        head = json.dumps(doc, ensure_ascii=False, indent=1)[:-2] + ',\n "students": {'
+        tail = ("\n }" if self._student_count else "}") + "\n}\n"
+        h = hashlib.sha256()
+        try:
+            with open(path, "wb") as out, open(self._students.name, "rb") as lines:
+                for chunk in (head.encode("utf-8"), *iter(lambda: lines.read(_CHUNK), b""), tail.encode("utf-8")):
+                    out.write(chunk)
+                    h.update(chunk)
+        finally:
+            self._drop_students()
+        return h.hexdigest()
+
+    def _drop_students(self) -> None:
+        self._students.close()
+        try:
+            os.unlink(self._students.name)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _entry(s: _Shard) -> dict:
+        return {"file": s.path.name, "students": s.students, "first": s.first, "last": s.last,
+                "bytes": s.sink.size, "sha256": s.sha256}
+
+    def abort(self) -> None:
+        """丢弃所有分片的临时文件，已有的分片和索引保持不变。"""
+        for s in self._all():
+            s.cancel()
+        for s in self._all():
+            try:
+                s.join()
+            except BaseException:
+                pass
+        self._discard()
+
+    def _discard(self) -> None:
+        for s in self._all():
+            try:
+                _staged(s.path).unlink()
+            except FileNotFoundError:
+                pass
+        self._drop_students()
+
+
+def _staged(path: Path) -> Path:
+    return path.with_name(path.name + ".part")
+
+
+def load_index(path: Path) -> Optional[dict]:
+    try:
+        doc = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return doc if doc.get("format") == INDEX_FORMAT else None
+
+
+def shard_files(doc: dict) -> List[str]:
+    """索引中的全部分片文件名（包括共享分片）。"""
+    names = [s["file"] for s in doc["shards"]]
+    if doc.get("shared"):
+        names.append(doc["shared"]["file"])
+    return names
+
+
+def shard_of(doc: dict, student: str) -> Optional[str]:
+    """学生所在分片的文件名；不在名单中时为 None。"""
+    k = doc["students"].get(student)
+    return None if k is None else doc["shards"][k]["file"]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="查询分片索引：列出分片，或给出学生所在的分片")
+    parser.add_argument("index", type=Path, help="<压缩包名>.shards.json")
+    parser.add_argument("students", nargs="*", help="学生名；省略时列出全部分片")
+    args = parser.parse_args(argv)
+    doc = load_index(args.index)
+    if doc is None:
+        parser.error(f"{args.index} 不是分片索引（{INDEX_FORMAT}）")
+    if not args.students:
+        for s in doc["shards"]:
+            print(f"{s['file']}\t{s['students']}\t{s['first']}..{s['last']}\t{s['bytes']}")
+        if doc.get("shared"):
+            print(f"{doc['shared']['file']}\t共享")
+        return
+    missing = False
+    for name in args.students:
+        found = shard_of(doc, name)
+        if found is None:
+            print(f"{name} 不在索引中", file=sys.stderr)
+            missing = True
+        else:
+            print(found)
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
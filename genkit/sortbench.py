@@ -0,0 +1,204 @@
+"""
+汇总各学生文件夹中计时程序的结果：generate_java_sorts.py --bench 的 Bench.java，以及
+generate_java_collections.py --perf 的 ListPerf/MapPerf/QueuePerf（实现对应算法，场景对应分布）。
+
+    python3 -m genkit.sortbench                    # 当前目录下的 */bench.tsv
+    python3 -m genkit.sortbench java_sorts/ extra/bench.tsv --stat min --csv table.csv
+
+输入格式（制表符分隔，# 开头为说明行）：
+    # student  <名字>
+    time  <算法>  <分布>  <规模>  <第几次>  <纳秒>
+    skip  <算法>  <分布>  <规模>  <原因>
+    fail  <算法>  <分布>  <规模>  <原因>
+
+每个学生先对同一组合的多次计时取 --stat（默认中位数），再跨学生汇总：人数、中位数、最快、
+最慢和最快的学生；“相对”为同一场景与规模下与最快实现的比值。出错或跳过的组合另行计数。
+"""
+from __future__ import annotations
+import argparse
+import csv
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .profile import pad
+
+FORMAT = "genkit-sortbench/1"
+DEFAULT_NAME = "bench.tsv"
+STATS = {"median": statistics.median, "min": min, "mean": statistics.fmean}
+
+Key = Tuple[str, str, int]      # (算法, 分布, 规模)
+
+
+class BenchResult(NamedTuple):
+    """一个学生的结果。"""
+    student: str
+    meta: Dict[str, str]
+    times: Dict[Key, List[int]]         # 纳秒
+    failed: Dict[Key, str]
+    skipped: Dict[Key, str]
+
+
+class BenchFormatError(ValueError):
+    pass
+
+
+def parse(lines: Iterable[str], student: str = "") -> BenchResult:
+    """解析一个 bench.tsv；student 为说明行中没有写明名字时使用的名字（通常是文件夹名）。"""
+    meta: Dict[str, str] = {}
+    times: Dict[Key, List[int]] = {}
+    failed: Dict[Key, str] = {}
+    skipped: Dict[Key, str] = {}
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        if line.startswith("#"):
+            name, _, value = line[1:].strip().partition("\t")
+            meta[name] = value
+            continue
+        cols = line.split("\t")
+        try:
+            kind, key = cols[0], (cols[1], cols[2], int(cols[3]))
+            if kind == "time":
+                times.setdefault(key, []).append(int(cols[5]))
+            elif kind in ("fail", "skip"):
+                (failed if kind == "fail" else skipped)[key] = cols[4] if len(cols) > 4 else ""
+            else:
+                raise ValueError(kind)
+        except (IndexError, ValueError):
+            raise BenchFormatError(f"第 {lineno} 行无法解析：{line!r}") from None
+    if meta.get("format", FORMAT) != FORMAT:
+        raise BenchFormatError(f"不支持的格式 {meta['format']!r}（应为 {FORMAT}）")
+    return BenchResult(meta.get("student") or student, meta, times, failed, skipped)
+
+
+def find_files(paths: Iterable[Path], name: str = DEFAULT_NAME) -> List[Path]:
+    """目录下找 */<name>（以及目录自己的 <name>），文件原样保留。"""
+    found: List[Path] = []
+    for p in paths:
+        if p.is_dir():
+            found.extend(f for f in [p / name, *sorted(p.glob(f"*/{name}"))] if f.is_file())
+        else:
+            found.append(p)
+    return found
+
+
+def load(files: Iterable[Path]) -> List[BenchResult]:
+    results = []
+    for f in files:
+        with open(f, encoding="utf-8") as fp:
+            try:
+                results.append(parse(fp, f.parent.name))
+            except BenchFormatError as e:
+                raise BenchFormatError(f"{f}：{e}") from None
+    return results
+
+
+class Row(NamedTuple):
+    algorithm: str
+    distribution: str
+    size: int
+    students: int
+    median_ms: Optional[float]
+    fastest_ms: Optional[float]
+    slowest_ms: Optional[float]
+    fastest_student: str
+    relative: Optional[float]       # 与同一分布、规模下最快算法的比值
+    failed: int
+    skipped: int
+
+
+def aggregate(results: List[BenchResult], stat: str = "median") -> List[Row]:
+    """跨学生汇总，按规模、分布（首次出现的顺序）、算法排序。"""
+    reduce = STATS[stat]
+    per_key: Dict[Key, List[Tuple[float, str]]] = {}
+    failed: Dict[Key, int] = {}
+    skipped: Dict[Key, int] = {}
+    dist_order: Dict[str, int] = {}
+    alg_order: Dict[str, int] = {}
+    for r in results:
+        for key, ns in r.times.items():
+            per_key.setdefault(key, []).append((reduce(ns) / 1e6, r.student))
+        for bucket, counts in ((r.failed, failed), (r.skipped, skipped)):
+            for key in bucket:
+                counts[key] = counts.get(key, 0) + 1
+        for alg, dist, _ in [*r.times, *r.failed, *r.skipped]:
+            dist_order.setdefault(dist, len(dist_order))
+            alg_order.setdefault(alg, len(alg_order))
+
+    best: Dict[Tuple[str, int], float] = {}
+    medians: Dict[Key, float] = {}
+    for key, values in per_key.items():
+        medians[key] = statistics.median(v for v, _ in values)
+        group = key[1:]
+        best[group] = min(best.get(group, medians[key]), medians[key])
+
+    keys = sorted({*per_key, *failed, *skipped}, key=lambda k: (k[2], dist_order[k[1]], alg_order[k[0]]))
+    rows = []
+    for key in keys:
+        values = per_key.get(key, [])
+        fast = min(values) if values else None
+        med = medians.get(key)
+        rows.append(Row(
+            key[0], key[1], key[2], len(values), med,
+            fast[0] if fast else None, max(v for v, _ in values) if values else None,
+            fast[1] if fast else "",
+            med / best[key[1:]] if med is not None and best[key[1:]] else None,
+            failed.get(key, 0), skipped.get(key, 0),
+        ))
+    return rows
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def format_table(rows: List[Row]) -> str:
+    head = (pad("实现", 22, left=True) + pad("场景", 12, left=True) + pad("规模", 10) + pad("人数", 6)
+            + pad("中位(ms)", 12) + pad("最快(ms)", 12) + pad("最慢(ms)", 12) + pad("相对", 8)
+            + pad("出错", 6) + pad("跳过", 6) + "  最快的学生")
+    lines = [head]
+    for r in rows:
+        rel = "-" if r.relative is None else f"{r.relative:.2f}x"
+        lines.append(f"{r.algorithm:<22}{r.distribution:<12}{r.size:>10}{r.students:>6}"
+                     f"{_ms(r.median_ms):>12}{_ms(r.fastest_ms):>12}{_ms(r.slowest_ms):>12}{rel:>8}"
+                     f"{r.failed:>6}{r.skipped:>6}  {r.fastest_student}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="汇总各文件夹中排序计时程序的结果")
+    parser.add_argument("paths", nargs="*", type=Path, default=[Path(".")],
+                        help=f"结果文件，或包含 */{DEFAULT_NAME} 的目录（默认当前目录）")
+    parser.add_argument("--name", default=DEFAULT_NAME, help=f"目录中结果文件的名字（默认 {DEFAULT_NAME}）")
+    parser.add_argument("--stat", choices=tuple(STATS), default="median",
+                        help="每个学生多次计时的取值方式（默认 median）")
+    parser.add_argument("--csv", type=Path, metavar="PATH", help="另把汇总表写成 CSV")
+    parser.add_argument("--json", type=Path, metavar="PATH", help="另把汇总表写成 JSON")
+    args = parser.parse_args(argv)
+
+    files = find_files(args.paths, args.name)
+    if not files:
+        parser.error(f"没有找到结果文件（先在各文件夹运行 java -cp bin Bench > {args.name}）")
+    try:
+        results = load(files)
+    except (OSError, BenchFormatError) as e:
+        sys.exit(str(e))
+    rows = aggregate(results, args.stat)
+    print(f"{len(results)} 个学生，每人取 {args.stat}")
+    print(format_table(rows))
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Row._fields)
+            writer.writerows(rows)
+    if args.json:
+        doc = {"stat": args.stat, "students": [r.student for r in results], "rows": [r._asdict() for r in rows]}
+        args.json.write_text(json.dumps(doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
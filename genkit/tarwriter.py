@@ -0,0 +1,50 @@
+"""
+最小化的 tar 写入器：只顺序追加，输出与 tarfile 的 PAX 格式逐字节相同。
+
+与 tarfile.TarFile 相比：成员数据可以是 filecopy.FileRef（写到 output._HashingFile 时由内核
+直接复制），也不在内存中保留已写成员的列表，成员再多内存也不增长。目标只需要 write()，
+可以是管道或 gzip.GzipFile。
+"""
+from __future__ import annotations
+import tarfile
+from typing import BinaryIO, Optional, Union
+
+from .filecopy import FileRef, data_size, write_ref
+
+BLOCKSIZE = tarfile.BLOCKSIZE
+RECORDSIZE = tarfile.RECORDSIZE
+NUL = tarfile.NUL
+
+
+class TarAssembler:
+    def __init__(self, fp: BinaryIO, encoding: str = tarfile.ENCODING) -> None:
+        self._fp = fp
+        self._encoding = encoding
+        self._offset = 0
+
+    def add(self, info: tarfile.TarInfo, data: Optional[Union[bytes, FileRef]] = None) -> None:
+        """写入一个成员；info.size 由 data 决定，链接等没有数据的成员 data 为 None。"""
+        if data is not None:
+            info.size = data_size(data)
+        buf = info.tobuf(tarfile.PAX_FORMAT, self._encoding, "surrogateescape")
+        self._fp.write(buf)
+        self._offset += len(buf)
+        if data is None:
+            return
+        if isinstance(data, FileRef):
+            write_ref(self._fp, data)
+        else:
+            self._fp.write(data)
+        blocks, remainder = divmod(info.size, BLOCKSIZE)
+        if remainder:
+            self._fp.write(NUL * (BLOCKSIZE - remainder))
+            blocks += 1
+        self._offset += blocks * BLOCKSIZE
+
+    def close(self) -> None:
+        """写出两个全零的结束块，并补齐到 RECORDSIZE 的整数倍。"""
+        self._fp.write(NUL * (BLOCKSIZE * 2))
+        self._offset += BLOCKSIZE * 2
+        remainder = self._offset % RECORDSIZE
+        if remainder:
+            self._fp.write(NUL * (RECORDSIZE - remainder))
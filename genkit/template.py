@@ -0,0 +1,80 @@
+"""
+预编译模板。
+
+模板文本只在创建 Template 时解析一次：拆成“字面量 / 占位符”片段，需要的 dedent 也在此时完成。
+render() 只把占位符的值填进预先排好的片段列表，再做一次 "".join，不再每次重建大段 f-string、
+也不再对整段文本做 dedent 或多次 str.replace。
+
+两种占位符语法：
+- 默认与 str.format 相同：{name} 为占位符，{{ 和 }} 表示字面花括号；
+- raw=True 时只识别 names 中列出的 {NAME}，其余花括号一律原样保留（用于 Java 等本身含花括号的模板）。
+
+html 中列出的占位符在填入时做 HTML 转义，其余原样填入。
+
+track(used) 之后每次 render 都把模板的 id 记入 used，--watch 据此建立模板到学生的依赖关系。
+"""
+from __future__ import annotations
+import re
+import string
+import textwrap
+from html import escape
+from typing import Iterable, List, Optional, Set, Tuple
+
+_used: Optional[Set[int]] = None
+
+
+def track(used: Optional[Set[int]]) -> None:
+    """开始（used 为集合）或停止（None）记录被渲染的模板。只在当前进程中有效。"""
+    global _used
+    _used = used
+
+
+class Template:
+    def __init__(self, source: str, *, dedent: bool = False, raw: bool = False,
+                 names: Iterable[str] = (), html: Iterable[str] = ()) -> None:
+        self.source = source
+        text = textwrap.dedent(source) if dedent else source
+        html = frozenset(html)
+        parts: List[str] = []
+        slots: List[Tuple[int, str, bool]] = []
+        for literal, field in (_split_raw(text, names) if raw else _split_format(text)):
+            if literal:
+                parts.append(literal)
+            if field is not None:
+                slots.append((len(parts), field, field in html))
+                parts.append("")
+        self._parts = parts
+        self._slots = slots
+        self.placeholders = tuple(dict.fromkeys(field for _, field, _ in slots))
+
+    def render(self, **values) -> str:
+        if _used is not None:
+            _used.add(id(self))
+        parts = self._parts.copy()
+        for pos, field, html in self._slots:
+            value = str(values[field])
+            parts[pos] = escape(value) if html else value
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"Template(placeholders={self.placeholders!r})"
+
+
+def _split_format(text: str) -> Iterable[Tuple[str, Optional[str]]]:
+    for literal, field, spec, conversion in string.Formatter().parse(text):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            raise ValueError(f"模板占位符只支持简单名字：{{{field}}}")
+        yield literal, field
+
+
+def _split_raw(text: str, names: Iterable[str]) -> Iterable[Tuple[str, Optional[str]]]:
+    names = list(names)
+    if not names:
+        yield text, None
+        return
+    pattern = re.compile(r"\{(" + "|".join(re.escape(n) for n in names) + r")\}")
+    pos = 0
+    for m in pattern.finditer(text):
+        yield text[pos:m.start()], m.group(1)
+        pos = m.end()
+    yield text[pos:], None
@@ -0,0 +1,404 @@
+"""
+编译并运行生成的 Java 项目，把输出与期望输出比较。
+
+    python3 -m genkit.verify sorts                          # 当前目录下的各学生文件夹
+    python3 -m genkit.verify collections --source java_collections_42.zip -j 8
+    python3 -m genkit.verify sorts --javac "python3 stub.py javac" --java "python3 stub.py java"
+
+检查哪些学生、运行哪些主类、期望什么输出，都由产物的 Family.checks 根据渲染结果给出，
+所以名单参数和产物自己的参数（如 --algorithms、--perf）须与生成时相同：
+- 能由生成参数直接算出的直接比较：排序示例是 Random(42) 的 12 个数和排序结果，集合示例按模板编号和
+  种子模拟 Java 的行为（HashMap 的遍历顺序、Collections.shuffle 等，见下面的 java_* 函数）；
+- 给不出期望的检查按键查 golden/<产物>/<键>.txt，其中学生名写作 {STUDENT}；
+  同一个键的学生除名字外输出应完全相同。没有黄金输出也算失败，--update-golden 记录下来。
+
+每个学生在线程池中独立编译（javac -d 临时目录）和运行，每一步都有超时。--javac/--java 可以换成
+任意命令前缀，没有 JDK 的环境里可以用桩程序代替。
+"""
+from __future__ import annotations
+import argparse
+import difflib
+import shlex
+import subprocess
+import sys
+import tarfile
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from . import engine
+from .parallel import resolve_jobs
+from .roster import RosterError, add_roster_arguments, load_roster
+from .shards import load_index, shard_of
+
+DEFAULT_JAVAC = "javac -encoding UTF-8"
+DEFAULT_JAVA = "java -Dfile.encoding=UTF-8 -Dstdout.encoding=UTF-8"
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_GOLDEN = Path("golden")
+PLACEHOLDER = "{STUDENT}"
+
+STATUS = {
+    "ok": "通过",
+    "recorded": "已记录黄金输出",
+    "nogolden": "没有黄金输出",
+    "mismatch": "输出不符",
+    "runtime": "运行出错",
+    "compile": "编译失败",
+    "timeout": "超时",
+    "missing": "缺少源文件",
+}
+FAILURES = ("nogolden", "mismatch", "runtime", "compile", "timeout", "missing")
+
+
+class RunCheck(NamedTuple):
+    """运行一个主类并检查输出。expected 为 None 时按 key 查黄金输出。"""
+    main: str
+    key: str
+    expected: Optional[str] = None
+    stdin: str = "\n"       # 交互式程序读到空行即结束
+
+
+class Outcome(NamedTuple):
+    student: str
+    main: str
+    status: str
+    detail: str = ""
+    output: str = ""
+
+
+class Commands(NamedTuple):
+    javac: List[str]
+    java: List[str]
+    timeout: float
+
+
+class JavaRandom:
+    """与 java.util.Random 相同的线性同余序列（nextInt(bound) 的算法各版本 JDK 一致）。"""
+    _MASK = (1 << 48) - 1
+
+    def __init__(self, seed: int) -> None:
+        self._state = (seed ^ 0x5DEECE66D) & self._MASK
+
+    def _next31(self) -> int:
+        self._state = (self._state * 0x5DEECE66D + 0xB) & self._MASK
+        return self._state >> 17
+
+    def next_int(self, bound: int) -> int:
+        if bound & -bound == bound:
+            return (bound * self._next31()) >> 31
+        while True:
+            bits = self._next31()
+            value = bits % bound
+            if bits - value + bound - 1 < 1 << 31:     # Java 中 int 溢出为负时重取
+                return value
+
+
+def java_random_ints(seed: int, n: int, bound: int) -> List[int]:
+    """与 new java.util.Random(seed) 连续调用 n 次 nextInt(bound) 的结果相同。"""
+    rnd = JavaRandom(seed)
+    return [rnd.next_int(bound) for _ in range(n)]
+
+
+def java_shuffle(items: list, seed: int) -> list:
+    """Collections.shuffle(items, new Random(seed))，items 为 ArrayList/Arrays.asList 等随机访问列表。"""
+    out, rnd = list(items), JavaRandom(seed)
+    for i in range(len(out), 1, -1):
+        j = rnd.next_int(i)
+        out[i - 1], out[j] = out[j], out[i - 1]
+    return out
+
+
+def java_string_hash(s: str) -> int:
+    """String.hashCode()：按 UTF-16 代码单元计算，结果为有符号 32 位整数。"""
+    units = s.encode("utf-16-be")
+    h = 0
+    for k in range(0, len(units), 2):
+        h = (31 * h + (units[k] << 8 | units[k + 1])) & 0xFFFFFFFF
+    return h - (1 << 32) if h >= 1 << 31 else h
+
+
+def java_string_key(s: str):
+    """String.compareTo 的排序键（按 UTF-16 代码单元比较，与 Python 按码点比较在增补字符上不同）。"""
+    return s.encode("utf-16-be")
+
+
+def java_hash_order(keys) -> list:
+    """按插入顺序放进默认容量的 HashMap/HashSet 后的遍历顺序（去重）。
+
+    键为 str（用 String.hashCode）或 int（Integer.hashCode 即本身）。桶内按插入顺序排列，
+    扩容时拆分的两条链也保持相对顺序；不模拟一个桶超过 8 个键时的树化。
+    """
+    unique = list(dict.fromkeys(keys))
+    size = 16
+    while len(unique) > size * 3 // 4:
+        size *= 2
+
+    def bucket(key) -> int:
+        h = (java_string_hash(key) if isinstance(key, str) else key) & 0xFFFFFFFF
+        return (h ^ (h >> 16)) & (size - 1)
+
+    return sorted(unique, key=bucket)       # sorted 稳定，桶内保持插入顺序
+
+
+def java_array(values) -> str:
+    """Arrays.toString 以及各集合 toString() 的格式。"""
+    return "[" + ", ".join(map(str, values)) + "]"
+
+
+def java_map(pairs) -> str:
+    """AbstractMap.toString 的格式，pairs 为遍历顺序的 (键, 值)。"""
+    return "{" + ", ".join(f"{k}={v}" for k, v in pairs) + "}"
+
+
+def normalize(text: str) -> str:
+    """统一换行，去掉行尾空白。"""
+    return "".join(line.rstrip() + "\n" for line in text.splitlines())
+
+
+def _run(cmd: List[str], cwd: Path, timeout: float, stdin: str = "") -> Tuple[Optional[int], str, str]:
+    """返回 (退出码, stdout, stderr)；超时时退出码为 None。"""
+    try:
+        proc = subprocess.run(cmd, cwd=cwd, input=stdin.encode("utf-8"), capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, "", ""
+    return (proc.returncode, proc.stdout.decode("utf-8", "replace"), proc.stderr.decode("utf-8", "replace"))
+
+
+def verify_student(name: str, folder: Optional[Path], files: Optional[List[Tuple[str, bytes]]],
+                   checks: List[RunCheck], cmds: Commands) -> List[Outcome]:
+    """编译一个学生的 src/*.java 并逐个运行 checks；可在工作线程中调用。
+
+    folder 为磁盘上的学生文件夹；从压缩包验证时 folder 为 None，files 为 (文件名, 内容) 列表。
+    输出是否符合期望由调用方判断（需要按键共享黄金输出）。
+    """
+    with tempfile.TemporaryDirectory(prefix="genverify-") as tmp:
+        tmp = Path(tmp)
+        if files is None:
+            sources = sorted((folder.resolve() / "src").glob("*.java"))     # javac 在临时目录中运行
+        else:
+            (tmp / "src").mkdir()
+            sources = []
+            for base, data in files:
+                sources.append(tmp / "src" / base)
+                sources[-1].write_bytes(data)
+        if not sources:
+            return [Outcome(name, "", "missing", "没有找到 src/*.java")]
+        bin_dir = tmp / "bin"
+        bin_dir.mkdir()
+        code, out, err = _run(cmds.javac + ["-d", str(bin_dir), *map(str, sources)], tmp, cmds.timeout)
+        if code is None:
+            return [Outcome(name, "", "timeout", f"编译超过 {cmds.timeout:g}s")]
+        if code:
+            return [Outcome(name, "", "compile", (err or out).strip())]
+        results = []
+        for check in checks:
+            code, out, err = _run(cmds.java + ["-cp", str(bin_dir), check.main], tmp, cmds.timeout, check.stdin)
+            if code is None:
+                results.append(Outcome(name, check.main, "timeout", f"运行超过 {cmds.timeout:g}s"))
+            elif code:
+                results.append(Outcome(name, check.main, "runtime", f"退出码 {code}\n{err.strip()}", out))
+            else:
+                results.append(Outcome(name, check.main, "ran", "", normalize(out)))
+        return results
+
+
+class _ArchiveSources:
+    """按学生取出压缩包中的 <名字>/src/*.java；只在主线程中使用。"""
+
+    def __init__(self, path: Path) -> None:
+        self._index: Dict[str, List[str]] = {}
+        if zipfile.is_zipfile(path):
+            self._zip = zipfile.ZipFile(path)
+            self._tar = None
+            names = self._zip.namelist()
+        else:
+            self._zip = None
+            self._tar = tarfile.open(path)
+            names = [m.name for m in self._tar.getmembers() if m.isfile() or m.islnk()]
+        for member in names:
+            parts = member.split("/")
+            if len(parts) == 3 and parts[1] == "src" and parts[2].endswith(".java"):
+                self._index.setdefault(parts[0], []).append(member)
+
+    def files(self, name: str) -> List[Tuple[str, bytes]]:
+        out = []
+        for member in self._index.get(name, ()):
+            data = self._zip.read(member) if self._zip is not None else self._tar.extractfile(member).read()
+            out.append((member.rsplit("/", 1)[1], data))
+        return out
+
+    def close(self) -> None:
+        (self._zip or self._tar).close()
+
+
+class _ShardSources:
+    """分片压缩包（shards.py 的索引）：按学生所在的分片取源文件，同一时间只打开一个分片。"""
+
+    def __init__(self, index: Path, doc: dict) -> None:
+        self._dir = index.parent
+        self._doc = doc
+        self._name = ""
+        self._open: Optional[_ArchiveSources] = None
+
+    def files(self, name: str) -> List[Tuple[str, bytes]]:
+        shard = shard_of(self._doc, name)
+        if shard is None:
+            return []
+        if shard != self._name:
+            self.close()
+            self._open, self._name = _ArchiveSources(self._dir / shard), shard
+        return self._open.files(name)
+
+    def close(self) -> None:
+        if self._open is not None:
+            self._open.close()
+            self._open = None
+
+
+def _open_sources(source: Path):
+    """source 为文件时按压缩包或分片索引打开；目录返回 None。"""
+    if not source.is_file():
+        return None
+    doc = load_index(source) if source.name.endswith(".json") else None
+    return _ShardSources(source, doc) if doc is not None else _ArchiveSources(source)
+
+
+class _Judge:
+    """在主线程中把运行结果与期望输出比较，按需记录黄金输出。"""
+
+    def __init__(self, golden: Path, update: bool) -> None:
+        self.golden = golden
+        self.update = update
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def _golden(self, key: str) -> Optional[str]:
+        if key not in self._cache:
+            path = self.golden / f"{key}.txt"
+            self._cache[key] = path.read_text(encoding="utf-8") if path.is_file() else None
+        return self._cache[key]
+
+    def judge(self, outcome: Outcome, check: RunCheck) -> Outcome:
+        if outcome.status != "ran":
+            return outcome
+        name, actual = outcome.student, outcome.output
+        if check.expected is not None:
+            expected = normalize(check.expected)
+        else:
+            golden = self._golden(check.key)
+            if golden is None:
+                if not self.update:
+                    return outcome._replace(status="nogolden", detail=f"键 {check.key}")
+                golden = actual.replace(name, PLACEHOLDER)
+                self.golden.mkdir(parents=True, exist_ok=True)
+                (self.golden / f"{check.key}.txt").write_text(golden, encoding="utf-8")
+                self._cache[check.key] = golden
+                return outcome._replace(status="recorded", detail=f"键 {check.key}")
+            expected = golden.replace(PLACEHOLDER, name)
+        if actual == expected:
+            return outcome._replace(status="ok")
+        diff = difflib.unified_diff(expected.splitlines(), actual.splitlines(), "期望", "实际", lineterm="")
+        return outcome._replace(status="mismatch", detail="\n".join(diff))
+
+
+def verify(family: engine.Family, roster, source: Path, cmds: Commands, judge: _Judge,
+           jobs: int = 1) -> List[Outcome]:
+    """验证名单中的每个学生，按名单顺序返回全部结果。"""
+    archive = _open_sources(source)
+    total = roster.count() if family.needs_total else None
+    results: List[Outcome] = []
+    pending: deque = deque()
+
+    def collect() -> None:
+        future, checks = pending.popleft()
+        outcomes = future.result()
+        by_main = {c.main: c for c in checks}
+        results.extend(judge.judge(o, by_main[o.main]) if o.main in by_main else o for o in outcomes)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            for i, (name, assets) in enumerate(roster.records()):
+                checks = family.checks(engine.render_family(family, i, name, total, assets))
+                if archive is not None:
+                    task = pool.submit(verify_student, name, None, archive.files(name), checks, cmds)
+                else:
+                    task = pool.submit(verify_student, name, source / name, None, checks, cmds)
+                pending.append((task, checks))
+                if len(pending) >= jobs * 4:
+                    collect()
+            while pending:
+                collect()
+    finally:
+        if archive is not None:
+            archive.close()
+    return results
+
+
+def report(results: List[Outcome], max_diff: int = 20) -> bool:
+    """打印失败详情和各状态的计数，返回是否全部通过。"""
+    for o in results:
+        if o.status in FAILURES:
+            where = f"{o.student} {o.main}".strip()
+            print(f"[{STATUS[o.status]}] {where}")
+            lines = o.detail.splitlines()
+            for line in lines[:max_diff]:
+                print("    " + line)
+            if len(lines) > max_diff:
+                print(f"    ……另有 {len(lines) - max_diff} 行")
+    counts: Dict[str, int] = {}
+    for o in results:
+        counts[o.status] = counts.get(o.status, 0) + 1
+    print("，".join(f"{STATUS[s]} {counts[s]}" for s in STATUS if s in counts) or "没有要验证的学生")
+    if counts.get("nogolden"):
+        print("没有黄金输出的键可以用 --update-golden 记录（请先人工确认输出正确）")
+    return not any(counts.get(s) for s in FAILURES)
+
+
+def main(argv=None) -> None:
+    engine.load_plugins()
+    checkable = [f for f in engine.families() if f.checks is not None]
+    parser = argparse.ArgumentParser(description="并行编译、运行生成的 Java 项目，并与黄金输出比较")
+    parser.add_argument("family", choices=[f.name for f in checkable], help="要验证的产物")
+    parser.add_argument("--source", type=Path, default=Path("."),
+                        help="学生文件夹所在的目录、生成的 zip/tar 压缩包或分片索引 *.shards.json（默认当前目录）")
+    add_roster_arguments(parser)
+    parser.add_argument("--jobs", "-j", type=int, default=0, metavar="N",
+                        help="同时验证的学生数（默认 0，即 CPU 数）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, metavar="SEC",
+                        help=f"每次编译或运行的超时秒数（默认 {DEFAULT_TIMEOUT:g}）")
+    parser.add_argument("--javac", default=DEFAULT_JAVAC, metavar="CMD",
+                        help=f"编译命令前缀，其后追加 -d <目录> 和源文件（默认 {DEFAULT_JAVAC!r}）")
+    parser.add_argument("--java", default=DEFAULT_JAVA, metavar="CMD",
+                        help=f"运行命令前缀，其后追加 -cp <目录> <主类>（默认 {DEFAULT_JAVA!r}）")
+    parser.add_argument("--golden", type=Path, default=DEFAULT_GOLDEN, metavar="DIR",
+                        help="黄金输出目录，按产物分子目录（默认 golden）")
+    parser.add_argument("--update-golden", action="store_true", help="把还没有黄金输出的键的实际输出记录下来")
+    parser.add_argument("--max-diff", type=int, default=20, metavar="N", help="每个失败最多显示的行数（默认 20）")
+    for f in checkable:
+        if f.add_arguments is not None:
+            f.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    family = engine.families([args.family])[0]
+    family = family.configure(args) if family.configure is not None else family
+    if args.roster == "-":
+        parser.error("验证需要能重复读取的名单，不能使用标准输入")
+    if not args.source.exists():
+        parser.error(f"找不到 {args.source}（先运行对应的生成脚本）")
+    cmds = Commands(shlex.split(args.javac), shlex.split(args.java), args.timeout)
+    judge = _Judge(args.golden / family.name, args.update_golden)
+    try:
+        results = verify(family, load_roster(args.roster, args.roster_format), args.source, cmds, judge,
+                         resolve_jobs(args.jobs))
+    except RosterError as e:
+        parser.error(str(e))
+    except OSError as e:
+        sys.exit(f"无法执行编译/运行命令：{e}")
+    if not report(results, args.max_diff):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+--watch：监视生成脚本与名单，变化后只重新渲染受影响的学生并修补压缩包。
+
+依赖关系在渲染时记录（template.track）：每个学生用到了哪些 Template 对象，连同其
+在模块中的位置（全局变量名，列表中的再加下标，如 TEMPLATES[3]）一起保存在内存里。
+生成脚本保存后：
+- 重新加载该模块，逐个比较模板的版本摘要，找出改动过的模板；
+- 只重新渲染用到这些模板的学生（例如集合示例中 stable_index 落在该模板上的学生）；
+- 其余学生用 OutputWriter.keep() 沿用：磁盘文件不动，压缩包成员原样复制旧的压缩数据。
+
+模板以外的代码（渲染函数、常量等）有改动时无法判断影响范围，该产物全部重新渲染，
+写出时仍按内容摘要跳过没变的文件。名单变化时，新增、位置改变（或总人数改变且产物
+需要总人数）的学生重新渲染，已删除学生的文件在收尾时清除。名单中素材文件的路径、大小或
+修改时间变化时，对应学生也会重新渲染（在名单或生成脚本的下一次保存时检查）。
+
+监视期间总是按 --incremental 写出，渲染在主进程中逐个进行（依赖记录只在本进程有效）。
+genkit 包本身的改动需要重新启动。tar 格式的成员无法复用，每次都是全部重新渲染。
+"""
+from __future__ import annotations
+import argparse
+import ast
+import hashlib
+import importlib
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set
+
+from . import engine, javacheck, template
+from .compression import CompressionPolicy
+from .manifest import template_version
+from .output import OutputWriter, StudentOutput, archive_target
+from .parallel import resolve_jobs
+from .roster import NO_ASSETS, Roster, RosterError, StudentAssets, load_roster
+
+def family_module(family: engine.Family) -> ModuleType:
+    """产物所在的模块；作为脚本运行（__main__）的按文件名重新导入，以便之后 reload。"""
+    fn = family.render
+    while hasattr(fn, "func"):          # functools.partial
+        fn = fn.func
+    module = sys.modules[fn.__module__]
+    if module.__name__ == "__main__":
+        module = importlib.import_module(Path(module.__file__).stem)
+    return module
+
+
+def template_keys(module: ModuleType) -> Dict[str, template.Template]:
+    """模块中的全部 Template：全局变量名 -> 模板，列表/元组中的记为 NAME[i]。"""
+    found: Dict[str, template.Template] = {}
+    for name, value in vars(module).items():
+        if isinstance(value, template.Template):
+            found[name] = value
+        elif isinstance(value, (list, tuple)):
+            for k, item in enumerate(value):
+                if isinstance(item, template.Template):
+                    found[f"{name}[{k}]"] = item
+    return found
+
+
+def code_fingerprint(path: Path) -> str:
+    """去掉 Template(...) 的模板文本之后的源码摘要；只有模板文本改动时保持不变。"""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and node.args and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)
+                and getattr(node.func, "id", getattr(node.func, "attr", None)) == "Template"):
+            node.args[0].value = ""
+    return hashlib.sha256(ast.dump(tree).encode("utf-8")).hexdigest()
+
+
+class _Rendered(NamedTuple):
+    index: int
+    deps: FrozenSet[str]        # 用到的模板键
+    rels: List[str]             # 输出的相对路径
+    assets: tuple = ()          # 素材文件的 (路径, 大小, 修改时间)
+
+
+def asset_stamp(family: engine.Family, assets: StudentAssets) -> tuple:
+    if not family.assets or assets == NO_ASSETS:
+        return ()
+    paths = ([assets.photo] if assets.photo else []) + list(assets.files)
+    stamps = []
+    for p in paths:
+        try:
+            st = Path(p).stat()
+            stamps.append((p, st.st_size, st.st_mtime_ns))
+        except OSError:
+            stamps.append((p, None, None))
+    return tuple(stamps)
+
+
+class _FamilyState:
+    """一个产物的当前模块、模板版本和每个学生的依赖记录。"""
+
+    def __init__(self, name: str, args: argparse.Namespace, module: ModuleType) -> None:
+        self.name = name
+        self.args = args
+        self.module = module
+        self.path = Path(module.__file__)
+        self.students: Dict[str, _Rendered] = {}
+        self.total: Optional[int] = None
+        self._load()
+
+    def _load(self) -> None:
+        fam = engine.families([self.name])[0]
+        self.family = fam.configure(self.args) if fam.configure is not None else fam
+        self.templates = template_keys(self.module)
+        self.ids = {id(t): key for key, t in self.templates.items()}
+        self.versions = {key: template_version(t) for key, t in self.templates.items()}
+        self.code = code_fingerprint(self.path)
+
+    def reload(self) -> Optional[Set[str]]:
+        """重新加载模块，返回改动过的模板键；None 表示需要全部重新渲染。"""
+        old_versions, old_code = self.versions, self.code
+        self.module = importlib.reload(self.module)
+        self._load()
+        if self.code != old_code or self.versions.keys() != old_versions.keys():
+            return None
+        return {key for key, v in self.versions.items() if old_versions[key] != v}
+
+    def render(self, i: int, name: str, total: Optional[int], opts: engine.RenderOptions,
+               assets: StudentAssets = NO_ASSETS) -> StudentOutput:
+        used: Set[int] = set()
+        template.track(used)
+        try:
+            out = engine.render_family(self.family, i, name, total, assets)
+        finally:
+            template.track(None)
+        out = engine.postprocess(out, opts)
+        deps = frozenset(self.ids[t] for t in used if t in self.ids)
+        self.students[name] = _Rendered(i, deps, [rel for rel, _ in out.files],
+                                        asset_stamp(self.family, assets))
+        return out
+
+
+def rebuild(states: Sequence[_FamilyState], changed: Dict[str, Optional[Set[str]]], roster: Roster,
+            base: Path, args: argparse.Namespace, policy: Optional[CompressionPolicy]) -> None:
+    """按 changed（产物名 -> 改动的模板键，None 为全部）重新生成，打印每个产物的渲染/沿用人数。"""
+    opts = engine.RenderOptions(validate=args.validate, production=args.production)
+    threads = resolve_jobs(args.compress_threads)
+    # 名单逐行流式读取；只有产物需要总人数时才先数一遍（与 engine.run 相同）
+    total = roster.count() if any(st.family.needs_total for st in states) else None
+    start = time.perf_counter()
+
+    def folder_root(st: _FamilyState) -> Path:
+        return base / st.name if len(states) > 1 else base
+
+    with ThreadPoolExecutor(max_workers=threads) if threads > 1 else nullcontext() as pool:
+        writers = [
+            OutputWriter(folder_root(st), archive_target(base, st.family.output_zip, args),
+                         zip_only=args.zip_only, dedup=args.dedup, incremental=True,
+                         template=template_version(*st.family.templates), pool=pool, window=threads * 4,
+                         policy=policy, reproducible=args.reproducible, label=st.name, fmt=args.format,
+                         checksums=args.checksums)
+            for st in states
+        ]
+        collectors = [st.family.collector() if st.family.collector is not None else None for st in states]
+        counts = [[0, 0] for _ in states]       # [重新渲染, 沿用]
+        previous = [(st.students, st.total) for st in states]
+        try:
+            for st, writer in zip(states, writers):
+                st.students, st.total = {}, total
+                if st.family.shared_files:
+                    shared = StudentOutput("", {}, list(st.family.shared_files))
+                    writer.add(engine.postprocess(shared, opts), count=False)
+            for i, (name, assets) in enumerate(roster.records()):
+                for k, (st, writer, collector) in enumerate(zip(states, writers, collectors)):
+                    dirty = changed.get(st.name, set())
+                    old_students, old_total = previous[k]
+                    prev = old_students.get(name)
+                    if (dirty is None or prev is None or prev.index != i or dirty & prev.deps
+                            or (st.family.needs_total and old_total != total)
+                            or prev.assets != asset_stamp(st.family, assets)
+                            or not writer.can_keep(name, prev.rels)):
+                        student = st.render(i, name, total if st.family.needs_total else None, opts, assets)
+                        writer.add(student)
+                        counts[k][0] += 1
+                    else:
+                        student = StudentOutput(name, writer.keep(name, prev.rels), [])
+                        st.students[name] = prev
+                        counts[k][1] += 1
+                    if collector is not None:
+                        collector.add(student)
+            for writer, collector in zip(writers, collectors):
+                if collector is not None:
+                    writer.add(engine.postprocess(StudentOutput("", {}, collector.files()), opts), count=False)
+        except BaseException:
+            for writer in writers:
+                writer.abort()
+            for st, (students, old_total) in zip(states, previous):
+                st.students, st.total = students, old_total
+            raise
+        for writer in writers:
+            writer.close()
+    secs = time.perf_counter() - start
+    stamp = time.strftime("%H:%M:%S")
+    for st, writer, (rendered, kept) in zip(states, writers, counts):
+        print(f"[{stamp}] {st.name}：重新渲染 {rendered} 人，沿用 {kept} 人 -> {writer.archive}")
+    print(f"[{stamp}] 用时 {secs:.2f}s，继续监视（Ctrl+C 结束）")
+
+
+def _mtimes(paths: Sequence[Path]) -> Dict[Path, Optional[int]]:
+    stamps: Dict[Path, Optional[int]] = {}
+    for p in paths:
+        try:
+            stamps[p] = p.stat().st_mtime_ns
+        except OSError:
+            stamps[p] = None
+    return stamps
+
+
+def _try_rebuild(states, changed, args, base, policy) -> bool:
+    """出错时打印原因并保留原有压缩包，返回是否成功；监视继续进行。"""
+    try:
+        roster = load_roster(args.roster, args.roster_format)
+        rebuild(states, changed, roster, base, args, policy)
+    except RosterError as e:
+        print(f"名单有误：{e}", file=sys.stderr)
+    except javacheck.JavaCheckError as e:
+        print(e, file=sys.stderr)
+        print(f"Java 源码检查未通过（{len(e.problems)} 处），已有的压缩包保持不变", file=sys.stderr)
+    except Exception:
+        traceback.print_exc()
+    else:
+        return True
+    return False
+
+
+def watch(fams: Sequence[engine.Family], args: argparse.Namespace, base: Path,
+          policy: Optional[CompressionPolicy] = None) -> None:
+    """先完整生成一次，然后轮询生成脚本与名单文件，有变化就增量重新生成，直到 Ctrl+C。"""
+    states = [_FamilyState(f.name, args, family_module(f)) for f in fams]
+    watched = list(dict.fromkeys(st.path for st in states))
+    if args.roster not in (None, "-"):
+        watched.append(Path(args.roster))
+    stamps = _mtimes(watched)
+    print("监视：" + "，".join(str(p) for p in watched))
+    ok = _try_rebuild(states, {st.name: None for st in states}, args, base, policy)
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+            now = _mtimes(watched)
+            touched = {p for p in watched if now[p] != stamps[p]}
+            if not touched:
+                continue
+            stamps = now
+            changed: Dict[str, Optional[Set[str]]] = {}
+            try:
+                for st in states:
+                    if st.path in touched:
+                        keys = st.reload()
+                        changed[st.name] = keys if ok else None
+                    elif not ok:
+                        changed[st.name] = None
+            except Exception:
+                traceback.print_exc()       # 语法错误等：等下一次保存
+                ok = False
+                continue
+            for st in states:
+                if st.path in touched:
+                    keys = changed[st.name]
+                    what = "非模板代码有改动，全部重新渲染" if keys is None else \
+                        ("改动的模板：" + "，".join(sorted(keys)) if keys else "模板没有改动")
+                    print(f"{st.path.name}：{what}")
+            ok = _try_rebuild(states, changed, args, base, policy)
+    except KeyboardInterrupt:
+        pass
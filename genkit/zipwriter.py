@@ -0,0 +1,146 @@
+"""
+最小化的 zip 写入器：成员以“已压缩好的字节”写入。
+
+标准库 zipfile 只能边写边压缩，无法直接写入已经压缩好的数据。这里自行写出本地文件头、
+中央目录和结束记录（成员数或偏移超限时自动使用 zip64），从而可以：
+- 原样复制旧压缩包中未变化成员的压缩数据，无需解压再压缩；
+- 在别处（例如线程池中）先压缩好成员，再按固定顺序组装；
+- 直接存储的素材文件以 filecopy.FileRef 作为成员数据，写入时由内核复制（见 filecopy.py）。
+
+生成的文件可被 zipfile / unzip 正常读取。
+"""
+from __future__ import annotations
+import struct
+import zipfile
+import zlib
+from typing import BinaryIO, List, NamedTuple, Tuple, Union
+
+from .filecopy import FileRef, data_size, write_ref
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+
+# 新成员的默认属性：普通文件 rw-r--r--
+DEFAULT_EXTERNAL_ATTR = (0o100644 & 0xFFFF) << 16
+UNIX_SYSTEM = 3
+
+
+class RawMember(NamedTuple):
+    """一个已压缩好的 zip 成员。"""
+    name: str
+    method: int          # zipfile.ZIP_STORED 或 zipfile.ZIP_DEFLATED
+    crc: int
+    file_size: int
+    data: Union[bytes, FileRef]     # 压缩后的数据（ZIP_STORED 时即原文，可以是素材文件）
+    date_time: Tuple[int, int, int, int, int, int]
+    external_attr: int = DEFAULT_EXTERNAL_ATTR
+
+
+def compress_member(name: str, data: bytes, date_time, level: int = zlib.Z_DEFAULT_COMPRESSION,
+                    method: int = zipfile.ZIP_DEFLATED,
+                    external_attr: int = DEFAULT_EXTERNAL_ATTR) -> RawMember:
+    """压缩一份内容得到 RawMember。zlib 压缩期间会释放 GIL，可以放进线程池并发执行。"""
+    crc = zlib.crc32(data)
+    if method == zipfile.ZIP_DEFLATED:
+        co = zlib.compressobj(level, zlib.DEFLATED, -15)
+        payload = co.compress(data) + co.flush()
+    else:
+        payload = data
+    return RawMember(name, method, crc, len(data), payload, tuple(date_time), external_attr)
+
+
+def read_raw_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> RawMember:
+    """从已打开的 zip 中原样取出一个成员的压缩数据（不解压）。"""
+    fp = zf.fp
+    fp.seek(info.header_offset)
+    header = fp.read(30)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + 30 + name_len + extra_len)
+    data = fp.read(info.compress_size)
+    return RawMember(info.filename, info.compress_type, info.CRC, info.file_size, data,
+                     info.date_time, info.external_attr)
+
+
+def _dos_datetime(dt) -> Tuple[int, int]:
+    dosdate = (dt[0] - 1980) << 9 | dt[1] << 5 | dt[2]
+    dostime = dt[3] << 11 | dt[4] << 5 | (dt[5] // 2)
+    return dostime, dosdate
+
+
+def _encode_name(name: str) -> Tuple[bytes, int]:
+    try:
+        return name.encode("ascii"), 0
+    except UnicodeEncodeError:
+        return name.encode("utf-8"), 0x800
+
+
+class ZipAssembler:
+    """把 RawMember 依次写入文件对象，close() 时写出中央目录。
+
+    中央目录记录在 add() 时就打包成字节暂存，每个成员只占几十字节，不持有成员内容。
+    """
+
+    def __init__(self, fp: BinaryIO) -> None:
+        self._fp = fp
+        self._offset = 0
+        self._central = bytearray()
+        self._count = 0
+
+    def _write(self, b: bytes) -> None:
+        self._fp.write(b)
+        self._offset += len(b)
+
+    def add(self, m: RawMember) -> None:
+        name, flags = _encode_name(m.name)
+        dostime, dosdate = _dos_datetime(m.date_time)
+        csize, usize = data_size(m.data), m.file_size
+        offset = self._offset
+
+        extra = b""
+        version = 20
+        if csize > ZIP64_LIMIT or usize > ZIP64_LIMIT:
+            extra = struct.pack("<HHQQ", 1, 16, usize, csize)
+            version = 45
+        self._write(struct.pack("<4sHHHHHLLLHH", b"PK\x03\x04", version, flags, m.method,
+                                dostime, dosdate, m.crc, min(csize, 0xFFFFFFFF),
+                                min(usize, 0xFFFFFFFF), len(name), len(extra)))
+        self._write(name)
+        self._write(extra)
+        if isinstance(m.data, FileRef):
+            write_ref(self._fp, m.data)
+            self._offset += csize
+        else:
+            self._write(m.data)
+
+        zip64: List[int] = []
+        if csize > ZIP64_LIMIT or usize > ZIP64_LIMIT:
+            zip64 += [usize, csize]
+            csize = usize = 0xFFFFFFFF
+        if offset > ZIP64_LIMIT:
+            zip64.append(offset)
+            offset = 0xFFFFFFFF
+        extra = struct.pack("<HH" + "Q" * len(zip64), 1, 8 * len(zip64), *zip64) if zip64 else b""
+        version = 45 if zip64 else 20
+        self._central += struct.pack("<4s4B4HL2L5H2L", b"PK\x01\x02", version, UNIX_SYSTEM,
+                                     version, 0, flags, m.method, dostime, dosdate, m.crc,
+                                     csize, usize, len(name), len(extra), 0, 0, 0,
+                                     m.external_attr, offset)
+        self._central += name
+        self._central += extra
+        self._count += 1
+
+    def close(self) -> None:
+        start = self._offset
+        self._write(bytes(self._central))
+        end = self._offset
+        count, size = self._count, end - start
+        if count > ZIP_FILECOUNT_LIMIT or start > ZIP64_LIMIT or size > ZIP64_LIMIT:
+            self._write(struct.pack("<4sQHHLLQQQQ", b"PK\x06\x06", 44, 45, 45, 0, 0,
+                                    count, count, size, start))
+            self._write(struct.pack("<4sLQL", b"PK\x06\x07", 0, end, 1))
+            count = min(count, 0xFFFF)
+            size = min(size, 0xFFFFFFFF)
+            start = min(start, 0xFFFFFFFF)
+        self._write(struct.pack("<4sHHHHLLH", b"PK\x05\x06", 0, 0, count, count, size, start, 0))
+        self._central = bytearray()
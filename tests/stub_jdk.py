@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+测试用的 javac/java 桩程序，让 genkit.verify 在没有 JDK 的环境里也能跑完整流程：
+
+    python3 -m genkit.verify sorts --javac "python3 tests/stub_jdk.py javac" --java "python3 tests/stub_jdk.py java"
+
+不解释 Java，只认源文件中的指令注释（每条一行）：
+    // stub: print 文本          运行时输出一行“文本”
+    // stub: exit N             输出完后以退出码 N 结束（标准错误写一行说明）
+    // stub: sleep 秒数          运行前先等待，用于测试超时
+    // stub: compile-error      javac 阶段报错
+javac 把源文件复制到 -d 目录；java -cp 目录 主类 读取其中的 <主类>.java 并执行上面的指令。
+"""
+import os
+import shutil
+import sys
+import time
+
+PREFIX = "// stub:"
+
+
+def directives(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith(PREFIX):
+                cmd, _, arg = line[len(PREFIX):].strip().partition(" ")
+                yield cmd, arg
+
+
+def javac(args):
+    out = args[args.index("-d") + 1]
+    sources = args[args.index("-d") + 2:]
+    for src in sources:
+        if any(cmd == "compile-error" for cmd, _ in directives(src)):
+            print(f"{src}:1: error: stub compile error", file=sys.stderr)
+            return 1
+    for src in sources:
+        shutil.copy(src, out)
+    return 0
+
+
+def java(args):
+    cp, main = args[args.index("-cp") + 1], args[-1]
+    sys.stdin.read()
+    code = 0
+    for cmd, arg in directives(os.path.join(cp, main + ".java")):
+        if cmd == "sleep":
+            time.sleep(float(arg))
+        elif cmd == "print":
+            print(arg)
+        elif cmd == "exit":
+            code = int(arg)
+    if code:
+        print(f"Exception in thread \"main\" stub exit {code}", file=sys.stderr)
+    return code
+
+
+if __name__ == "__main__":
+    mode, rest = sys.argv[1], sys.argv[2:]
+    sys.exit(javac(rest) if mode == "javac" else java(rest))
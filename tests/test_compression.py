@@ -0,0 +1,81 @@
+"""genkit.compression：--compression 的解析、按扩展名和大小选择压缩方式，以及压不动时退回存储。"""
+import os
+import tempfile
+import unittest
+import zipfile
+import zlib
+from pathlib import Path
+
+from genkit.compression import DEFAULT_LEVEL, CompressionPolicy, parse_policy
+from genkit.filecopy import file_ref
+
+DATE = (1980, 1, 1, 0, 0, 0)
+TEXT = b"public class Main {}\n" * 50
+
+
+class ParsePolicyTest(unittest.TestCase):
+    def test_default_and_extension_levels(self):
+        policy = parse_policy("9, java=1, .MD=0")
+        self.assertEqual(policy.level, 9)
+        self.assertEqual(policy.choose("a/Main.java", 1000), (zipfile.ZIP_DEFLATED, 1))
+        self.assertEqual(policy.choose("a/README.md", 1000), (zipfile.ZIP_STORED, 0))
+        self.assertEqual(policy.choose("a/index.html", 1000), (zipfile.ZIP_DEFLATED, 9))
+
+    def test_empty_spec(self):
+        policy = parse_policy(None)
+        self.assertEqual(policy.choose("a.txt", 1000), (zipfile.ZIP_DEFLATED, DEFAULT_LEVEL))
+
+    def test_invalid_levels(self):
+        for spec in ("x", ".java=ten", "10", ".md=-1"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_policy(spec)
+
+    def test_key_reflects_every_setting(self):
+        self.assertEqual(parse_policy("6").key(), CompressionPolicy().key())
+        keys = {parse_policy(None).key(), parse_policy("9").key(), parse_policy(".java=9").key(),
+                parse_policy(None, store_below=0).key(), parse_policy(".png=6").key()}
+        self.assertEqual(len(keys), 5)
+
+
+class ChooseTest(unittest.TestCase):
+    def test_precompressed_formats_are_stored(self):
+        policy = CompressionPolicy()
+        for name in ("a.png", "b.JPG", "c.tar.gz", "d.woff2"):
+            self.assertEqual(policy.choose(name, 10_000), (zipfile.ZIP_STORED, 0), name)
+        self.assertEqual(parse_policy(".png=6").choose("a.png", 10_000), (zipfile.ZIP_DEFLATED, 6))
+
+    def test_store_below(self):
+        policy = CompressionPolicy(store_below=100)
+        self.assertEqual(policy.choose("a.txt", 99), (zipfile.ZIP_STORED, 0))
+        self.assertEqual(policy.choose("a.txt", 100), (zipfile.ZIP_DEFLATED, DEFAULT_LEVEL))
+
+
+class CompressTest(unittest.TestCase):
+    def test_deflated_member(self):
+        member = CompressionPolicy().compress("Main.java", TEXT, DATE)
+        self.assertEqual(member.method, zipfile.ZIP_DEFLATED)
+        self.assertEqual(member.crc, zlib.crc32(TEXT))
+        self.assertEqual(zlib.decompress(member.data, -15), TEXT)
+
+    def test_incompressible_falls_back_to_stored(self):
+        noise = os.urandom(4096)
+        member = CompressionPolicy().compress("noise.bin", noise, DATE)
+        self.assertEqual(member.method, zipfile.ZIP_STORED)
+        self.assertEqual(member.data, noise)
+
+    def test_file_refs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            photo, notes = Path(tmp) / "photo.png", Path(tmp) / "notes.txt"
+            photo.write_bytes(b"\x89PNG" + os.urandom(1000))
+            notes.write_bytes(TEXT)
+            stored = CompressionPolicy().compress("photo.png", file_ref(photo), DATE)
+            self.assertEqual(stored.method, zipfile.ZIP_STORED)
+            self.assertEqual(stored.crc, zlib.crc32(photo.read_bytes()))
+            self.assertEqual(stored.file_size, photo.stat().st_size)
+            deflated = CompressionPolicy().compress("notes.txt", file_ref(notes), DATE)
+            self.assertEqual(deflated.method, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zlib.decompress(deflated.data, -15), TEXT)
+
+
+if __name__ == "__main__":
+    unittest.main()
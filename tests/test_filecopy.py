@@ -0,0 +1,123 @@
+"""genkit.filecopy：copy_file_range、sendfile、分块读写三种复制方式，以及素材在生成中被改动的检测。"""
+import contextlib
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+import zlib
+from pathlib import Path
+from unittest import mock
+
+from genkit import filecopy
+from genkit.filecopy import (SourceChangedError, copy_file, copy_to_fd, file_crc32, file_ref, file_sha256,
+                             read_chunks, read_file, write_ref)
+
+DATA = os.urandom(3 * filecopy.CHUNK + 123)
+
+
+def _refuse(*args):
+    raise OSError("不支持")
+
+
+def _patched(*names):
+    stack = contextlib.ExitStack()
+    for name in names:
+        stack.enter_context(mock.patch.object(os, name, _refuse, create=True))
+    return stack
+
+
+class CopyTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        self.src = self.base / "photo.png"
+        self.src.write_bytes(DATA)
+        self.ref = file_ref(self.src)
+
+    def _copy(self):
+        dest = self.base / "copy.png"
+        copy_file(self.ref, dest)
+        return dest.read_bytes()
+
+    def test_default_path(self):
+        self.assertEqual(self._copy(), DATA)
+
+    def test_sendfile_fallback(self):
+        with mock.patch.object(os, "copy_file_range", _refuse, create=True), \
+             mock.patch.object(os, "sendfile", wraps=os.sendfile) as sendfile:
+            self.assertEqual(self._copy(), DATA)
+        self.assertTrue(sendfile.called)
+
+    def test_read_write_fallback(self):
+        with _patched("copy_file_range", "sendfile"):
+            self.assertEqual(self._copy(), DATA)
+
+    def test_without_copy_file_range(self):
+        with mock.patch.object(os, "copy_file_range", None, create=True):
+            self.assertEqual(self._copy(), DATA)
+
+    def test_partial_copy_then_fallback(self):
+        # copy_file_range 复制了一部分后失败：其余部分从正确的偏移继续
+        calls = []
+
+        def once(in_fd, out_fd, count):
+            if calls:
+                raise OSError("不支持")
+            calls.append(count)
+            return os.write(out_fd, os.pread(in_fd, 1000, 0))
+
+        with mock.patch.object(os, "copy_file_range", once, create=True), \
+             mock.patch.object(os, "sendfile", _refuse):
+            self.assertEqual(self._copy(), DATA)
+
+    def test_copy_to_pipe(self):
+        r, w = os.pipe()
+        received = []
+
+        def read():
+            with os.fdopen(r, "rb") as f:
+                received.append(f.read())
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            copy_to_fd(self.ref, w)
+        finally:
+            os.close(w)
+            reader.join()
+        self.assertEqual(received, [DATA])
+
+    def test_source_shrunk_during_copy(self):
+        self.src.write_bytes(DATA[:100])
+        for refused in ((), ("copy_file_range",), ("copy_file_range", "sendfile")):
+            with self.subTest(refused=refused), _patched(*refused), self.assertRaises(SourceChangedError):
+                self._copy()
+        with self.assertRaises(SourceChangedError):
+            read_file(self.ref)
+        with self.assertRaises(SourceChangedError):
+            list(read_chunks(self.ref))
+
+
+class ReadTest(unittest.TestCase):
+    def test_digests_and_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.bin"
+            path.write_bytes(DATA)
+            ref = file_ref(path)
+            self.assertEqual(read_file(ref), DATA)
+            self.assertEqual(b"".join(read_chunks(ref, 4096)), DATA)
+            self.assertEqual(file_crc32(ref), zlib.crc32(DATA))
+            self.assertEqual(file_sha256(ref), hashlib.sha256(DATA).hexdigest())
+            buf = io.BytesIO()
+            write_ref(buf, ref)                   # 没有 write_file() 的文件对象：分块写入
+            self.assertEqual(buf.getvalue(), DATA)
+            empty = Path(tmp) / "empty"
+            empty.write_bytes(b"")
+            self.assertEqual(read_file(file_ref(empty)), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
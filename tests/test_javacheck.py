@@ -0,0 +1,114 @@
+"""genkit.javacheck：括号配对、残留的 {{ }} 与占位符、字符串和注释的边界情况，以及按骨架缓存。"""
+import unittest
+from unittest import mock
+
+from genkit import javacheck
+from genkit.javacheck import check_java, check_outputs
+
+CLEAN = '''\
+import java.util.*;
+
+/** 文档注释里的 { 和 " 不算数 */
+public class Main {
+    interface Shape { double area(); }
+
+    enum Color { RED, GREEN }
+
+    public static void main(String[] args) {
+        String s = "括号 ) ] } 和 \\"引号\\" 在字符串里";
+        char c = '{';
+        char q = '\\'';
+        String block = """
+            文本块里的 } 与 "引号"
+            """;
+        int[][] grid = {{1, 2}, {3, 4}};
+        Shape unit = new Shape() {
+            public double area() { return 1; }
+        };
+        Comparator<String> cmp = new Comparator<String>() {
+            @Override
+            public int compare(String a, String b) { return a.compareTo(b); }
+        };
+        // 行注释里的 } 与 "
+        System.out.println(s + c + q + block + grid[1][0] + unit.area() + Color.RED + cmp);
+    }
+}
+'''
+
+
+def _messages(problems):
+    return [p.split(": ", 1)[1] for p in problems]
+
+
+class CheckJavaTest(unittest.TestCase):
+    def test_clean_file(self):
+        self.assertEqual(check_java("Main.java", CLEAN), [])
+
+    def test_unbalanced_braces(self):
+        missing = check_java("Main.java", "public class Main {\n    void f() {\n}\n")
+        self.assertEqual(missing, ["Main.java:1:19: { 没有闭合"])
+        extra = check_java("Main.java", "public class Main {\n}\n}\n")
+        self.assertEqual(extra, ["Main.java:3:1: 多余的 }"])
+        mismatched = check_java("Main.java", "class A {\n  void f( { }\n}\n")
+        self.assertEqual(_messages(mismatched), ["} 与第 2 行第 9 列的 ( 不匹配"])
+
+    def test_leftover_double_braces(self):
+        src = "public class Main {{\n    public static void main(String[] args) {}\n}}\n"
+        self.assertIn("public 出现在方法体或代码块内（模板中的 {{ }} 是否没有还原？）", _messages(check_java("Main.java", src)))
+        src = "public class Main {\n    static void f() {}\n}}\n"
+        self.assertEqual(_messages(check_java("Main.java", src)), ["多余的 }"])
+
+    def test_leftover_placeholder(self):
+        problems = check_java("Main.java", 'public class Main {\n    String s = "{STUDENT}";\n}\n')
+        self.assertEqual(problems, ["Main.java:2:17: 残留未替换的模板占位符 {STUDENT}"])
+
+    def test_unterminated_string_and_comment(self):
+        self.assertEqual(_messages(check_java("Main.java", 'class A {\n  String s = "abc;\n}\n')),
+                         ["字符串或字符字面量没有闭合"])
+        self.assertEqual(_messages(check_java("Main.java", "class A {\n  char c = ';\n}\n")),
+                         ["字符串或字符字面量没有闭合"])
+        self.assertEqual(_messages(check_java("Main.java", "class A {\n  /* 没有结束\n}\n")), ["块注释没有闭合"])
+
+    def test_brackets_inside_literals_and_comments(self):
+        src = 'class A {\n  String s = "}}}"; // {{{\n  /* ((( */ char c = \')\';\n}\n'
+        self.assertEqual(check_java("A.java", src), [])
+
+    def test_public_type_must_match_file(self):
+        self.assertEqual(_messages(check_java("src/Other.java", "public class Main {}\n")),
+                         ["public 类型 Main 必须写在 Main.java 中"])
+        self.assertEqual(check_java("src/Other.java", "class Main {}\n"), [])
+
+
+class CheckOutputsTest(unittest.TestCase):
+    def setUp(self):
+        javacheck._cache.clear()
+
+    def _student(self, name):
+        return CLEAN.replace("括号", name)
+
+    def test_only_java_files_are_checked(self):
+        files = [("a/README.md", "{STUDENT} {"), ("a/src/Main.java", CLEAN.encode("utf-8"))]
+        self.assertEqual(check_outputs(files), [])
+
+    def test_skeleton_cache(self):
+        with mock.patch.object(javacheck, "check_java", wraps=javacheck.check_java) as full:
+            self.assertEqual(check_outputs([("a/src/Main.java", self._student("张三"))]), [])
+            self.assertEqual(check_outputs([("b/src/Main.java", self._student("李四"))]), [])
+            self.assertEqual(full.call_count, 1)        # 只有字面量不同：第二个学生命中缓存
+            broken = self._student("王五").replace("enum Color { RED, GREEN }", "enum Color { RED, GREEN")
+            problems = check_outputs([("c/src/Main.java", broken)])
+        self.assertTrue(problems and problems[0].startswith("c/src/Main.java:"), problems)
+
+    def test_cached_skeleton_still_reports_placeholder(self):
+        check_outputs([("a/src/Main.java", self._student("张三"))])
+        problems = check_outputs([("b/src/Main.java", self._student("{STUDENT}"))])
+        self.assertEqual(_messages(problems), ["残留未替换的模板占位符 {STUDENT}"])
+        self.assertTrue(problems[0].startswith("b/src/Main.java:10:"))
+
+    def test_error_carries_all_problems(self):
+        err = javacheck.JavaCheckError(["a.java:1:1: x", "b.java:2:2: y"])
+        self.assertEqual(str(err), "a.java:1:1: x\nb.java:2:2: y")
+
+
+if __name__ == "__main__":
+    unittest.main()
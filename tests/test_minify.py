@@ -0,0 +1,58 @@
+"""genkit.minify：三种压缩器保留字符串、属性值和行内空白，--production 的 .gz 兄弟文件可还原。"""
+import gzip
+import unittest
+
+from genkit.minify import minify_css, minify_html, minify_js, production_files
+
+
+class MinifyJsTest(unittest.TestCase):
+    def test_comparison_next_to_string(self):
+        self.assertEqual(minify_js('if (a < "b") { x = "c" > y; }'), 'if(a<"b"){x="c">y;}')
+        self.assertEqual(minify_js("ok = s <= 'z' && 'a' >= s;"), "ok=s<='z'&&'a'>=s;")
+
+    def test_strings_and_comments(self):
+        src = 'var s = "a // b";  // 注释\n/* 块\n注释 */\n\n  var t = `x  ${s}`;\n'
+        self.assertEqual(minify_js(src), 'var s="a // b";\nvar t=`x  ${s}`;')
+
+
+class MinifyCssTest(unittest.TestCase):
+    def test_strings_kept(self):
+        src = '/* 头部 */\na > b {\n  content: "x  >  y";\n  color: red;\n}\n'
+        self.assertEqual(minify_css(src), 'a>b{content:"x  >  y";color:red}')
+
+    def test_child_combinator_next_to_string(self):
+        self.assertEqual(minify_css('[title="a"] > p { content: "<" }'), '[title="a"]>p{content:"<"}')
+
+
+class MinifyHtmlTest(unittest.TestCase):
+    def test_inline_whitespace_collapses_to_space(self):
+        self.assertEqual(minify_html("<p>Hello <b>world</b>\n <i>x</i></p>"), "<p>Hello <b>world</b> <i>x</i></p>")
+        self.assertEqual(minify_html("<form>\n  <label>a</label>\n  <label>b</label>\n</form>"),
+                         "<form><label>a</label> <label>b</label></form>")
+
+    def test_block_whitespace_removed(self):
+        self.assertEqual(minify_html("<ul>\n  <li>a</li>\n  <li>b</li>\n</ul>\n"), "<ul><li>a</li><li>b</li></ul>")
+
+    def test_attribute_values_kept(self):
+        self.assertEqual(minify_html('<div   title="a   b"\n  data-x=\'c\n d\'>x</div>'),
+                         '<div title="a   b" data-x=\'c\n d\'>x</div>')
+
+    def test_raw_elements_and_comments(self):
+        src = ("<!-- 注释 --><div>\n<pre> a\n   b </pre>\n<textarea>  q  </textarea>\n"
+               "<script>if (a < b && c > d) {}</script></div>")
+        # 原样保留的元素以占位符参与折叠，两侧空白保守地留一个空格
+        self.assertEqual(minify_html(src), "<div><pre> a\n   b </pre> <textarea>  q  </textarea> "
+                                           "<script>if (a < b && c > d) {}</script></div>")
+
+
+class ProductionFilesTest(unittest.TestCase):
+    def test_gz_sibling_round_trips(self):
+        css = "body {\n  color: red;\n}\n" * 40
+        files = production_files([("a/styles.css", css), ("a/data.bin", b"\x00\x01")])
+        self.assertEqual([rel for rel, _ in files], ["a/styles.css", "a/styles.css.gz", "a/data.bin"])
+        self.assertEqual(gzip.decompress(files[1][1]), files[0][1])
+        self.assertEqual(files[2][1], b"\x00\x01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+"""genkit.output 及手写的 zip/tar 写入器：读回全部成员、增量重写与删除、可复现性。"""
+import contextlib
+import hashlib
+import io
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+import generate_all
+import generate_sites
+from genkit.compression import parse_policy
+from genkit.filecopy import file_ref
+from genkit.output import CHECKSUMS, OutputWriter, StudentOutput, checksum_line, to_bytes
+from genkit.tarwriter import TarAssembler
+from genkit.zipwriter import ZIP_FILECOUNT_LIMIT, ZipAssembler, compress_member
+
+LONG_DIR = "很长的目录名" * 12          # 超过 ustar 的 100 字节，需要 PAX 头
+
+
+def _students(asset):
+    common = "body { color: red; }\n" * 50
+    return [
+        StudentOutput("liting", {}, [
+            ("liting/index.html", "<p>liting</p>\n" * 40),
+            ("liting/styles.css", common),
+            ("liting/empty.txt", b""),
+            ("liting/noise.bin", os.urandom(4096)),
+            ("liting/assets/photo.png", file_ref(asset)),
+        ]),
+        StudentOutput("张三", {}, [
+            ("张三/index.html", "<p>张三</p>"),
+            ("张三/styles.css", common),                  # 与 liting 相同：--dedup 时为硬链接
+            (f"张三/{LONG_DIR}/README.md", "# 张三\n"),
+        ]),
+    ]
+
+
+def _expected(students):
+    return {rel: to_bytes(content) for s in students for rel, content in s.files}
+
+
+class ArchiveRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        self.asset = self.base / "photo.png"
+        self.asset.write_bytes(b"\x89PNG\r\n\x1a\n" + os.urandom(3000))
+        self.students = _students(self.asset)
+
+    def _write(self, name, fmt, **kw):
+        archive = self.base / name
+        writer = OutputWriter(self.base / "out", archive, fmt=fmt, **kw)
+        for student in self.students:
+            writer.add(student)
+        return archive, writer.close()
+
+    def _read_back(self, archive):
+        if zipfile.is_zipfile(archive):
+            with zipfile.ZipFile(archive) as zf:
+                self.assertIsNone(zf.testzip())
+                return {info.filename: zf.read(info) for info in zf.infolist()}
+        with tarfile.open(archive) as tar:
+            return {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+
+    def test_every_member_reads_back(self):
+        expected = _expected(self.students)
+        for fmt in ("zip", "tar", "tar.gz"):
+            for dedup in (False, True):
+                with self.subTest(fmt=fmt, dedup=dedup):
+                    archive, stats = self._write(f"a-{dedup}.{fmt}", fmt, zip_only=True, dedup=dedup)
+                    members = self._read_back(archive)
+                    self.assertEqual(list(members), list(expected))     # 顺序与条目顺序一致
+                    self.assertEqual(members, expected)
+                    self.assertEqual(stats.sha256, hashlib.sha256(archive.read_bytes()).hexdigest())
+
+    def test_tar_links_and_folders(self):
+        archive, _ = self._write("links.tar", "tar", dedup=True)
+        with tarfile.open(archive) as tar:
+            self.assertTrue(tar.getmember("张三/styles.css").islnk())
+        for rel, data in _expected(self.students).items():
+            self.assertEqual((self.base / "out" / rel).read_bytes(), data, rel)
+        self.assertEqual(os.stat(self.base / "out" / "张三/styles.css").st_ino,
+                         os.stat(self.base / "out" / "liting/styles.css").st_ino)
+
+    def test_reproducible_bytes(self):
+        for fmt in ("zip", "tar.gz"):
+            with self.subTest(fmt=fmt):
+                first, a = self._write(f"r1.{fmt}", fmt, zip_only=True, reproducible=True)
+                second, b = self._write(f"r2.{fmt}", fmt, zip_only=True, reproducible=True)
+                self.assertEqual(a.sha256, b.sha256)
+                self.assertEqual(first.read_bytes(), second.read_bytes())
+
+    def test_tar_assembler_matches_tarfile(self):
+        entries = [(rel, to_bytes(c)) for s in self.students for rel, c in s.files]
+        ours, theirs = io.BytesIO(), io.BytesIO()
+        assembler = TarAssembler(ours)
+        with tarfile.open(fileobj=theirs, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            for rel, data in entries:
+                for add in (lambda info: assembler.add(info, data),
+                            lambda info: tar.addfile(info, io.BytesIO(data))):
+                    info = tarfile.TarInfo(rel)
+                    info.size, info.mtime, info.mode = len(data), 315532800, 0o644
+                    add(info)
+            link = tarfile.TarInfo("link.css")
+            link.type, link.linkname, link.mtime = tarfile.LNKTYPE, entries[1][0], 315532800
+            assembler.add(link)
+            tar.addfile(link)
+        assembler.close()
+        self.assertEqual(ours.getvalue(), theirs.getvalue())
+
+    def test_zip64_member_count(self):
+        buf = io.BytesIO()
+        zasm = ZipAssembler(buf)
+        count = ZIP_FILECOUNT_LIMIT + 10
+        for k in range(count):
+            zasm.add(compress_member(f"f/{k}.txt", str(k).encode(), (1980, 1, 1, 0, 0, 0),
+                                     method=zipfile.ZIP_STORED))
+        zasm.close()
+        with zipfile.ZipFile(buf) as zf:
+            self.assertEqual(len(zf.infolist()), count)
+            self.assertEqual(zf.read(f"f/{count - 1}.txt"), str(count - 1).encode())
+
+    def test_incremental_reuses_unchanged_zip_members(self):
+        archive, _ = self._write("inc.zip", "zip", incremental=True)
+        changed = self.students[1].files[0][0]
+        self.students[1].files[0] = (changed, "<p>改过了</p>")
+        _, stats = self._write("inc.zip", "zip", incremental=True)
+        self.assertEqual(stats.written, 1)
+        self.assertEqual(self._read_back(archive), _expected(self.students))
+        self.assertEqual((self.base / "out" / changed).read_text(encoding="utf-8"), "<p>改过了</p>")
+
+    def test_incremental_recompresses_when_policy_changes(self):
+        archive, _ = self._write("policy.zip", "zip", incremental=True)
+        _, stats = self._write("policy.zip", "zip", incremental=True, policy=parse_policy("0"))
+        self.assertEqual(stats.written, 0)                  # 磁盘文件不变，压缩包成员按新策略重新压缩
+        with zipfile.ZipFile(archive) as zf:
+            self.assertEqual({info.compress_type for info in zf.infolist()}, {zipfile.ZIP_STORED})
+        self.assertEqual(self._read_back(archive), _expected(self.students))
+        self._write("policy.zip", "zip", incremental=True)
+        with zipfile.ZipFile(archive) as zf:
+            self.assertEqual(zf.getinfo("liting/index.html").compress_type, zipfile.ZIP_DEFLATED)
+
+
+class ChecksumsTest(unittest.TestCase):
+    """--checksums：文件夹和压缩包里的 MANIFEST.sha256 与实际内容一致，可以用 sha256sum -c 校验。"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        self.asset = self.base / "photo.png"
+        self.asset.write_bytes(b"\x89PNG\r\n\x1a\n" + os.urandom(3000))
+        self.students = _students(self.asset)
+
+    def _write(self, **kw):
+        writer = OutputWriter(self.base / "out", self.base / "sums.zip", checksums=True, **kw)
+        for student in self.students:
+            writer.add(student)
+        writer.close()
+        with zipfile.ZipFile(self.base / "sums.zip") as zf:
+            return {n: zf.read(n) for n in zf.namelist()}
+
+    @staticmethod
+    def _parse(text):
+        return {path: digest for digest, path in (line.split("  ", 1) for line in text.splitlines())}
+
+    def test_folder_and_archive_manifests(self):
+        members = self._write()
+        expected = _expected(self.students)
+        for student in self.students:
+            top = self.base / "out" / student.name
+            listed = self._parse((top / CHECKSUMS).read_text(encoding="utf-8"))
+            self.assertEqual(set(listed), {rel.split("/", 1)[1] for rel, _ in student.files})
+            for rel, digest in listed.items():
+                self.assertEqual(hashlib.sha256((top / rel).read_bytes()).hexdigest(), digest, rel)
+            self.assertEqual(members[f"{student.name}/{CHECKSUMS}"], (top / CHECKSUMS).read_bytes())
+        root = self._parse(members.pop(CHECKSUMS).decode("utf-8"))
+        self.assertEqual(list(root), list(members))                      # 按成员顺序，含各文件夹的清单
+        for rel, data in members.items():
+            self.assertEqual(hashlib.sha256(data).hexdigest(), root[rel], rel)
+        self.assertEqual({rel: members[rel] for rel in expected}, expected)
+        self.assertFalse((self.base / "out" / CHECKSUMS).exists())       # 根清单只进压缩包
+
+    @unittest.skipUnless(shutil.which("sha256sum"), "没有 sha256sum")
+    def test_sha256sum_accepts_folder_manifest(self):
+        self.students.append(StudentOutput("odd", {}, [("odd/back\\slash.txt", "x"), ("odd/a.txt", "y")]))
+        self._write()
+        for student in self.students:
+            result = subprocess.run(["sha256sum", "-c", "--quiet", CHECKSUMS], cwd=self.base / "out" / student.name,
+                                    capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+    def test_escaping(self):
+        digest = "0" * 64
+        self.assertEqual(checksum_line(digest, "a/b.txt"), f"{digest}  a/b.txt\n")
+        self.assertEqual(checksum_line(digest, "a\\b\nc"), f"\\{digest}  a\\\\b\\nc\n")
+
+    def test_incremental_run_keeps_manifests(self):
+        first = self._write(incremental=True)
+        second = self._write(incremental=True)
+        self.assertEqual(second, first)
+
+
+class IncrementalCommandLineTest(unittest.TestCase):
+    """通过生成脚本的命令行：第二次 --incremental 不重写任何文件，名单中删掉的学生被清理。"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        self.roster = self.base / "roster.txt"
+        self.out = self.base / "out"
+
+    def _run(self, names):
+        # 固定人数：色相按人数均分，人数变了所有站点都会重新着色
+        self.roster.write_text("\n".join(names) + "\n", encoding="utf-8")
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            generate_sites.main(["--roster", str(self.roster), "-o", str(self.out), "--incremental",
+                                 "--reproducible"])
+        m = re.search(r"文件 (\d+) 个：重写 (\d+)，未变跳过 (\d+)，删除 (\d+)", log.getvalue())
+        self.assertIsNotNone(m, log.getvalue())
+        return tuple(map(int, m.groups()))
+
+    def test_second_run_rewrites_nothing(self):
+        files, written, skipped, removed = self._run(["liting", "hutao", "xubo"])
+        self.assertEqual((written, skipped, removed), (files, 0, 0))
+        self.assertEqual(self._run(["liting", "hutao", "xubo"]), (files, 0, files, 0))
+
+    def test_dropped_student_is_removed(self):
+        self._run(["liting", "hutao", "xubo"])
+        files, written, skipped, removed = self._run(["liting", "hutao", "wuhan"])
+        self.assertEqual(removed, written)
+        self.assertFalse((self.out / "xubo").exists())
+        self.assertTrue((self.out / "wuhan" / "index.html").is_file())
+        with zipfile.ZipFile(self.out / "pinyin_folders_42.zip") as zf:
+            names = zf.namelist()
+        self.assertFalse(any(n.startswith("xubo/") for n in names))
+        self.assertEqual(len(names), files)
+
+
+class ReproducibleJobsTest(unittest.TestCase):
+    """--reproducible 的压缩包与并行度无关：--jobs 1 与 --jobs 4 的摘要相同。"""
+
+    def _digests(self, out, jobs, fmt):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_all.main(["--reproducible", "--zip-only", "-o", str(out), "-j", str(jobs), "--format", fmt])
+        return {p.name: p.read_text(encoding="utf-8") for p in sorted(out.glob("*.sha256"))}
+
+    def test_jobs_do_not_change_digests(self):
+        for fmt in ("zip", "tar.gz"):
+            with self.subTest(fmt=fmt), tempfile.TemporaryDirectory() as tmp:
+                serial = self._digests(Path(tmp) / "j1", 1, fmt)
+                parallel = self._digests(Path(tmp) / "j4", 4, fmt)
+                self.assertEqual(len(serial), 3)
+                self.assertEqual(serial, parallel)
+
+
+if __name__ == "__main__":
+    unittest.main()
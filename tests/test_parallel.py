@@ -0,0 +1,69 @@
+"""genkit.parallel 与 --jobs：并行渲染的结果和压缩包成员顺序与串行完全一致。"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+import generate_sites
+from genkit.parallel import ordered_map, resolve_jobs
+
+
+def _square_with_pid(k, delay):
+    # 让编号小的任务反而更慢，结果若按完成顺序产出就会乱序
+    if delay:
+        sum(range(delay * (50 - k % 50)))
+    return k, k * k, os.getpid()
+
+
+class OrderedMapTest(unittest.TestCase):
+    def test_serial_and_parallel_keep_input_order(self):
+        items = [(k, 2000) for k in range(200)]
+        serial = [r[:2] for r in ordered_map(_square_with_pid, items, jobs=1)]
+        parallel = list(ordered_map(_square_with_pid, items, jobs=2, chunksize=7))
+        self.assertEqual([r[:2] for r in parallel], serial)
+        self.assertEqual(serial, [(k, k * k) for k in range(200)])
+        self.assertNotIn(os.getpid(), {r[2] for r in parallel})      # 确实在工作进程中计算
+
+    def test_items_are_consumed_lazily(self):
+        consumed = []
+
+        def items():
+            for k in range(1000):
+                consumed.append(k)
+                yield k, 0
+
+        results = ordered_map(_square_with_pid, items(), jobs=2, chunksize=10)
+        self.assertEqual(next(results)[:2], (0, 0))
+        self.assertLess(len(consumed), 1000)                         # 在途任务有上限，不一次读完名单
+        results.close()
+
+    def test_empty_input(self):
+        self.assertEqual(list(ordered_map(_square_with_pid, [], jobs=2)), [])
+
+    def test_resolve_jobs(self):
+        self.assertEqual(resolve_jobs(None), 1)
+        self.assertEqual(resolve_jobs(3), 3)
+        self.assertEqual(resolve_jobs(0), os.cpu_count() or 1)
+
+
+class JobsCommandLineTest(unittest.TestCase):
+    def _members(self, out, jobs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_sites.main(["--zip-only", "-o", str(out), "-j", str(jobs)])
+        archive, = out.glob("*.zip")
+        with zipfile.ZipFile(archive) as zf:
+            return [(info.filename, zf.read(info)) for info in zf.infolist()]
+
+    def test_member_order_does_not_depend_on_jobs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            serial = self._members(Path(tmp) / "j1", 1)
+            parallel = self._members(Path(tmp) / "j3", 3)
+        self.assertGreater(len(serial), 42)
+        self.assertEqual(parallel, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""genkit.preview：tar 硬链接成员的大小和 ETag、gzip 协商、请求中途压缩包被重新生成。"""
+import gzip
+import http.client
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from genkit import preview
+from genkit.output import OutputWriter, StudentOutput
+from genkit.preview import GZIP_MIN_SIZE, ArchiveChanged, ArchiveSource, ArchiveView, LRUCache
+
+PAGE = "<html>" + "<p>重复内容</p>" * 200 + "</html>"
+
+
+class HardlinkMemberTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        base = Path(tmp.name)
+        self.archive = base / "sites.tar"
+        writer = OutputWriter(base, self.archive, zip_only=True, dedup=True, fmt="tar")
+        for name in ("a", "b"):
+            writer.add(StudentOutput(name, {}, [(f"{name}/index.html", PAGE)]))
+        writer.close()
+        self.source = ArchiveSource(self.archive, LRUCache(1 << 20))
+        self.addCleanup(self.source.close)
+
+    def test_link_is_stored_as_link(self):
+        with tarfile.open(self.archive) as tar:
+            self.assertTrue(tar.getmember("b/index.html").islnk())
+
+    def test_size_and_etag_follow_target(self):
+        src = self.source.refresh()
+        size = len(PAGE.encode("utf-8"))
+        self.assertEqual(src.size("a/index.html"), size)
+        self.assertEqual(src.size("b/index.html"), size)
+        self.assertGreaterEqual(src.size("b/index.html"), GZIP_MIN_SIZE)
+        self.assertEqual(src.etag("b/index.html"), src.etag("a/index.html"))
+        self.assertEqual(src.read("b/index.html"), PAGE.encode("utf-8"))
+
+
+def _write_zip(path, files):
+    writer = OutputWriter(path.parent, path, zip_only=True)
+    writer.add(StudentOutput("a", {}, files))
+    writer.close()
+
+
+class AcceptEncodingTest(unittest.TestCase):
+    def test_negotiation(self):
+        accepts = preview._accepts_gzip
+        self.assertTrue(accepts("gzip, deflate, br"))
+        self.assertTrue(accepts("br;q=1.0, gzip;q=0.5"))
+        self.assertTrue(accepts("*"))
+        self.assertTrue(accepts("*;q=0, gzip"))         # 明确列出的 gzip 优先于 *，与顺序无关
+        self.assertTrue(accepts("identity, *;q=0.1"))
+        self.assertFalse(accepts("gzip;q=0, *"))
+        self.assertFalse(accepts("gzip; q=0.000"))
+        self.assertFalse(accepts("deflate, br"))
+        self.assertFalse(accepts(None))
+
+
+class ServerTest(unittest.TestCase):
+    """启动真正的预览服务器，检查响应头与内容。"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive = Path(tmp.name) / "sites.zip"
+        self.css = ("body { color: red; }\n" * 40).encode("utf-8")
+        _write_zip(self.archive, [("a/styles.css", self.css), ("a/styles.css.gz", gzip.compress(self.css)),
+                                  ("a/index.html", PAGE)])
+        self.server = preview.make_server(self.archive, port=0, quiet=True)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.RequestHandlerClass.source.close)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def _get(self, path, **headers):
+        conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=5)
+        self.addCleanup(conn.close)
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        return resp, resp.read()
+
+    def test_gz_sibling_is_sent_when_accepted(self):
+        resp, body = self._get("/a/styles.css", **{"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(resp.getheader("Content-Type"), "text/css; charset=utf-8")
+        self.assertEqual(gzip.decompress(body), self.css)
+        resp, body = self._get("/a/styles.css", **{"Accept-Encoding": "gzip;q=0, *"})
+        self.assertIsNone(resp.getheader("Content-Encoding"))
+        self.assertEqual(body, self.css)
+
+    def test_direct_gz_request(self):
+        resp, body = self._get("/a/styles.css.gz", **{"Accept-Encoding": "gzip"})
+        self.assertEqual(resp.getheader("Content-Type"), "text/css; charset=utf-8")
+        self.assertEqual(resp.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), self.css)
+        resp, body = self._get("/a/styles.css.gz")
+        self.assertEqual(resp.getheader("Content-Type"), "application/gzip")
+        self.assertIsNone(resp.getheader("Content-Encoding"))
+        self.assertEqual(gzip.decompress(body), self.css)
+
+    def test_regenerated_during_request(self):
+        # 第一次读取前重新生成压缩包并让源换上新版本：旧视图已关闭，请求应以新版本重试
+        new_page = "<html>新内容</html>"
+        original = ArchiveView.read
+        source = self.server.RequestHandlerClass.source
+        calls = []
+
+        def regenerate_first(view, name):
+            if not calls:
+                calls.append(view.generation)
+                _write_zip(self.archive, [("a/index.html", new_page)])
+                os.utime(self.archive, ns=(0, 0))       # 大小相同也能看出变化
+                source.refresh()
+            return original(view, name)
+
+        with mock.patch.object(ArchiveView, "read", regenerate_first):
+            resp, body = self._get("/a/")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(body.decode("utf-8"), new_page)
+        self.assertEqual(len(calls), 1)
+
+
+class GenerationTest(unittest.TestCase):
+    def test_old_view_rejects_reads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = Path(tmp) / "sites.zip"
+            _write_zip(archive, [("a/index.html", "旧")])
+            source = ArchiveSource(archive, LRUCache(1 << 20))
+            old = source.refresh()
+            _write_zip(archive, [("a/index.html", "新的内容")])
+            new = source.refresh()
+            self.assertGreater(new.generation, old.generation)
+            with self.assertRaises(ArchiveChanged):
+                old.read("a/index.html")
+            self.assertEqual(new.read("a/index.html").decode("utf-8"), "新的内容")
+            self.assertIs(source.refresh(), new)
+            source.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""genkit.profile 与 --profile/--profile-json：各阶段的累加、排序、表格与 JSON。"""
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import generate_sites
+from genkit.profile import STAGES, Profile, pad
+
+
+class ProfileTest(unittest.TestCase):
+    def test_record_accumulates_across_threads(self):
+        profile = Profile()
+
+        def work():
+            for _ in range(1000):
+                profile.record("sites", "write", 0.001, bytes_out=10)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        row, = profile.rows()
+        self.assertEqual((row["calls"], row["bytes_out"]), (4000, 40000))
+        self.assertAlmostEqual(row["seconds"], 4.0)
+        self.assertIsNone(row["ratio"])
+
+    def test_rows_follow_family_and_stage_order(self):
+        profile = Profile()
+        profile.record("sites", "close", 0.1)
+        profile.record("java", "render", 0.2)
+        profile.record("sites", "compress", 0.3, calls=5, bytes_in=1000, bytes_out=250)
+        profile.record("sites", "render", 0.4)
+        self.assertEqual([(r["family"], r["stage"]) for r in profile.rows()],
+                         [("sites", "render"), ("sites", "compress"), ("sites", "close"), ("java", "render")])
+        compress = profile.rows()[1]
+        self.assertEqual(compress["ratio"], 0.25)
+        self.assertEqual(compress["calls"], 5)
+
+    def test_summary_and_dump(self):
+        profile = Profile()
+        profile.record("sites", "compress", 0.5, bytes_in=400, bytes_out=100)
+        profile.wall = 2.0
+        lines = profile.summary().splitlines()
+        self.assertEqual(lines[0], "性能剖析：总耗时 2.000s")
+        self.assertEqual(lines[2].split(), ["sites", "compress", "0.500", "25.0%", "1", "400", "100", "0.25"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "profile.json"
+            profile.dump(path)
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        self.assertEqual(doc, {"wall": 2.0, "stages": profile.rows()})
+
+    def test_pad_counts_wide_characters(self):
+        self.assertEqual(pad("产物", 6), "  产物")
+        self.assertEqual(pad("ab", 4, left=True), "ab  ")
+
+
+class ProfileCommandLineTest(unittest.TestCase):
+    def test_profile_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out, path = Path(tmp) / "out", Path(tmp) / "profile.json"
+            with contextlib.redirect_stdout(io.StringIO()) as log:
+                generate_sites.main(["-o", str(out), "--profile-json", str(path)])
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        self.assertIn("性能剖析", log.getvalue())
+        stages = {r["stage"]: r for r in doc["stages"]}
+        self.assertTrue({"render", "plan", "write", "compress", "archive", "close"} <= set(stages))
+        self.assertTrue(set(stages) <= set(STAGES))
+        self.assertEqual(stages["render"]["calls"], 42)
+        self.assertGreater(stages["close"]["bytes_out"], 0)
+        self.assertGreater(doc["wall"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""genkit.roster：格式判断、csv 表头、重名和 count()。"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from genkit.roster import RosterError, iter_names, load_roster
+
+
+def names(text, fmt="auto"):
+    return list(iter_names(text.splitlines(keepends=True), fmt))
+
+
+class SniffTest(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(names("zhang\nli\n"), ["zhang", "li"])
+        self.assertEqual(names("zhang,1\nli,2\n"), ["zhang", "li"])
+        self.assertEqual(names('{"name": "zhang"}\n"li"\n'), ["zhang", "li"])
+
+    def test_single_column_csv_header(self):
+        self.assertEqual(names("name\nzhang\nli\n"), ["zhang", "li"])
+        self.assertEqual(names("Name\n"), [])
+        self.assertEqual(names("id,name\n1,zhang\n"), ["zhang"])
+
+    def test_header_without_name_column(self):
+        with self.assertRaises(RosterError):
+            names("photo,assets\na.png,\n")
+
+    def test_txt_file_with_csv_header(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "roster.txt"
+            path.write_text("name\nzhang\n", encoding="utf-8")
+            with self.assertRaisesRegex(RosterError, "--roster-format csv"):
+                list(load_roster(str(path)))
+            roster = load_roster(str(path), "csv")
+            self.assertEqual(list(roster), ["zhang"])
+            self.assertEqual(roster.count(), 1)
+
+
+class DuplicateTest(unittest.TestCase):
+    def test_duplicate_names_are_rejected(self):
+        for text in ("zhang\nli\nzhang\n", "name\nzhang\nli\nzhang\n", '"zhang"\n{"name": "li"}\n{"name": "zhang"}\n'):
+            with self.assertRaisesRegex(RosterError, r"第 [34] 行：名字重复：'zhang'"):
+                names(text)
+
+    def test_names_are_compared_after_strip(self):
+        with self.assertRaisesRegex(RosterError, "名字重复"):
+            names("zhang\n  zhang  \n")
+
+
+class CountTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+        (self.base / "a.png").write_bytes(b"png")
+
+    def _write(self, name, text):
+        path = self.base / name
+        path.write_text(text, encoding="utf-8")
+        return load_roster(str(path))
+
+    def test_count_does_not_check_assets(self):
+        roster = self._write("roster.csv", "name,photo,assets\nzhang,a.png,a.png\nli,missing.png,\n")
+        with mock.patch.object(os.path, "isfile", side_effect=AssertionError("count() 不应检查素材")):
+            self.assertEqual(roster.count(), 2)
+        with self.assertRaisesRegex(RosterError, "第 3 行：找不到素材文件"):
+            list(roster.records())
+        roster = self._write("roster.jsonl", '{"name": "zhang", "photo": "missing.png"}\n"li"\n')
+        self.assertEqual(roster.count(), 2)
+
+    def test_count_reports_duplicates(self):
+        roster = self._write("roster.txt", "zhang\nli\nzhang\n")
+        with self.assertRaisesRegex(RosterError, "名字重复"):
+            roster.count()
+
+    def test_records_resolve_assets(self):
+        roster = self._write("roster.csv", "name,photo\nzhang,a.png\nli,\n")
+        records = list(roster.records())
+        self.assertEqual(records[0][1].photo, str(self.base / "a.png"))
+        self.assertEqual(records[1][1].photo, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
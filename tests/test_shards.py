@@ -0,0 +1,119 @@
+"""genkit.shards：分片边界、.part 暂存与出错回滚、跨分片的 tar 硬链接，以及索引内容。"""
+import json
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from genkit.output import OutputWriter, StudentOutput
+from genkit.shards import ShardedArchive, ShardSpec, load_index, shard_files, shard_of
+
+COMMON = "所有学生相同的内容\n" * 20
+
+
+def _students(names):
+    return [StudentOutput(name, {}, [(f"{name}/index.html", f"<p>{name}</p>"),
+                                     (f"{name}/common.css", COMMON),
+                                     (f"{name}/copy.css", COMMON)]) for name in names]
+
+
+def _members(path):
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            return {n: zf.read(n) for n in zf.namelist()}
+    with tarfile.open(path) as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+
+
+class ShardTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base = Path(tmp.name)
+
+    def _write(self, names, spec, fmt="zip", dedup=False, shared=True, fail_after=None):
+        shards = ShardedArchive(self.base / f"sites.{fmt}", spec, fmt=fmt)
+        writer = OutputWriter(self.base, shards.index, zip_only=True, dedup=dedup, fmt=fmt, shards=shards)
+        try:
+            if shared:
+                writer.add(StudentOutput("", {}, [("_shared/site.css", "body{}")]), count=False)
+            for k, student in enumerate(_students(names)):
+                if k == fail_after:
+                    self.assertTrue(list(self.base.glob("*.part")))     # 写到一半：只有临时文件
+                    raise RuntimeError("中途出错")
+                writer.add(student)
+        except RuntimeError:
+            writer.abort()
+            raise
+        writer.close()
+        return load_index(shards.index)
+
+    def test_shard_size_boundaries(self):
+        names = ["a", "b", "c", "d", "e"]
+        doc = self._write(names, ShardSpec(students=2))
+        self.assertEqual([(s["file"], s["students"], s["first"], s["last"]) for s in doc["shards"]],
+                         [("sites-0001.zip", 2, "a", "b"), ("sites-0002.zip", 2, "c", "d"),
+                          ("sites-0003.zip", 1, "e", "e")])
+        self.assertEqual(doc["shared"]["file"], "sites-shared.zip")
+        self.assertEqual(doc["students"], {"a": 0, "b": 0, "c": 1, "d": 1, "e": 2})
+        self.assertEqual(shard_of(doc, "d"), "sites-0002.zip")
+        self.assertIsNone(shard_of(doc, "zz"))
+        expected = {rel: content.encode("utf-8") for s in _students(["c", "d"]) for rel, content in s.files}
+        self.assertEqual(_members(self.base / "sites-0002.zip"), expected)
+        self.assertEqual(list(_members(self.base / "sites-shared.zip")), ["_shared/site.css"])
+        self.assertEqual(list(self.base.glob("*.part")), [])
+
+    def test_shard_bytes_boundaries(self):
+        # 每个学生的成员数据约 1130 字节：分片达到 2000 字节后从下一个学生起换分片
+        doc = self._write(["a", "b", "c", "d", "e"], ShardSpec(max_bytes=2000), fmt="tar", shared=False)
+        self.assertEqual([s["students"] for s in doc["shards"]], [2, 2, 1])
+        self.assertIsNone(doc["shared"])
+
+    def test_index_matches_json_dumps(self):
+        names = ["张三", 'quote"name', "b"]
+        self._write(names, ShardSpec(students=2))
+        path = self.base / "sites.shards.json"
+        doc = json.loads(path.read_text(encoding="utf-8"))
+        self.assertEqual(path.read_text(encoding="utf-8"), json.dumps(doc, ensure_ascii=False, indent=1) + "\n")
+        self.assertEqual(doc["students"], {"张三": 0, 'quote"name': 0, "b": 1})
+
+    def test_empty_roster_index(self):
+        doc = self._write([], ShardSpec(students=2), shared=False)
+        self.assertEqual(doc["students"], {})
+        self.assertEqual(doc["shards"][0]["students"], 0)
+
+    def test_dedup_across_tar_shards(self):
+        self._write(["a", "b", "c", "d", "e"], ShardSpec(students=2), fmt="tar", dedup=True)
+        for k in (1, 2, 3):
+            path = self.base / f"sites-{k:04d}.tar"
+            with tarfile.open(path) as tar:
+                names = tar.getnames()
+                links = {m.name: m.linkname for m in tar.getmembers() if m.islnk()}
+            # 每个分片单独可用：硬链接只指向同一分片中的成员
+            for rel, target in links.items():
+                self.assertIn(target, names, f"{path.name}: {rel} -> {target}")
+            first = names[1]                                  # 本分片第一个学生的 common.css
+            self.assertNotIn(first, links)
+            self.assertEqual(len(links), len(names) // 3 * 2 - 1)
+            for rel, data in _members(path).items():
+                if rel.endswith(".css"):
+                    self.assertEqual(data, COMMON.encode("utf-8"))
+
+    def test_abort_keeps_previous_shards(self):
+        self._write(["a", "b", "c"], ShardSpec(students=1))
+        before = {p.name: p.read_bytes() for p in self.base.iterdir()}
+        with self.assertRaises(RuntimeError):
+            self._write(["x", "y", "z"], ShardSpec(students=1), fail_after=2)
+        self.assertEqual({p.name: p.read_bytes() for p in self.base.iterdir()}, before)
+
+    def test_surplus_shards_are_removed(self):
+        self._write(["a", "b", "c"], ShardSpec(students=1))
+        self.assertTrue((self.base / "sites-0003.zip").exists())
+        doc = self._write(["a", "b", "c"], ShardSpec(students=2), shared=False)
+        self.assertEqual(shard_files(doc), ["sites-0001.zip", "sites-0002.zip"])
+        self.assertEqual(sorted(p.name for p in self.base.glob("sites-*")), ["sites-0001.zip", "sites-0002.zip"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""generate_sites：_shared/ 下的文件名哈希与写出的字节一致（包括 --production 压缩之后）。"""
+import hashlib
+import unittest
+
+import generate_sites
+from genkit import engine
+from genkit.output import StudentOutput, to_bytes
+
+
+class SharedAssetNameTest(unittest.TestCase):
+    def _check(self, production):
+        shared = generate_sites.shared_files(production)
+        opts = engine.RenderOptions(validate=False, production=production)
+        written = engine.postprocess(StudentOutput("", {}, shared), opts).files
+        for rel, content in written:
+            if rel.endswith(".gz"):
+                continue
+            digest = hashlib.sha256(to_bytes(content)).hexdigest()[:10]
+            self.assertIn(f".{digest}.", rel)
+        return [rel for rel, _ in shared]
+
+    def test_plain(self):
+        self._check(False)
+
+    def test_production_names_follow_minified_bytes(self):
+        self.assertNotEqual(self._check(True), self._check(False))
+
+    def test_pages_reference_shared_names(self):
+        shared = tuple(generate_sites.shared_files(True))
+        page = dict(generate_sites.render_student(0, "liting", 1, shared_assets=shared).files)["liting/index.html"]
+        for rel, _ in shared:
+            self.assertIn(f'"../{rel}"', page)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+"""generate_java_sorts --bench：计时程序通过词法检查，结果不正确时记一行 fail 后继续；汇总能读出这些行。"""
+import unittest
+
+import generate_java_sorts as sorts
+from genkit import javacheck, sortbench
+
+
+class BenchHarnessTest(unittest.TestCase):
+    def setUp(self):
+        self.source = sorts.make_bench("liting", sorts.BenchSettings(), tuple(sorts.ALGORITHMS))
+
+    def test_passes_javacheck(self):
+        self.assertEqual(javacheck.check_outputs([("liting/src/Bench.java", self.source)]), [])
+
+    def test_wrong_result_is_caught_per_combination(self):
+        # 核对失败抛出的异常在算法/分布循环内被捕获，而不是传到 main 之外
+        loop = self.source[self.source.index("for (Algorithm alg : ALGORITHMS)"):self.source.index("static long run")]
+        self.assertIn("throw new WrongResult(", self.source)
+        self.assertIn('catch (WrongResult e) {\n                        System.out.println("fail\\t" + key + "\\twrong-result");',
+                      loop)
+        self.assertNotIn("IllegalStateException", self.source)
+
+    def test_sortbench_reads_fail_lines(self):
+        lines = ["# format\tgenkit-sortbench/1", "# student\tliting",
+                 "fail\tBubbleSort\trandom\t1000\twrong-result",
+                 "time\tQuickSort\trandom\t1000\t1\t5000",
+                 "time\tQuickSort\tsorted\t1000\t1\t7000"]
+        result = sortbench.parse(lines)
+        self.assertEqual(result.failed, {("BubbleSort", "random", 1000): "wrong-result"})
+        self.assertEqual(len(result.times), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+"""genkit.template：预编译模板的两种占位符语法、HTML 转义、dedent 与 track()。"""
+import unittest
+
+from genkit import template
+from genkit.template import Template
+
+
+class FormatSyntaxTest(unittest.TestCase):
+    def test_matches_str_format(self):
+        source = "class {name} {{\n    int {field} = {value};\n}}\n{name}"
+        values = {"name": "Main", "field": "x", "value": 42}
+        tpl = Template(source)
+        self.assertEqual(tpl.render(**values), source.format(**values))
+        self.assertEqual(tpl.placeholders, ("name", "field", "value"))
+
+    def test_only_simple_names(self):
+        for source in ("{0}", "{a.b}", "{a[0]}", "{a!r}", "{a:>5}"):
+            with self.subTest(source=source), self.assertRaises(ValueError):
+                Template(source)
+
+    def test_missing_value(self):
+        with self.assertRaises(KeyError):
+            Template("{a}{b}").render(a=1)
+
+    def test_render_does_not_share_state(self):
+        tpl = Template("<{a}>")
+        self.assertEqual(tpl.render(a=1), "<1>")
+        self.assertEqual(tpl.render(a="二"), "<二>")
+        self.assertEqual(Template("no fields").render(), "no fields")
+
+
+class RawSyntaxTest(unittest.TestCase):
+    def test_only_listed_names_are_placeholders(self):
+        tpl = Template("class Main { String s = \"{STUDENT}\"; int[] a = {1}; {OTHER} }",
+                       raw=True, names=["STUDENT"])
+        self.assertEqual(tpl.render(STUDENT="张三"), "class Main { String s = \"张三\"; int[] a = {1}; {OTHER} }")
+        self.assertEqual(tpl.placeholders, ("STUDENT",))
+
+    def test_no_names(self):
+        self.assertEqual(Template("{{x}}", raw=True).render(), "{{x}}")
+
+
+class OptionsTest(unittest.TestCase):
+    def test_html_escape_only_listed_fields(self):
+        tpl = Template("<h1>{title}</h1>{body}", html=["title"])
+        self.assertEqual(tpl.render(title='<a & "b">', body="<p>ok</p>"),
+                         "<h1>&lt;a &amp; &quot;b&quot;&gt;</h1><p>ok</p>")
+
+    def test_dedent_once_and_keep_source(self):
+        source = """
+            <ul>
+              <li>{name}</li>
+            </ul>
+        """
+        tpl = Template(source, dedent=True)
+        self.assertEqual(tpl.render(name="x"), "\n<ul>\n  <li>x</li>\n</ul>\n")
+        self.assertEqual(tpl.source, source)              # 清单的模板版本按原文计算
+
+    def test_track(self):
+        a, b = Template("a"), Template("b")
+        used = set()
+        template.track(used)
+        try:
+            a.render()
+        finally:
+            template.track(None)
+        b.render()
+        self.assertEqual(used, {id(a)})
+
+
+if __name__ == "__main__":
+    unittest.main()
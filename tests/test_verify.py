@@ -0,0 +1,140 @@
+"""genkit.verify：通过 tests/stub_jdk.py 跑完整的编译、运行、比较流程，以及集合示例的期望输出。"""
+import contextlib
+import io
+import shlex
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import generate_java_collections as collections_gen
+from genkit import engine, verify
+from genkit.output import StudentOutput
+from genkit.roster import Roster
+
+STUB = Path(__file__).with_name("stub_jdk.py")
+
+# 每个学生的 Main.java（只有桩程序认的指令）和期望输出
+PROGRAMS = {
+    "pass": ("// stub: print 你好\n// stub: print [1, 2]\n", "你好\n[1, 2]\n"),
+    "mismatch": ("// stub: print 你好\n// stub: print [2, 1]\n", "你好\n[1, 2]\n"),
+    "compile": ("// stub: compile-error\n", "\n"),
+    "runtime": ("// stub: print 开始\n// stub: exit 3\n", "开始\n"),
+    "timeout": ("// stub: sleep 5\n", "\n"),
+}
+
+
+def _render(i, name, total):
+    return StudentOutput(name, {}, [(f"{name}/src/Main.java", PROGRAMS[name][0])])
+
+
+def _checks(student):
+    return [verify.RunCheck("Main", "main", PROGRAMS[student.name][1])]
+
+
+STUB_FAMILY = engine.Family(name="stubtest", output_zip="stubtest.zip", render=_render, templates=(),
+                            description="", done_message="", checks=_checks)
+
+
+def _commands(timeout=2.0):
+    prefix = [sys.executable, str(STUB)]
+    return verify.Commands(prefix + ["javac"], prefix + ["java"], timeout)
+
+
+class RunnerTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        for name, (source, _) in PROGRAMS.items():
+            (self.root / name / "src").mkdir(parents=True)
+            (self.root / name / "src" / "Main.java").write_text(source, encoding="utf-8")
+
+    def _verify(self, names):
+        judge = verify._Judge(self.root / "golden", update=False)
+        return verify.verify(STUB_FAMILY, Roster(names), self.root, _commands(), judge, jobs=len(names))
+
+    def test_statuses(self):
+        results = self._verify(list(PROGRAMS))
+        self.assertEqual([o.student for o in results], list(PROGRAMS))
+        self.assertEqual({o.student: o.status for o in results},
+                         {name: name if name != "pass" else "ok" for name in PROGRAMS})
+        by_name = {o.student: o for o in results}
+        self.assertIn("+[2, 1]", by_name["mismatch"].detail)
+        self.assertIn("stub compile error", by_name["compile"].detail)
+        self.assertIn("退出码 3", by_name["runtime"].detail)
+
+    def test_report(self):
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            self.assertTrue(verify.report(self._verify(["pass"])))
+            self.assertFalse(verify.report(self._verify(["pass", "mismatch"])))
+        self.assertIn("[输出不符] mismatch Main", out.getvalue())
+
+    def test_missing_golden_fails(self):
+        check = verify.RunCheck("Main", "k1")
+        outcome = verify.Outcome("pass", "Main", "ran", output="你好\n")
+        judge = verify._Judge(self.root / "golden", update=False)
+        self.assertEqual(judge.judge(outcome, check).status, "nogolden")
+        self.assertIn("nogolden", verify.FAILURES)
+        recorder = verify._Judge(self.root / "golden", update=True)
+        self.assertEqual(recorder.judge(outcome, check).status, "recorded")
+        self.assertEqual(verify._Judge(self.root / "golden", update=False).judge(outcome, check).status, "ok")
+
+    def test_command_line(self):
+        prefix = f"{shlex.quote(sys.executable)} {shlex.quote(str(STUB))}"
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp)
+            # 桩程序不会真的运行 Java：Main 没有输出指令，每个学生都应报“输出不符”而不是通过
+            with contextlib.redirect_stdout(io.StringIO()) as log, self.assertRaises(SystemExit) as ctx:
+                collections_gen.main(["--roster", str(self._roster(out)), "-o", str(out), "--zip-only"])
+                verify.main(["collections", "--source", str(out / collections_gen.OUTPUT_ZIP),
+                             "--roster", str(self._roster(out)), "--javac", f"{prefix} javac",
+                             "--java", f"{prefix} java", "-j", "2"])
+            self.assertEqual(ctx.exception.code, 1)
+            self.assertIn("输出不符 2", log.getvalue())
+
+    @staticmethod
+    def _roster(out):
+        path = out / "roster.txt"
+        path.write_text("zhangsan\nlisi\n", encoding="utf-8")
+        return path
+
+
+class TimeoutTest(unittest.TestCase):
+    def test_timeout(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp) / "slow"
+            (folder / "src").mkdir(parents=True)
+            (folder / "src" / "Main.java").write_text("// stub: sleep 5\n", encoding="utf-8")
+            [outcome] = verify.verify_student("slow", folder, None, [verify.RunCheck("Main", "main", "")],
+                                              _commands(timeout=0.5))
+            self.assertEqual(outcome.status, "timeout")
+
+
+class JavaSemanticsTest(unittest.TestCase):
+    def test_string_hash(self):
+        self.assertEqual(verify.java_string_hash("hello"), 99162322)
+        self.assertEqual(verify.java_string_hash("Aa"), verify.java_string_hash("BB"))
+        self.assertEqual(verify.java_string_hash("polygenelubricants"), -2 ** 31)
+
+    def test_hash_order(self):
+        self.assertEqual(verify.java_hash_order(["a", "bb", "ccc"]), ["bb", "a", "ccc"])
+        self.assertEqual(verify.java_hash_order(["Alice", "Bob", "Carol"]), ["Bob", "Alice", "Carol"])
+        self.assertEqual(verify.java_hash_order([17, 1, 16]), [16, 17, 1])
+
+    def test_shuffle_is_permutation(self):
+        items = list("abcde")
+        for seed in range(97):
+            self.assertEqual(sorted(verify.java_shuffle(items, seed)), items)
+
+    def test_every_template_has_expected_output(self):
+        for name in ("zhangsan", "lisi", "wangwu", "张三", "Anna"):
+            student = collections_gen.render_student(0, name)
+            [check] = collections_gen.checks(student)
+            self.assertIsNotNone(check.expected)
+            self.assertTrue(check.expected.startswith(("欢迎，", name)))
+        self.assertEqual(len(collections_gen.EXPECTED), collections_gen.NUM_TEMPLATES)
+
+
+if __name__ == "__main__":
+    unittest.main()
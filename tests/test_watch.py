@@ -0,0 +1,114 @@
+"""genkit.watch：改动一个模板后只重新渲染用到它的学生，其余学生沿用上次的输出。"""
+import contextlib
+import importlib
+import io
+import re
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from genkit import engine, watch
+from genkit.compression import parse_policy
+from genkit.roster import Roster, load_roster
+
+# 测试用的产物插件：名字长度为奇数的学生用 TEMPLATES[1]，偶数的用 TEMPLATES[0]，所有人都用 PAGE
+PLUGIN = '''\
+from genkit.engine import Family, register_family
+from genkit.output import StudentOutput
+from genkit.template import Template
+
+TEMPLATES = [Template("even {name}\\n"), Template("odd {name}\\n")]
+PAGE = Template("page {name}\\n")
+
+
+def render_student(i, name, total=None):
+    body = TEMPLATES[len(name) % 2].render(name=name)
+    return StudentOutput(name, {}, [(f"{name}/main.txt", body), (f"{name}/page.txt", PAGE.render(name=name))])
+
+
+register_family(Family(name="watchtest", output_zip="watchtest.zip", render=render_student,
+                       templates=(*TEMPLATES, PAGE), description="", done_message=""))
+'''
+NAMES = ["ab", "abc", "abcd", "abcde", "x"]
+ODD = [n for n in NAMES if len(n) % 2]
+
+
+class WatchRebuildTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        base = Path(tmp.name)
+        self.module_path = base / "watchtest_plugin.py"
+        self.module_path.write_text(PLUGIN, encoding="utf-8")
+        sys.path.insert(0, str(base))
+        self.addCleanup(sys.path.remove, str(base))
+        self.addCleanup(sys.modules.pop, "watchtest_plugin", None)
+        sys.dont_write_bytecode, old = True, sys.dont_write_bytecode
+        self.addCleanup(setattr, sys, "dont_write_bytecode", old)
+        module = importlib.import_module("watchtest_plugin")
+        self.addCleanup(engine._REGISTRY.pop, "watchtest", None)     # 不影响其他测试中的 families()
+
+        roster = base / "roster.txt"
+        roster.write_text("\n".join(NAMES) + "\n", encoding="utf-8")
+        self.out = base / "out"
+        self.out.mkdir()
+        fam = engine.families(["watchtest"])[0]
+        self.args = engine.build_parser("watchtest", [fam]).parse_args(["--roster", str(roster), "-o", str(self.out)])
+        self.states = [watch._FamilyState("watchtest", self.args, module)]
+
+    def _rebuild(self, changed):
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            watch.rebuild(self.states, {"watchtest": changed}, load_roster(self.args.roster), self.out, self.args,
+                          parse_policy(None))
+        m = re.search(r"重新渲染 (\d+) 人，沿用 (\d+) 人", log.getvalue())
+        return int(m.group(1)), int(m.group(2))
+
+    def _edit(self, old, new):
+        self.module_path.write_text(PLUGIN.replace(old, new), encoding="utf-8")
+        return self.states[0].reload()
+
+    def _archive(self):
+        with zipfile.ZipFile(self.out / "watchtest.zip") as zf:
+            return {n: zf.read(n).decode("utf-8") for n in zf.namelist()}
+
+    def test_dependencies_are_recorded(self):
+        self._rebuild(None)
+        deps = {name: rec.deps for name, rec in self.states[0].students.items()}
+        for name in NAMES:
+            expected = {"TEMPLATES[1]" if name in ODD else "TEMPLATES[0]", "PAGE"}
+            self.assertEqual(deps[name], expected)
+
+    def test_editing_one_template_rerenders_its_students(self):
+        self.assertEqual(self._rebuild(None), (len(NAMES), 0))
+        self.assertEqual(self._rebuild(set()), (0, len(NAMES)))
+        keys = self._edit('Template("odd {name}\\n")', 'Template("ODD {name}!\\n")')
+        self.assertEqual(keys, {"TEMPLATES[1]"})
+        self.assertEqual(self._rebuild(keys), (len(ODD), len(NAMES) - len(ODD)))
+        members = self._archive()
+        for name in NAMES:
+            main = f"ODD {name}!\n" if name in ODD else f"even {name}\n"
+            self.assertEqual(members[f"{name}/main.txt"], main)
+            self.assertEqual((self.out / name / "main.txt").read_text(encoding="utf-8"), main)
+            self.assertEqual(members[f"{name}/page.txt"], f"page {name}\n")
+
+    def test_shared_template_rerenders_everyone(self):
+        self._rebuild(None)
+        keys = self._edit('Template("page {name}\\n")', 'Template("PAGE {name}\\n")')
+        self.assertEqual(keys, {"PAGE"})
+        self.assertEqual(self._rebuild(keys), (len(NAMES), 0))
+
+    def test_roster_is_not_counted_without_needs_total(self):
+        # 产物不需要总人数时名单只流式读一遍，不预先数人数，也不整份读进内存
+        with mock.patch.object(Roster, "count", side_effect=AssertionError("不应数人数")):
+            self.assertEqual(self._rebuild(None), (len(NAMES), 0))
+
+    def test_code_change_rerenders_everything(self):
+        self._rebuild(None)
+        self.assertIsNone(self._edit("len(name) % 2", "(len(name) + 2) % 2"))
+
+
+if __name__ == "__main__":
+    unittest.main()